@@ -0,0 +1,44 @@
+"""add_fulltext_search_to_pg_embedding
+
+Revision ID: 5c8e2f4a91d3
+Revises: bcec2a934209
+Create Date: 2025-06-20 10:12:44.318207
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5c8e2f4a91d3"
+down_revision: Union[str, None] = "bcec2a934209"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # langchain_pg_embedding is created by langchain_postgres on first use, so it may not exist yet.
+    # scripts/create_vector_indexes.py adds the same column and index once it does.
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF to_regclass('public.langchain_pg_embedding') IS NOT NULL THEN
+                ALTER TABLE langchain_pg_embedding
+                    ADD COLUMN IF NOT EXISTS document_tsv tsvector
+                    GENERATED ALWAYS AS (to_tsvector('simple', coalesce(document, ''))) STORED;
+                CREATE INDEX IF NOT EXISTS ix_langchain_pg_embedding_document_tsv
+                    ON langchain_pg_embedding USING gin (document_tsv);
+            END IF;
+        END
+        $$;
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_langchain_pg_embedding_document_tsv")
+    op.execute("ALTER TABLE IF EXISTS langchain_pg_embedding DROP COLUMN IF EXISTS document_tsv")
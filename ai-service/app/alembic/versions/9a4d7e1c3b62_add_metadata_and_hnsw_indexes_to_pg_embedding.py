@@ -0,0 +1,94 @@
+"""add_metadata_and_hnsw_indexes_to_pg_embedding
+
+Revision ID: 9a4d7e1c3b62
+Revises: 5c8e2f4a91d3
+Create Date: 2025-06-21 14:37:09.552130
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4d7e1c3b62"
+down_revision: Union[str, None] = "5c8e2f4a91d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+
+    # langchain_pg_embedding is created by langchain_postgres on first use, so it may not exist yet.
+    # scripts/create_vector_indexes.py creates the same indexes once it does.
+    if conn.execute(sa.text("SELECT to_regclass('public.langchain_pg_embedding')")).scalar() is None:
+        return
+
+    # HNSW needs a typed vector(n) column. Tables created without a fixed dimension are typed
+    # after the dimension of the stored embeddings when all of them have the same one.
+    column_dimension = conn.execute(
+        sa.text(
+            """
+            SELECT atttypmod FROM pg_attribute
+            WHERE attrelid = 'langchain_pg_embedding'::regclass AND attname = 'embedding'
+            """
+        )
+    ).scalar()
+    if column_dimension is None or column_dimension <= 0:
+        dimensions = (
+            conn.execute(sa.text("SELECT DISTINCT vector_dims(embedding) FROM langchain_pg_embedding LIMIT 2"))
+            .scalars()
+            .all()
+        )
+        if len(dimensions) == 1:
+            column_dimension = int(dimensions[0])
+            op.execute(f"ALTER TABLE langchain_pg_embedding ALTER COLUMN embedding TYPE vector({column_dimension})")
+
+    # A failed concurrent build leaves an invalid index behind, which IF NOT EXISTS would keep
+    invalid_indexes = (
+        conn.execute(
+            sa.text(
+                """
+                SELECT c.relname FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE i.indrelid = 'langchain_pg_embedding'::regclass AND NOT i.indisvalid
+                """
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+    with op.get_context().autocommit_block():
+        for index_name in invalid_indexes:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{index_name}"')
+        op.execute(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_langchain_pg_embedding_user_upload
+                ON langchain_pg_embedding (collection_id, (cmetadata->>'user_id'), (cmetadata->>'upload_id'))
+            """
+        )
+        op.execute(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cmetadata_gin
+                ON langchain_pg_embedding USING gin (cmetadata jsonb_path_ops)
+            """
+        )
+        if column_dimension is not None and column_dimension > 0:
+            op.execute(
+                """
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_langchain_pg_embedding_embedding_hnsw
+                    ON langchain_pg_embedding USING hnsw (embedding vector_cosine_ops)
+                    WITH (m = 16, ef_construction = 64)
+                """
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_langchain_pg_embedding_embedding_hnsw")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_langchain_pg_embedding_user_upload")
@@ -0,0 +1,40 @@
+"""add_embedding_cache_table
+
+Revision ID: e17b3c5d8f20
+Revises: 9a4d7e1c3b62
+Create Date: 2025-06-22 09:48:31.207654
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e17b3c5d8f20"
+down_revision: Union[str, None] = "9a4d7e1c3b62"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "embedding_cache",
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("provider", sa.String(length=64), nullable=False),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("dimension", sa.Integer(), nullable=False),
+        sa.Column("embedding", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("last_used_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("content_hash", "provider", "model"),
+    )
+    op.create_index("ix_embedding_cache_last_used_at", "embedding_cache", ["last_used_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_embedding_cache_last_used_at", table_name="embedding_cache")
+    op.drop_table("embedding_cache")
@@ -0,0 +1,47 @@
+"""add_thread_messages_table
+
+Revision ID: f3a9c1d2e4b7
+Revises: e17b3c5d8f20
+Create Date: 2025-06-24 14:12:05.418302
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a9c1d2e4b7"
+down_revision: Union[str, None] = "e17b3c5d8f20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "thread_messages",
+        sa.Column("seq", sa.BigInteger(), sa.Identity(always=False), nullable=False),
+        sa.Column("thread_id", sa.String(), nullable=False),
+        sa.Column("message_id", sa.String(), nullable=False),
+        sa.Column("role", sa.String(length=16), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("imgdata", sa.Text(), nullable=True),
+        sa.Column("tool_calls", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("tool_output", sa.Text(), nullable=True),
+        sa.Column("documents", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["thread_id"], ["threads.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("seq"),
+        sa.UniqueConstraint("thread_id", "message_id", name="uq_thread_messages_thread_id_message_id"),
+    )
+    op.create_index("ix_thread_messages_thread_id_seq", "thread_messages", ["thread_id", "seq"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_thread_messages_thread_id_seq", table_name="thread_messages")
+    op.drop_table("thread_messages")
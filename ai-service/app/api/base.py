@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
 
+from app.api.internal import checkpoint as internal_checkpoint
+from app.api.internal import metrics as internal_metrics
 from app.api.internal import user as internal_user
 from app.api.public.v1 import (
     assistant,
@@ -10,6 +12,7 @@ from app.api.public.v1 import (
     extension,
     langmanus,
     member,
+    run,
     skill,
     statistics,
     suggestion,
@@ -41,6 +44,8 @@ router.include_router(test.router)
 # Private routes
 private_router = APIRouter(prefix="/private", tags=["Private"])
 private_router.include_router(internal_user.router)
+private_router.include_router(internal_metrics.router)
+private_router.include_router(internal_checkpoint.router)
 router.include_router(private_router)
 
 # Public routes v1
@@ -57,6 +62,7 @@ router.include_router(assistant.router, prefix=prefix)
 router.include_router(connected_extension.router, prefix=prefix)
 
 router.include_router(team.router, prefix=prefix)
+router.include_router(run.router, prefix=prefix)
 router.include_router(member.router, prefix=prefix)
 router.include_router(skill.router, prefix=prefix)
 router.include_router(upload.router, prefix=prefix)
@@ -0,0 +1,29 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Query
+
+from app.core import logging
+from app.memory.checkpoint_retention import KEEP_LAST_CHECKPOINTS, purge_checkpoints
+from app.schemas.base import ResponseWrapper
+from app.schemas.checkpoint import CheckpointRetentionResponse
+
+logger = logging.get_logger(__name__)
+
+router = APIRouter(prefix="/checkpoint", tags=["Checkpoint"])
+
+
+@router.post("/purge", summary="Apply the checkpoint retention policy now.", response_model=ResponseWrapper[CheckpointRetentionResponse])
+async def apurge_checkpoints(keep_last: Optional[int] = Query(None, ge=1, description="Checkpoints kept per thread")):
+    """
+    Purge the checkpoints of deleted threads and the old checkpoints of idle threads.
+    The same purge runs periodically as a Celery beat job.
+    """
+    try:
+        # The purge runs blocking batches, keep them off the event loop
+        report = await asyncio.to_thread(purge_checkpoints, keep_last or KEEP_LAST_CHECKPOINTS)
+        data = CheckpointRetentionResponse.model_validate(report.to_dict())
+        return ResponseWrapper.wrap(status=200, data=data).to_response()
+    except Exception as e:
+        logger.error(f"Error purging checkpoints: {e}", exc_info=True)
+        return ResponseWrapper.wrap(status=500, message="Internal server error").to_response()
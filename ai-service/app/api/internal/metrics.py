@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+
+from app.core import logging
+from app.core.admission import admission_controller
+from app.core.rag.embedding_cache import embedding_cache_stats
+from app.core.run_manager import run_manager
+from app.core.stream_control import stream_control
+from app.schemas.base import ResponseWrapper
+from app.schemas.metrics import AdmissionMetricsResponse, EmbeddingCacheMetricsResponse, MetricsResponse, StreamMetricsResponse
+
+logger = logging.get_logger(__name__)
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("", summary="Get runtime metrics of this worker.", response_model=ResponseWrapper[MetricsResponse])
+async def aget_metrics():
+    """
+    Get the runtime metrics of the worker process serving the request.
+    """
+    data = MetricsResponse(
+        embedding_cache=EmbeddingCacheMetricsResponse.model_validate(embedding_cache_stats.snapshot()),
+        streams=StreamMetricsResponse.model_validate({**stream_control.snapshot(), **run_manager.snapshot()}),
+        admission=AdmissionMetricsResponse.model_validate(admission_controller.snapshot()),
+    )
+    return ResponseWrapper.wrap(status=200, data=data).to_response()
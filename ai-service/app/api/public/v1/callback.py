@@ -7,6 +7,7 @@ from app.api.deps import SessionDep
 from app.core import logging
 from app.core.enums import ConnectionStatus
 from app.core.settings import env_settings
+from app.core.tools.tool_manager import tool_manager
 from app.db_models.connected_extension import ConnectedExtension
 from app.schemas.base import ResponseWrapper
 
@@ -75,6 +76,8 @@ async def connection_success(
 
         await sessions.execute(statement)
         await sessions.commit()
+        # Let the next tool load retry the reauthorised connection right away
+        tool_manager.clear_failed_fetches(connected_extension_id)
 
         return RedirectResponse(full_url)
 
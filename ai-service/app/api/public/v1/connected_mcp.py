@@ -6,6 +6,7 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from app.api.deps import SessionDep
 from app.core import logging
+from app.core.tools.tool_manager import tool_manager
 from app.db_models.connected_mcp import ConnectedMcp
 from app.schemas.base import MessageResponse, PagingRequest, ResponseWrapper
 from app.schemas.connected_mcp import (
@@ -216,6 +217,8 @@ async def aupdate(
 
         await session.commit()
         await session.refresh(connecte_mcp)
+        # Let the next tool load retry the reconfigured connection right away
+        tool_manager.clear_failed_fetches(connected_mcp_id)
 
         response_data = UpdateConnectedMcpResponse.model_validate(connecte_mcp)
         return ResponseWrapper.wrap(status=200, data=response_data).to_response()
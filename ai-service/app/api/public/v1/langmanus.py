@@ -1,16 +1,19 @@
 import base64
 import json
 import os
+from collections.abc import AsyncIterator
 from typing import Annotated, Any, List, cast
 from uuid import uuid4
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query
 from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 from langchain_core.messages import AIMessageChunk, BaseMessage, ToolMessage
 from langgraph.types import Command
 from pydantic import BaseModel
 
 from app.core import logging
+from app.core.admission import AdmissionPermit, AdmissionRejectedError, admission_controller
 from app.core.langmanus.config.tools import SELECTED_RAG_PROVIDER
 from app.core.langmanus.graph.builder import build_graph_with_memory
 from app.core.langmanus.podcast.graph.builder import build_graph as build_podcast_graph
@@ -65,27 +68,46 @@ async def ask_question(request: QuestionRequest):
 
 
 @router.post("/chat/stream")
-async def chat_stream(request: ChatRequest):
+async def chat_stream(request: ChatRequest, x_user_id: str = Header(None)):
+    # Wait for an admission permit, it is held until the stream ends
+    try:
+        permit = await admission_controller.aacquire(x_user_id)
+    except AdmissionRejectedError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": e.retry_after_header})
+
     thread_id = request.thread_id
     if thread_id == "__default__":
         thread_id = str(uuid4())
     return StreamingResponse(
-        _astream_workflow_generator(
-            request.model_dump()["messages"],
-            thread_id or "__default___",
-            request.resources or [],
-            request.max_plan_iterations or 1,
-            request.max_step_num or 3,
-            request.max_search_results or 10,
-            request.auto_accepted_plan or False,
-            request.interrupt_feedback or "",
-            request.mcp_settings or {},
-            request.enable_background_investigation,
+        _arelease_when_done(
+            permit,
+            _astream_workflow_generator(
+                request.model_dump()["messages"],
+                thread_id or "__default___",
+                request.resources or [],
+                request.max_plan_iterations or 1,
+                request.max_step_num or 3,
+                request.max_search_results or 10,
+                request.auto_accepted_plan or False,
+                request.interrupt_feedback or "",
+                request.mcp_settings or {},
+                request.enable_background_investigation,
+            ),
         ),
         media_type="text/event-stream",
+        # Also releases the permit when the client disconnected before the stream started
+        background=BackgroundTask(permit.release),
     )
 
 
+async def _arelease_when_done(permit: AdmissionPermit, events: AsyncIterator[str]) -> AsyncIterator[str]:
+    try:
+        async for event in events:
+            yield event
+    finally:
+        permit.release()
+
+
 async def _astream_workflow_generator(
     messages: List[ChatMessage],
     thread_id: str,
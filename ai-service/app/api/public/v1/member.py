@@ -7,6 +7,7 @@ from sqlalchemy.orm import selectinload
 
 from app.api.deps import SessionDep
 from app.core import logging
+from app.core.graph.graph_cache import compiled_graph_cache
 from app.core.settings import env_settings
 from app.db_models import Member, Skill, Team, Upload
 from app.schemas.base import MessageResponse, ResponseWrapper
@@ -150,6 +151,7 @@ async def acreate_member(
         session.add(member)
         await session.commit()
         await session.refresh(member)
+        await compiled_graph_cache.ainvalidate_team(assistant_id)
 
         data = MemberResponse.model_validate(member)
         return ResponseWrapper(status=200, data=data).to_response()
@@ -222,6 +224,7 @@ async def async_update_member(
         # No need for an explicit update statement as we're modifying the member object directly
         await session.commit()
         await session.refresh(member)
+        await compiled_graph_cache.ainvalidate_team(assistant_id)
 
         data = MemberResponse.model_validate(member)
         return ResponseWrapper.wrap(status=200, data=data).to_response()
@@ -266,6 +269,7 @@ async def async_delete_member(
         )
         await session.execute(statement)
         await session.commit()
+        await compiled_graph_cache.ainvalidate_team(assistant_id)
 
         data = MessageResponse(message="Member deleted successfully")
         return ResponseWrapper.wrap(status=200, data=data).to_response()
@@ -0,0 +1,91 @@
+from typing import Any
+
+from fastapi import APIRouter, Header
+
+from app.core import logging
+from app.core.graph.stream_coalescing import create_streaming_response
+from app.core.run_manager import run_manager
+from app.schemas.base import MessageResponse, ResponseWrapper
+from app.schemas.run import RunResponse
+
+router = APIRouter(prefix="/run", tags=["Run"])
+
+logger = logging.get_logger(__name__)
+
+
+def _can_access_run(run_user_id: str, x_user_id: str, x_user_role: str) -> bool:
+    return x_user_role in ["admin", "super admin"] or run_user_id == x_user_id
+
+
+@router.get("/{run_id}", response_model=ResponseWrapper[RunResponse])
+async def aget_run(
+    run_id: str,
+    x_user_id=Header(None),
+    x_user_role=Header(None),
+) -> Any:
+    """
+    Get the status of a run.
+    """
+    try:
+        run_stream = run_manager.get(run_id)
+        if run_stream is None:
+            return ResponseWrapper(status=404, message="Run not found").to_response()
+        if not _can_access_run(run_stream.user_id, x_user_id, x_user_role):
+            return ResponseWrapper(status=403, message="Not enough permissions").to_response()
+
+        return ResponseWrapper(status=200, data=RunResponse.model_validate(run_stream)).to_response()
+    except Exception as e:
+        logger.error(f"Error getting run: {e}", exc_info=True)
+        return ResponseWrapper(status=500, message="Internal server error").to_response()
+
+
+@router.get("/{run_id}/stream")
+async def astream_run(
+    run_id: str,
+    coalesce: bool = False,
+    last_event_id: int = Header(0, ge=0),
+    x_user_id=Header(None),
+    x_user_role=Header(None),
+) -> Any:
+    """
+    Stream the events of a run.
+    Replays the events after the Last-Event-ID header, then follows the run if it is still running.
+    """
+    try:
+        run_stream = run_manager.get(run_id)
+        if run_stream is None:
+            return ResponseWrapper(status=404, message="Run not found").to_response()
+        if not _can_access_run(run_stream.user_id, x_user_id, x_user_role):
+            return ResponseWrapper(status=403, message="Not enough permissions").to_response()
+
+        return create_streaming_response(run_stream.asubscribe(last_event_id), coalesce)
+    except Exception as e:
+        logger.error(f"Error streaming run: {e}", exc_info=True)
+        return ResponseWrapper(status=500, message="Internal server error").to_response()
+
+
+@router.post("/{run_id}/cancel", response_model=ResponseWrapper[MessageResponse])
+async def acancel_run(
+    run_id: str,
+    x_user_id=Header(None),
+    x_user_role=Header(None),
+) -> Any:
+    """
+    Cancel a running run.
+    """
+    try:
+        run_stream = run_manager.get(run_id)
+        if run_stream is None:
+            return ResponseWrapper(status=404, message="Run not found").to_response()
+        if not _can_access_run(run_stream.user_id, x_user_id, x_user_role):
+            return ResponseWrapper(status=403, message="Not enough permissions").to_response()
+
+        if await run_manager.acancel(run_id):
+            data = MessageResponse(message="Run cancelled successfully")
+            return ResponseWrapper(status=200, data=data).to_response()
+        else:
+            data = MessageResponse(message="Run is not running")
+            return ResponseWrapper(status=409, data=data).to_response()
+    except Exception as e:
+        logger.error(f"Error cancelling run: {e}", exc_info=True)
+        return ResponseWrapper(status=500, message="Internal server error").to_response()
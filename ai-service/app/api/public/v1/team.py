@@ -1,17 +1,23 @@
-import asyncio
 from typing import Any
 
 from fastapi import APIRouter, Depends, Header, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse
 from sqlalchemy import func, select
 from sqlalchemy.orm import selectinload
 
 from app.api.deps import SessionDep
 from app.core import logging
+from app.core.admission import AdmissionRejectedError, admission_controller
 from app.core.enums import WorkflowType
 from app.core.graph.build import generator
-from app.db_models import Member, Team, Thread
+from app.core.graph.graph_cache import compiled_graph_cache
+from app.core.graph.stream_coalescing import create_streaming_response
+from app.core.run_manager import run_manager
+from app.core.stream_buffer import RunStream, stream_buffers
+from app.core.stream_control import stream_control
+from app.db_models import Member, Skill, Team, Thread
 from app.schemas.base import MessageResponse, ResponseWrapper
+from app.schemas.run import RunResponse
 from app.schemas.team import ChatTeamRequest, CreateTeamRequest, TeamResponse, TeamsResponse, UpdateTeamRequest
 
 router = APIRouter(prefix="/team", tags=["Team"])
@@ -228,6 +234,7 @@ async def aupdate_team(
         session.add(team)
         await session.commit()
         await session.refresh(team)
+        await compiled_graph_cache.ainvalidate_team(team_id)
 
         data = TeamResponse.model_validate(team)
         return ResponseWrapper(status=200, data=data).to_response()
@@ -260,6 +267,7 @@ async def adelete_team(
 
         await session.delete(team)
         await session.commit()
+        await compiled_graph_cache.ainvalidate_team(team_id)
 
         data = MessageResponse(message="Team deleted successfully")
         return ResponseWrapper(status=200, data=data).to_response()
@@ -309,13 +317,11 @@ async def stop_stream(
         if thread.assistant_id != team.assistant.id:
             return ResponseWrapper(status=400, message="Thread does not belong to this assistant").to_response()
 
-        from app.core.stream_control import atrigger_stop
-
         if not x_user_id:
             return ResponseWrapper(status=400, message="User ID is required").to_response()
 
         # Trigger stop for the specific user and thread
-        stop_triggered = await atrigger_stop(x_user_id, thread_id)
+        stop_triggered = await stream_control.atrigger_stop(x_user_id, thread_id)
 
         if stop_triggered:
             data = MessageResponse(message="Stream stop request sent successfully")
@@ -329,6 +335,89 @@ async def stop_stream(
         return ResponseWrapper(status=500, message="Internal server error").to_response()
 
 
+async def _aload_team_for_run(
+    session: SessionDep,
+    team_id: str,
+    thread_id: str,
+    x_user_id: str,
+    x_user_role: str,
+) -> tuple[Team, list[Member]] | JSONResponse:
+    """
+    Loads a team with everything needed to run it on a thread.
+
+    Returns:
+        The team and its members, or the error response when the team or thread cannot be used.
+    """
+    # Get team and join members and skills
+    statement = (
+        select(Team)
+        .options(selectinload(Team.assistant), selectinload(Team.graphs), selectinload(Team.subgraphs), selectinload(Team.members))
+        .where(Team.id == team_id, Team.is_deleted.is_(False))
+    )
+
+    result = await session.execute(statement)
+    team = result.scalar_one_or_none()
+
+    if not team:
+        return ResponseWrapper(status=404, message="Team not found").to_response()
+    if x_user_role not in ["admin", "super admin"] and (team.user_id != x_user_id):
+        return ResponseWrapper(
+            status=403, message="Not enough permissions"
+        ).to_response()
+
+    # Check if thread belongs to the team
+    statement = select(Thread).where(Thread.id == thread_id, Thread.is_deleted.is_(False))
+    result = await session.execute(statement)
+    thread = result.scalar_one_or_none()
+
+    if not thread:
+        return ResponseWrapper(status=404, message="Thread not found").to_response()
+
+    # Ensure the thread is associated with the requested assistant
+    if thread.assistant_id != team.assistant.id:
+        return ResponseWrapper(status=400, message="Thread does not belong to this assistant").to_response()
+
+    # Populate the skills and accessible uploads for each member
+    # Load members for this team
+    statement = (
+        select(Member)
+        .options(
+            # The skills' connections are part of the compiled graph's fingerprint
+            selectinload(Member.skills).selectinload(Skill.mcp),
+            selectinload(Member.skills).selectinload(Skill.extension),
+            selectinload(Member.uploads),
+            selectinload(Member.team),
+        )
+        .where(Member.team_id == team.id, Member.is_deleted.is_(False))
+    )
+    result = await session.execute(statement)
+    members = result.scalars().all()
+    for member in members:
+        member.skills = member.skills
+        member.uploads = member.uploads
+    graphs = team.graphs
+    for graph in graphs:
+        graph.config = graph.config
+
+    return team, list(members)
+
+
+async def _astart_team_run(team: Team, members: list[Member], team_chat: ChatTeamRequest, thread_id: str, x_user_id: str) -> RunStream:
+    # Wait for an admission permit, it is held until the run ends
+    permit = await admission_controller.aacquire(x_user_id)
+    try:
+        # The run is buffered in the background, so it keeps going if the client disconnects and can be resumed
+        return await run_manager.astart(
+            x_user_id,
+            thread_id,
+            lambda stop_event: generator(team, members, team_chat.messages, thread_id, team_chat.interrupt, x_user_id, stop_event),
+            on_done=permit.release,
+        )
+    except BaseException:
+        permit.release()
+        raise
+
+
 @router.post("/{team_id}/stream/{thread_id}")
 async def astream(
     session: SessionDep,
@@ -342,10 +431,74 @@ async def astream(
     Stream a response to a user's input.
     """
     try:
-        # Get team and join members and skills
+        loaded = await _aload_team_for_run(session, team_id, thread_id, x_user_id, x_user_role)
+        if isinstance(loaded, JSONResponse):
+            return loaded
+        team, members = loaded
+
+        try:
+            run_stream = await _astart_team_run(team, members, team_chat, thread_id, x_user_id)
+        except AdmissionRejectedError as e:
+            response = ResponseWrapper(status=429, message=str(e)).to_response()
+            response.headers["Retry-After"] = e.retry_after_header
+            return response
+
+        return create_streaming_response(run_stream.asubscribe(), team_chat.coalesce)
+    except Exception as e:
+        logger.error(f"Error streaming response: {e}", exc_info=True)
+        return ResponseWrapper(status=500, message="Internal server error").to_response()
+
+
+@router.post("/{team_id}/run/{thread_id}", response_model=ResponseWrapper[RunResponse])
+async def astart_run(
+    session: SessionDep,
+    team_id: str,
+    thread_id: str,
+    team_chat: ChatTeamRequest,
+    x_user_id=Header(None),
+    x_user_role=Header(None),
+) -> Any:
+    """
+    Start a run in the background and return its id.
+    The run can then be streamed, polled or cancelled through the run endpoints.
+    """
+    try:
+        loaded = await _aload_team_for_run(session, team_id, thread_id, x_user_id, x_user_role)
+        if isinstance(loaded, JSONResponse):
+            return loaded
+        team, members = loaded
+
+        try:
+            run_stream = await _astart_team_run(team, members, team_chat, thread_id, x_user_id)
+        except AdmissionRejectedError as e:
+            response = ResponseWrapper(status=429, message=str(e)).to_response()
+            response.headers["Retry-After"] = e.retry_after_header
+            return response
+
+        return ResponseWrapper(status=201, data=RunResponse.model_validate(run_stream)).to_response()
+    except Exception as e:
+        logger.error(f"Error starting run: {e}", exc_info=True)
+        return ResponseWrapper(status=500, message="Internal server error").to_response()
+
+
+@router.get("/{team_id}/stream/{thread_id}/resume")
+async def aresume_stream(
+    session: SessionDep,
+    team_id: str,
+    thread_id: str,
+    coalesce: bool = False,
+    last_event_id: int = Header(0, ge=0),
+    x_user_id=Header(None),
+    x_user_role=Header(None),
+) -> Any:
+    """
+    Resume the latest stream of a thread.
+    Replays the events after the Last-Event-ID header, then follows the stream if it is still running.
+    """
+    try:
         statement = (
             select(Team)
-            .options(selectinload(Team.assistant), selectinload(Team.graphs), selectinload(Team.subgraphs), selectinload(Team.members))
+            .options(selectinload(Team.assistant))
             .where(Team.id == team_id, Team.is_deleted.is_(False))
         )
 
@@ -355,9 +508,7 @@ async def astream(
         if not team:
             return ResponseWrapper(status=404, message="Team not found").to_response()
         if x_user_role not in ["admin", "super admin"] and (team.user_id != x_user_id):
-            return ResponseWrapper(
-                status=403, message="Not enough permissions"
-            ).to_response()
+            return ResponseWrapper(status=403, message="Not enough permissions").to_response()
 
         # Check if thread belongs to the team
         statement = select(Thread).where(Thread.id == thread_id, Thread.is_deleted.is_(False))
@@ -371,47 +522,13 @@ async def astream(
         if thread.assistant_id != team.assistant.id:
             return ResponseWrapper(status=400, message="Thread does not belong to this assistant").to_response()
 
-        # Populate the skills and accessible uploads for each member
-        # Load members for this team
-        statement = (
-            select(Member)
-            .options(selectinload(Member.skills), selectinload(Member.uploads), selectinload(Member.team))
-            .where(Member.team_id == team.id, Member.is_deleted.is_(False))
-        )
-        result = await session.execute(statement)
-        members = result.scalars().all()
-        for member in members:
-            member.skills = member.skills
-            member.uploads = member.uploads
-        graphs = team.graphs
-        for graph in graphs:
-            graph.config = graph.config
-
-        from app.core.stream_control import acleanup_connection, acreate_stop_event
-
-        # Create a stop event for this streaming session
-        await acreate_stop_event(x_user_id, thread_id)
-
-        async def controlled_generator():
-            try:
-                async for item in generator(team, list(members), team_chat.messages, thread_id, team_chat.interrupt, x_user_id):
-                    yield item
-            finally:
-                # Clean up the connection when streaming ends with timeout protection
-                try:
-                    await asyncio.wait_for(
-                        acleanup_connection(x_user_id, thread_id),
-                        timeout=15.0,  # 15 second timeout to prevent indefinite blocking
-                    )
-                except asyncio.TimeoutError:
-                    logger.warning(f"Cleanup connection timeout for user {x_user_id}, thread {thread_id}")
-                except Exception as e:
-                    logger.error(f"Error during cleanup connection: {e}", exc_info=True)
-
-        return StreamingResponse(
-            controlled_generator(),
-            media_type="text/event-stream",
-        )
+        run_stream = stream_buffers.get(x_user_id, thread_id)
+        if run_stream is None:
+            data = MessageResponse(message="No resumable stream found for this thread")
+            return ResponseWrapper(status=404, data=data).to_response()
+
+        return create_streaming_response(run_stream.asubscribe(last_event_id), coalesce)
     except Exception as e:
-        logger.error(f"Error streaming response: {e}", exc_info=True)
+        logger.error(f"Error resuming stream: {e}", exc_info=True)
         return ResponseWrapper(status=500, message="Internal server error").to_response()
+
@@ -7,15 +7,17 @@ from sqlalchemy.orm import selectinload
 
 from app.api.deps import SessionDep
 from app.core import logging
-from app.core.graph.checkpoint.utils import (
-    convert_checkpoint_tuple_to_messages,
-    get_checkpoint_tuples,
+from app.core.graph.checkpoint.message_projection import (
+    abackfill_thread_messages,
+    aget_first_thread_messages,
+    aget_thread_messages,
 )
 from app.db_models.thread import Thread
 from app.schemas.base import CursorPagingRequest, MessageResponse, ResponseWrapper
 from app.schemas.thread import (
     CreateThreadRequest,
     CreateThreadResponse,
+    GetHistoryRequest,
     GetHistoryResponse,
     GetThreadResponse,
     GetThreadsResponse,
@@ -28,6 +30,9 @@ logger = logging.get_logger(__name__)
 
 router = APIRouter(prefix="/thread", tags=["Thread"])
 
+# Messages of the start of a thread used to generate its title
+TITLE_MAX_MESSAGES = 20
+
 
 @router.get("/get-all", summary="Get threads of a user.", response_model=ResponseWrapper[GetThreadsResponse])
 async def aget_all_threads(session: SessionDep, paging: CursorPagingRequest = Depends(), x_user_id: str = Header(None)):
@@ -265,13 +270,10 @@ async def generate_title(
         if thread is None:
             return ResponseWrapper.wrap(status=404, message="Thread not found")
 
-        # Get the thread messages from the latest checkpoint
-        checkpoint_tuple = await get_checkpoint_tuples(thread_id)
-        messages = (
-            convert_checkpoint_tuple_to_messages(checkpoint_tuple)
-            if checkpoint_tuple
-            else []
-        )
+        # Get the first messages of the thread from the message projection
+        messages = await aget_first_thread_messages(session, thread_id, TITLE_MAX_MESSAGES)
+        if not messages and await abackfill_thread_messages(thread_id):
+            messages = await aget_first_thread_messages(session, thread_id, TITLE_MAX_MESSAGES)
         if not messages:
             # Let's update the thread title to a default value (New thread)
             gen_title = "New thread"
@@ -352,6 +354,7 @@ Given the following content, please generate a suitable title:
 async def get_thread_history(
     session: SessionDep,
     thread_id: str,
+    paging: GetHistoryRequest = Depends(),
     x_user_id: str = Header(None),
 ):
     try:
@@ -372,9 +375,13 @@ async def get_thread_history(
         if thread is None:
             return ResponseWrapper.wrap(status=404, message="Thread not found")
 
-        # Get the thread messages from the latest checkpoint
-        checkpoint_tuple = await get_checkpoint_tuples(thread_id)
-        messages = convert_checkpoint_tuple_to_messages(checkpoint_tuple) if checkpoint_tuple else []
+        # Get a page of the thread messages from the message projection, latest messages first
+        if paging.cursor and not paging.cursor.isdigit():
+            return ResponseWrapper.wrap(status=400, message="Invalid cursor")
+        before_seq = int(paging.cursor) if paging.cursor else None
+        messages, next_cursor = await aget_thread_messages(session, thread_id, paging.max_per_page, before_seq)
+        if not messages and before_seq is None and await abackfill_thread_messages(thread_id):
+            messages, next_cursor = await aget_thread_messages(session, thread_id, paging.max_per_page)
         if not messages:
             return ResponseWrapper.wrap(status=404, message="Thread not found")
 
@@ -383,6 +390,8 @@ async def get_thread_history(
             thread_id=thread_id,
             assistant_id=thread.assistant_id,
             messages=messages,
+            cursor=paging.cursor,
+            next_cursor=str(next_cursor) if next_cursor is not None else None,
         )
         return ResponseWrapper.wrap(status=200, data=response_data)
 
@@ -16,6 +16,7 @@ from starlette import status
 from app.api.deps import SessionDep
 from app.core.constants import SYSTEM
 from app.core.enums import AssistantType, UploadStatus, WorkflowType
+from app.core.rag.pgvector import HYBRID_FUSION_METHODS
 from app.core.settings import env_settings
 from app.db_models.assistant import Assistant
 from app.db_models.member_upload_link import MemberUploadLink
@@ -30,6 +31,9 @@ router = APIRouter(prefix="/upload", tags=["Upload"])
 
 logger = logging.getLogger(__name__)
 
+# Bytes read from an uploaded file per write when saving it to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 async def _alink_upload_to_assistant_members(session: SessionDep, upload_id: str, thread_id: str, user_id: str) -> None:
     """
@@ -132,7 +136,7 @@ def _save_file_if_within_size_limit(file: UploadFile, file_size: int) -> IO[byte
     # Check file size
     real_file_size = 0
     temp: IO[bytes] = NamedTemporaryFile(delete=False)
-    for chunk in file.file:
+    while chunk := file.file.read(UPLOAD_CHUNK_SIZE):
         real_file_size += len(chunk)
         if real_file_size > file_size:
             raise HTTPException(
@@ -344,9 +348,10 @@ async def save_upload_file(file: UploadFile) -> str:
     file_name = f"{uuid.uuid4()}-{file.filename}"
     file_path = f"./app/{file_name}"
 
+    # Stream the upload to disk so large files are never held in memory as a whole
     async with aiofiles.open(file_path, "wb") as out_file:
-        content = await file.read()
-        await out_file.write(content)
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await out_file.write(chunk)
 
     os.chmod(file_path, 0o775)
     return file_path
@@ -511,6 +516,23 @@ async def asearch_upload(
     if search_type not in ["vector", "fulltext", "hybrid"]:
         return ResponseWrapper.wrap(status=400, message="Invalid search type. Supported types: vector, fulltext, hybrid").to_response()
 
+    fusion = search_params.get("fusion", "rrf")
+    if fusion not in HYBRID_FUSION_METHODS:
+        return ResponseWrapper.wrap(status=400, message="Invalid fusion method. Supported methods: rrf, weighted").to_response()
+
+    try:
+        vector_weight = float(search_params.get("vector_weight", 0.5))
+    except (TypeError, ValueError):
+        vector_weight = None
+    if vector_weight is None or not 0 <= vector_weight <= 1:
+        return ResponseWrapper.wrap(status=400, message="vector_weight must be a number between 0 and 1").to_response()
+
+    rrf_k = search_params.get("rrf_k", 60)
+    if isinstance(rrf_k, str) and rrf_k.strip().isdigit():
+        rrf_k = int(rrf_k)
+    if isinstance(rrf_k, bool) or not isinstance(rrf_k, int) or rrf_k < 0:
+        return ResponseWrapper.wrap(status=400, message="rrf_k must be an integer of at least 0").to_response()
+
     task = perform_search.delay(
         x_user_id,
         upload_id,
@@ -518,6 +540,9 @@ async def asearch_upload(
         search_type,
         search_params.get("top_k", 5),
         search_params.get("score_threshold", 0.5),
+        fusion=fusion,
+        rrf_k=rrf_k,
+        vector_weight=vector_weight,
     )
 
     return {"task_id": task.id}
@@ -0,0 +1,236 @@
+"""
+Admission control for graph runs.
+
+Every run needs a permit before it starts. Permits are limited per worker by a global
+semaphore, with a bounded wait in a queue, and per user by a concurrency limit and a
+token bucket on the start rate. Rejected runs get a retry delay for a 429 response.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from app.core import logging
+from app.core.settings import env_settings
+
+logger = logging.get_logger(__name__)
+
+# --- Constants ---
+ANONYMOUS_USER = "anonymous"
+# Recent queue wait times kept for the wait-time percentiles
+WAIT_TIME_SAMPLES = 1000
+# Token buckets kept before idle ones are pruned
+MAX_TRACKED_USERS = 10000
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a run is not admitted. retry_after is the suggested delay in seconds."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class AdmissionPermit:
+    """
+    The right of one run to execute. Must be released once the run ended, releasing twice is a no-op.
+    """
+
+    def __init__(self, controller: "AdmissionController", user_id: str):
+        self._controller = controller
+        self._user_id = user_id
+        self._released = False
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._controller._release(self._user_id)
+
+
+class AdmissionController:
+    """
+    Admits graph runs of this worker process.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_runs: int,
+        queue_timeout: float,
+        max_runs_per_user: int,
+        user_runs_per_minute: float,
+        user_burst: int,
+    ):
+        """
+        Initializes the AdmissionController. Non-positive limits are disabled.
+
+        Args:
+            max_concurrent_runs: Runs executing at the same time in this worker.
+            queue_timeout: Seconds a run waits for a free slot before it is rejected.
+            max_runs_per_user: Runs of one user executing or queued at the same time.
+            user_runs_per_minute: Sustained rate at which one user can start runs.
+            user_burst: Runs one user can start at once before the rate applies.
+        """
+        self.max_concurrent_runs = max_concurrent_runs
+        self.queue_timeout = queue_timeout
+        self.max_runs_per_user = max_runs_per_user
+        self.user_rate = user_runs_per_minute / 60
+        self.user_burst = user_burst
+
+        self._semaphore = asyncio.Semaphore(max_concurrent_runs) if max_concurrent_runs > 0 else None
+        # Key: user_id, Value: (tokens, last refill time)
+        self._user_buckets: dict[str, tuple[float, float]] = {}
+        # Key: user_id, Value: runs executing or queued
+        self._user_runs: dict[str, int] = {}
+
+        # Metrics
+        self._stats_lock = threading.Lock()
+        self.running = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected_rate_limited = 0
+        self.rejected_user_limit = 0
+        self.rejected_queue_timeout = 0
+        self._wait_times: deque[float] = deque(maxlen=WAIT_TIME_SAMPLES)
+        self._max_wait_time = 0.0
+
+    async def aacquire(self, user_id: Optional[str]) -> AdmissionPermit:
+        """
+        Waits for a permit to start a run.
+
+        Args:
+            user_id: The user starting the run.
+
+        Raises:
+            AdmissionRejectedError: If the user exceeded its limits or no slot freed up in time.
+
+        Returns:
+            AdmissionPermit: The permit, to be released when the run ended.
+        """
+        user_id = user_id or ANONYMOUS_USER
+
+        if 0 < self.max_runs_per_user <= self._user_runs.get(user_id, 0):
+            with self._stats_lock:
+                self.rejected_user_limit += 1
+            raise AdmissionRejectedError(f"Too many concurrent runs, at most {self.max_runs_per_user} are allowed per user", 1)
+
+        self._take_token(user_id)
+
+        # Counted before waiting, so queued runs of a user also count against its limit
+        self._user_runs[user_id] = self._user_runs.get(user_id, 0) + 1
+        try:
+            await self._await_slot()
+        except BaseException:
+            self._decrement_user_runs(user_id)
+            raise
+
+        with self._stats_lock:
+            self.running += 1
+            self.admitted += 1
+        return AdmissionPermit(self, user_id)
+
+    def snapshot(self) -> dict[str, float]:
+        with self._stats_lock:
+            wait_times = sorted(self._wait_times)
+            return {
+                "max_concurrent_runs": max(0, self.max_concurrent_runs),
+                "running": self.running,
+                "queued": self.queued,
+                "admitted": self.admitted,
+                "rejected_rate_limited": self.rejected_rate_limited,
+                "rejected_user_limit": self.rejected_user_limit,
+                "rejected_queue_timeout": self.rejected_queue_timeout,
+                "wait_ms_p50": _percentile(wait_times, 0.5) * 1000,
+                "wait_ms_p95": _percentile(wait_times, 0.95) * 1000,
+                "wait_ms_max": self._max_wait_time * 1000,
+            }
+
+    def _take_token(self, user_id: str) -> None:
+        if self.user_rate <= 0 or self.user_burst <= 0:
+            return
+
+        now = time.monotonic()
+        tokens, updated = self._user_buckets.get(user_id, (float(self.user_burst), now))
+        tokens = min(float(self.user_burst), tokens + (now - updated) * self.user_rate)
+        if tokens < 1:
+            self._user_buckets[user_id] = (tokens, now)
+            with self._stats_lock:
+                self.rejected_rate_limited += 1
+            raise AdmissionRejectedError("Too many runs started, please retry later", (1 - tokens) / self.user_rate)
+
+        self._user_buckets[user_id] = (tokens - 1, now)
+        if len(self._user_buckets) > MAX_TRACKED_USERS:
+            self._prune_buckets(now)
+
+    def _prune_buckets(self, now: float) -> None:
+        # A bucket that refilled completely behaves exactly like a missing one
+        full_after = self.user_burst / self.user_rate
+        for user_id, (_, updated) in list(self._user_buckets.items()):
+            if now - updated >= full_after:
+                del self._user_buckets[user_id]
+
+    async def _await_slot(self) -> None:
+        if self._semaphore is None:
+            return
+
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            self._record_wait(0.0)
+            return
+
+        started = time.monotonic()
+        with self._stats_lock:
+            self.queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            with self._stats_lock:
+                self.rejected_queue_timeout += 1
+            logger.warning(f"Run rejected after waiting {self.queue_timeout}s for one of {self.max_concurrent_runs} run slots")
+            raise AdmissionRejectedError("The server is busy, please retry later", self.queue_timeout)
+        finally:
+            with self._stats_lock:
+                self.queued -= 1
+        self._record_wait(time.monotonic() - started)
+
+    def _record_wait(self, wait_time: float) -> None:
+        with self._stats_lock:
+            self._wait_times.append(wait_time)
+            self._max_wait_time = max(self._max_wait_time, wait_time)
+
+    def _release(self, user_id: str) -> None:
+        if self._semaphore is not None:
+            self._semaphore.release()
+        self._decrement_user_runs(user_id)
+        with self._stats_lock:
+            self.running -= 1
+
+    def _decrement_user_runs(self, user_id: str) -> None:
+        remaining = self._user_runs.get(user_id, 0) - 1
+        if remaining > 0:
+            self._user_runs[user_id] = remaining
+        else:
+            self._user_runs.pop(user_id, None)
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+# Singleton instance of AdmissionController
+admission_controller = AdmissionController(
+    max_concurrent_runs=env_settings.ADMISSION_MAX_CONCURRENT_RUNS,
+    queue_timeout=env_settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    max_runs_per_user=env_settings.ADMISSION_MAX_RUNS_PER_USER,
+    user_runs_per_minute=env_settings.ADMISSION_USER_RUNS_PER_MINUTE,
+    user_burst=env_settings.ADMISSION_USER_BURST,
+)
@@ -30,6 +30,15 @@ celery_app.conf.update(
 celery_app.conf.task_routes = {"app.jobs.tasks.*": "main-queue"}
 celery_app.conf.update(task_track_started=True)
 
+# Periodic jobs, run by `celery beat`
+if env_settings.CHECKPOINT_RETENTION_INTERVAL_SECONDS > 0:
+    celery_app.conf.beat_schedule = {
+        "purge-checkpoints": {
+            "task": "app.jobs.tasks.purge_checkpoints",
+            "schedule": env_settings.CHECKPOINT_RETENTION_INTERVAL_SECONDS,
+        },
+    }
+
 # Configure Celery logging
 celery_app.conf.update(
     worker_hijack_root_logger=False,
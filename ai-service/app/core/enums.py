@@ -26,6 +26,12 @@ class ChatMessageType(str, Enum):
     ai = "ai"
 
 
+class CheckpointDurability(str, Enum):
+    EVERY_STEP = "every-step"
+    ON_INTERRUPT_AND_EXIT = "on-interrupt-and-exit"
+    EXIT_ONLY = "exit-only"
+
+
 class InterruptType(str, Enum):
     TOOL_REVIEW = "tool_review"
     OUTPUT_REVIEW = "output_review"
@@ -117,4 +123,10 @@ class StatisticsEntity(str, Enum):
 
     @classmethod
     def supported_values(cls) -> list[str]:
-        return [member for member in cls]
\ No newline at end of file
+        return [member for member in cls]
+
+class RunStatus(str, Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
@@ -12,10 +12,12 @@ from langchain_core.tools import BaseTool
 from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import END, StateGraph
 from langgraph.graph.graph import CompiledGraph
-from langgraph.prebuilt import ToolNode
-from langgraph.types import Command
+from langgraph.types import Command, StateSnapshot
 
-from app.core.enums import InterruptDecision, InterruptType, WorkflowType
+from app.core import logging
+from app.core.enums import CheckpointDurability, InterruptDecision, InterruptType, WorkflowType
+from app.core.graph.checkpoint.message_projection import aproject_thread_messages
+from app.core.graph.checkpoint.utils import get_state_messages
 from app.core.graph.members import (
     GraphLeader,
     GraphMember,
@@ -26,14 +28,18 @@ from app.core.graph.members import (
     SummariserNode,
     WorkerNode,
 )
-from app.core.graph.messages import ChatResponse, event_to_response
+from app.core.graph.graph_cache import compiled_graph_cache, compute_team_fingerprint
+from app.core.graph.messages import ChatResponse, event_to_sse, get_stream_event_filters
 from app.core.models import ChatMessage, Interrupt
 from app.core.settings import env_settings
-from app.core.state import GraphSkill, GraphUpload
+from app.core.state import GraphSkill, GraphUpload, aget_tools, create_tool_node
 from app.core.workflow.build_workflow import initialize_graph
 from app.core.workflow.node.human_node import HumanNode
 from app.db_models import Member, Team
 from app.memory.checkpoint import get_checkpointer
+from app.memory.durability import DeferredCheckpointSaver, with_durability
+
+logger = logging.get_logger(__name__)
 
 
 def convert_hierarchical_team_to_dict(members: list[Member]
@@ -309,7 +315,11 @@ def enter_chain(state: GraphTeamState, team: GraphTeam) -> dict[str, Any]:
 
 def exit_chain(state: GraphTeamState) -> dict[str, list[AnyMessage]]:
     """
-    Pass the final response back to the top-level graph's state.
+    Pass the final response and the messages of the sub-graph back to the top-level graph's state.
+
+    Each call of the sub-graph starts from the state returned by enter_chain in its own checkpoint
+    namespace, so its all_messages only holds the messages it added. They are new to the top-level
+    graph and are appended to its all_messages without a merge.
     """
     answer = state["history"][-1]
     return {"history": [answer], "all_messages": state["all_messages"]}
@@ -478,21 +488,19 @@ async def acreate_hierarchical_graph(
                 ),
             )
             if member.tools:
-                normal_tools: list[BaseTool] = []
-
                 for tool in member.tools:
                     if tool.name == "ask-human":
                         # Handling Ask-Human tool with HumanNode for context input
                         human_context_node = create_human_review_node(name, "context_input", {"continue": name})
                         build.add_node(f"{name}-ask-human-tool", human_context_node.work)
                         build.add_edge(f"{name}-ask-human-tool", name)
-                    else:
-                        tool_object = await tool.aget_tool()
-                        normal_tools.append(tool_object)
+
+                # Resolve the other tools concurrently
+                normal_tools: list[BaseTool] = await aget_tools([tool for tool in member.tools if tool.name != "ask-human"])
 
                 if normal_tools:
                     # Add node for normal tools
-                    build.add_node(f"{name}-tools", ToolNode(normal_tools))
+                    build.add_node(f"{name}-tools", create_tool_node(normal_tools))
 
                     # Add HumanNode for tool review if member.interrupt is True
                     if member.interrupt:
@@ -576,21 +584,19 @@ async def acreate_sequential_graph(team: Mapping[str, GraphMember], checkpointer
             ),
         )
         if member.tools:
-            normal_tools: list[BaseTool] = []
-
             for tool in member.tools:
                 if tool.name == "ask-human":
                     # Handling Ask-Human tool with HumanNode for context input
                     human_context_node = create_human_review_node(member.name, "context_input", {"continue": member.name})
                     graph.add_node(f"{member.name}-ask-human-tool", human_context_node.work)
                     graph.add_edge(f"{member.name}-ask-human-tool", member.name)
-                else:
-                    tool_object = await tool.aget_tool()
-                    normal_tools.append(tool_object)
+
+            # Resolve the other tools concurrently
+            normal_tools: list[BaseTool] = await aget_tools([tool for tool in member.tools if tool.name != "ask-human"])
 
             if normal_tools:
                 # Add node for normal tools
-                graph.add_node(f"{member.name}-tools", ToolNode(normal_tools))
+                graph.add_node(f"{member.name}-tools", create_tool_node(normal_tools))
 
                 # Add HumanNode for tool review if member.interrupt is True
                 if member.interrupt:
@@ -683,21 +689,19 @@ async def acreate_chatbot_ragbot_searhbot_graph(team: Mapping[str, GraphMember],
     )
     # if member can call tools, then add tool node
     if len(member.tools) >= 1:
-        normal_tools: list[BaseTool] = []
-
         for tool in member.tools:
             if tool.name == "ask-human":
                 # Handling Ask-Human tool with HumanNode for context input
                 human_context_node = create_human_review_node(member.name, "context_input", {"continue": member.name})
                 graph.add_node(f"{member.name}-ask-human-tool", human_context_node.work)
                 graph.add_edge(f"{member.name}-ask-human-tool", member.name)
-            else:
-                tool_object = await tool.aget_tool()
-                normal_tools.append(tool_object)
+
+        # Resolve the other tools concurrently
+        normal_tools: list[BaseTool] = await aget_tools([tool for tool in member.tools if tool.name != "ask-human"])
 
         if normal_tools:
             # Add node for normal tools
-            graph.add_node(f"{member.name}-tools", ToolNode(normal_tools))
+            graph.add_node(f"{member.name}-tools", create_tool_node(normal_tools))
 
             # Add HumanNode for tool review if member.interrupt is True
             if member.interrupt:
@@ -751,6 +755,29 @@ def convert_messages_and_tasks_to_dict(data: Any) -> Any:
         return data
 
 
+def get_checkpoint_durability(team: Team, members: list[Member]) -> CheckpointDurability:
+    """
+    Returns when the checkpoints of the team's runs are written, from CHECKPOINT_DURABILITY by workflow type.
+
+    Teams that can wait for a human write their checkpoint at least when a run is interrupted.
+    """
+    workflow_type = WorkflowType(team.workflow_type)
+    durability = CheckpointDurability(
+        env_settings.CHECKPOINT_DURABILITY.get(workflow_type.value, CheckpointDurability.EVERY_STEP)
+    )
+    if durability != CheckpointDurability.EXIT_ONLY:
+        return durability
+
+    if workflow_type == WorkflowType.WORKFLOW:
+        nodes = team.graphs[0].config.get("nodes", []) if team.graphs else []
+        has_human = any(node.get("type") == "human" for node in nodes)
+    else:
+        has_human = any(
+            member.interrupt or any(skill.name == "ask-human" for skill in member.skills) for member in members
+        )
+    return CheckpointDurability.ON_INTERRUPT_AND_EXIT if has_human else durability
+
+
 async def generator(
     team: Team,
     members: list[Member],
@@ -758,6 +785,7 @@ async def generator(
     thread_id: str,
     interrupt: Interrupt | None = None,
     user_id: str | None = None,
+    stop_event: asyncio.Event | None = None,
 ) -> AsyncGenerator[Any, Any]:
     """Create the graph and stream responses as JSON."""
 
@@ -780,16 +808,28 @@ async def generator(
         for message in messages
     ]
 
+    root: CompiledGraph | None = None
+    snapshot: StateSnapshot | None = None
     try:
-        checkpointer = await get_checkpointer()
+        # The checkpointer is baked into the cached graph, the durability is part of the team's fingerprint
+        checkpointer = with_durability(await get_checkpointer(), get_checkpoint_durability(team, members))
         state: Any = None
         graph_config: dict[str, Any] = {}
         response: Any = None
         interrupt_name = None
+
+        # Reuse the compiled graph when the team has not changed since it was last built
+        fingerprint = compute_team_fingerprint(team, members)
+        cached_root = await compiled_graph_cache.aget_graph(team.id, fingerprint)
+
         if team.workflow_type == WorkflowType.HIERARCHICAL:
             teams = convert_hierarchical_team_to_dict(members)
             team_leader = list(teams.keys())[0]
-            root = await acreate_hierarchical_graph(teams, leader_name=team_leader, checkpointer=checkpointer)
+            root = (
+                cached_root
+                if cached_root is not None
+                else await acreate_hierarchical_graph(teams, leader_name=team_leader, checkpointer=checkpointer)
+            )
             state = {
                 "history": formatted_messages,
                 "messages": [],
@@ -800,7 +840,7 @@ async def generator(
 
         elif team.workflow_type == WorkflowType.SEQUENTIAL:
             member_dict = convert_sequential_team_to_dict(members)
-            root = await acreate_sequential_graph(member_dict, checkpointer)
+            root = cached_root if cached_root is not None else await acreate_sequential_graph(member_dict, checkpointer)
             first_member = list(member_dict.values())[0]
             state = {
                 "history": formatted_messages,
@@ -820,7 +860,7 @@ async def generator(
 
         elif team.workflow_type == WorkflowType.RAGBOT:
             member_dict = convert_chatbot_ragbot_searchbot_team_to_dict(members, workflow_type=team.workflow_type)
-            root = await acreate_chatbot_ragbot_searhbot_graph(member_dict, checkpointer)
+            root = cached_root if cached_root is not None else await acreate_chatbot_ragbot_searhbot_graph(member_dict, checkpointer)
             first_member = list(member_dict.values())[0]
             state = {
                 "history": formatted_messages,
@@ -839,7 +879,7 @@ async def generator(
             }
         elif team.workflow_type == WorkflowType.CHATBOT:
             member_dict = convert_chatbot_ragbot_searchbot_team_to_dict(members, workflow_type=team.workflow_type)
-            root = await acreate_chatbot_ragbot_searhbot_graph(member_dict, checkpointer)
+            root = cached_root if cached_root is not None else await acreate_chatbot_ragbot_searhbot_graph(member_dict, checkpointer)
             first_member = list(member_dict.values())[0]
             state = {
                 "history": formatted_messages,
@@ -858,7 +898,7 @@ async def generator(
             }
         elif team.workflow_type == WorkflowType.SEARCHBOT:
             member_dict = convert_chatbot_ragbot_searchbot_team_to_dict(members, workflow_type=team.workflow_type)
-            root = await acreate_chatbot_ragbot_searhbot_graph(member_dict, checkpointer)
+            root = cached_root if cached_root is not None else await acreate_chatbot_ragbot_searhbot_graph(member_dict, checkpointer)
             first_member = list(member_dict.values())[0]
             state = {
                 "history": formatted_messages,
@@ -879,7 +919,7 @@ async def generator(
 
             graph_config = team.graphs[0].config
 
-            root = initialize_graph(
+            root = cached_root if cached_root is not None else initialize_graph(
                 graph_config, checkpointer, save_graph_img=False
             )
 
@@ -891,6 +931,9 @@ async def generator(
         else:
             raise ValueError("Unsupported graph type ")
 
+        if cached_root is None:
+            await compiled_graph_cache.aput_graph(team.id, fingerprint, root)
+
         config: RunnableConfig = {
             "configurable": {"thread_id": thread_id},
             "recursion_limit": env_settings.RECURSION_LIMIT,
@@ -922,6 +965,7 @@ async def generator(
                                 id=str(uuid4()),
                             )
                         )
+                    state["all_messages"] = state["messages"]
             elif interrupt.decision == InterruptDecision.REPLIED:
                 current_values = await root.aget_state(config)
                 messages = current_values.values["messages"]
@@ -942,6 +986,7 @@ async def generator(
                             if tool_call["name"] == "ask-human"
                         ]
                     }
+                    state["all_messages"] = state["messages"]
         elif interrupt and interrupt.interaction_type is not None:
             # Enhanced interrupt handling for both custom workflows and traditional workflows with HumanNode
             if interrupt.interaction_type == "tool_review":
@@ -1001,32 +1046,34 @@ async def generator(
             else:
                 raise ValueError(f"Unsupported interrupt type: {interrupt.interaction_type}")
 
-        async for event in root.astream_events(state, version="v2", config=config):
-            # Check if stop has been requested for this user and thread
-            if user_id:
-                from app.core.stream_control import ais_stop_requested
+        # If workflow type and graph_config exists, pass nodes parameter
+        nodes = graph_config["nodes"] if team.workflow_type == WorkflowType.WORKFLOW and hasattr(graph_config, "nodes") else None
+        # Only subscribe to the events that are converted into responses
+        event_filters = (
+            get_stream_event_filters(root, graph_config.get("nodes")) if env_settings.STREAM_EVENT_FILTERING else {}
+        )
 
-                is_stopped = await ais_stop_requested(user_id, thread_id)
-                if is_stopped:
-                    # Send a stop message and break the loop
-                    response = ChatResponse(
-                        type="stop",
-                        content="Stream stopped by user request",
-                        id=str(uuid4()),
-                        name="system",
-                    )
-                    formatted_output = f"data: {response.model_dump_json()}\n\n"
-                    yield formatted_output
-                    break
-
-            # If workflow type and graph_config exists, pass nodes parameter
-            nodes = graph_config["nodes"] if team.workflow_type == WorkflowType.WORKFLOW and hasattr(graph_config, "nodes") else None
-            response = event_to_response(event, nodes=nodes)
-            if response:
+        async for event in root.astream_events(state, version="v2", config=config, **event_filters):
+            # Check if stop has been requested for this stream, the event belongs to this stream so no lock is needed
+            if stop_event is not None and stop_event.is_set():
+                # Send a stop message and break the loop
+                response = ChatResponse(
+                    type="stop",
+                    content="Stream stopped by user request",
+                    id=str(uuid4()),
+                    name="system",
+                )
                 formatted_output = f"data: {response.model_dump_json()}\n\n"
                 yield formatted_output
+                break
 
+            formatted_output = event_to_sse(event, nodes=nodes)
+            if formatted_output:
+                yield formatted_output
+
+        await _aflush_checkpoints(root, thread_id)
         snapshot = await root.aget_state(config)
+
         if snapshot.next:
             try:
                 message = snapshot.values["messages"][-1]
@@ -1103,3 +1150,20 @@ async def generator(
         yield f"data: {response.model_dump_json()}\n\n"
         await asyncio.sleep(0.1)  # Add a small delay to ensure the message is sent
         raise e
+    finally:
+        # Failed, stopped and cancelled runs keep the state they reached
+        if root is not None:
+            await _aflush_checkpoints(root, thread_id)
+
+            # Project the messages of this run for the thread history, the run itself must not fail on it
+            try:
+                if snapshot is None:
+                    snapshot = await root.aget_state({"configurable": {"thread_id": thread_id}})
+                await aproject_thread_messages(thread_id, get_state_messages(snapshot.values))
+            except Exception as e:
+                logger.warning(f"Could not project the messages of thread {thread_id}: {e}")
+
+
+async def _aflush_checkpoints(root: CompiledGraph, thread_id: str) -> None:
+    if isinstance(root.checkpointer, DeferredCheckpointSaver):
+        await root.checkpointer.aflush(thread_id)
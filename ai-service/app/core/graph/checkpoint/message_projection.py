@@ -0,0 +1,182 @@
+"""
+Append-only projection of thread messages.
+
+After every run the messages of the thread state are upserted into the thread_messages
+table, starting at the last message projected before. Thread history and title
+generation read from that table with keyset pagination instead of loading and
+deserialising the thread's latest checkpoint. Threads created before the projection
+are backfilled from their checkpoint the first time their history is read.
+"""
+
+from typing import Any
+
+from langchain_core.messages import AnyMessage
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import logging
+from app.core.db_session import AsyncSessionLocal
+from app.core.graph.checkpoint.utils import (
+    convert_message_to_response,
+    get_checkpoint_tuples,
+    get_pending_interrupt,
+    get_state_messages,
+)
+from app.core.graph.messages import ChatResponse
+from app.db_models.thread_message import ThreadMessage
+
+logger = logging.get_logger(__name__)
+
+# --- Constants ---
+# Rows per insert statement
+PROJECTION_BATCH_SIZE = 500
+# Columns refreshed when an already projected message changed
+UPDATABLE_COLUMNS = ("role", "name", "content", "imgdata", "tool_calls", "tool_output", "documents")
+
+
+async def aproject_thread_messages(thread_id: str, messages: list[AnyMessage]) -> int:
+    """
+    Project the messages of a thread state that were not projected yet.
+
+    Args:
+        thread_id: The thread identifier
+        messages: All messages of the thread state, oldest first.
+
+    Returns:
+        int: The number of messages written.
+    """
+    responses = [response for response in map(convert_message_to_response, messages) if response is not None]
+    if not responses:
+        return 0
+
+    async with AsyncSessionLocal() as session:
+        last_message_id = await session.scalar(
+            select(ThreadMessage.message_id)
+            .where(ThreadMessage.thread_id == thread_id)
+            .order_by(ThreadMessage.seq.desc())
+            .limit(1)
+        )
+
+        # Resume at the last projected message, it is written again in case it changed since.
+        # If it is not part of the state anymore every message is upserted.
+        start = 0
+        if last_message_id is not None:
+            for index in range(len(responses) - 1, -1, -1):
+                if responses[index].id == last_message_id:
+                    start = index
+                    break
+
+        # One row per message id, a statement cannot upsert the same row twice
+        rows: dict[str, dict[str, Any]] = {}
+        for response in responses[start:]:
+            rows[response.id] = _to_row(thread_id, response)
+        values = list(rows.values())
+
+        for i in range(0, len(values), PROJECTION_BATCH_SIZE):
+            statement = insert(ThreadMessage).values(values[i : i + PROJECTION_BATCH_SIZE])
+            statement = statement.on_conflict_do_update(
+                constraint="uq_thread_messages_thread_id_message_id",
+                set_={column: statement.excluded[column] for column in UPDATABLE_COLUMNS},
+            )
+            await session.execute(statement)
+        await session.commit()
+
+    return len(values)
+
+
+async def aget_thread_messages(
+    session: AsyncSession,
+    thread_id: str,
+    limit: int,
+    before_seq: int | None = None,
+) -> tuple[list[ChatResponse], int | None]:
+    """
+    Get a page of the messages of a thread, oldest first.
+
+    Args:
+        session: The database session
+        thread_id: The thread identifier
+        limit: The maximum number of messages to return.
+        before_seq: Return the messages before this cursor, None for the latest messages.
+
+    Returns:
+        tuple: The messages, and the cursor of the previous page or None if there is none.
+    """
+    statement = select(ThreadMessage).where(ThreadMessage.thread_id == thread_id)
+    if before_seq is not None:
+        statement = statement.where(ThreadMessage.seq < before_seq)
+    statement = statement.order_by(ThreadMessage.seq.desc()).limit(limit + 1)
+
+    result = await session.execute(statement)
+    rows = list(result.scalars().all())
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    rows.reverse()
+
+    messages = [_to_response(row) for row in rows]
+    # The latest page ends with the interrupt awaiting the user, if any
+    if before_seq is None and messages:
+        interrupt = get_pending_interrupt(messages[-1])
+        if interrupt is not None:
+            messages.append(interrupt)
+
+    next_cursor = rows[0].seq if has_more else None
+    return messages, next_cursor
+
+
+async def aget_first_thread_messages(session: AsyncSession, thread_id: str, limit: int) -> list[ChatResponse]:
+    """
+    Get the first messages of a thread, oldest first.
+    """
+    statement = (
+        select(ThreadMessage)
+        .where(ThreadMessage.thread_id == thread_id)
+        .order_by(ThreadMessage.seq)
+        .limit(limit)
+    )
+    result = await session.execute(statement)
+    return [_to_response(row) for row in result.scalars().all()]
+
+
+async def abackfill_thread_messages(thread_id: str) -> int:
+    """
+    Project the messages of a thread from its latest checkpoint, for threads that predate the projection.
+
+    Returns:
+        int: The number of messages written.
+    """
+    checkpoint_tuple = await get_checkpoint_tuples(thread_id)
+    if checkpoint_tuple is None:
+        return 0
+
+    written = await aproject_thread_messages(thread_id, get_state_messages(checkpoint_tuple.checkpoint["channel_values"]))
+    logger.info(f"Backfilled {written} messages of thread {thread_id} from its checkpoint")
+    return written
+
+
+def _to_row(thread_id: str, response: ChatResponse) -> dict[str, Any]:
+    return {
+        "thread_id": thread_id,
+        "message_id": response.id,
+        "role": response.type,
+        "name": response.name,
+        "content": response.content,
+        "imgdata": response.imgdata,
+        "tool_calls": [dict(tool_call) for tool_call in response.tool_calls] if response.tool_calls is not None else None,
+        "tool_output": response.tool_output,
+        "documents": response.documents,
+    }
+
+
+def _to_response(row: ThreadMessage) -> ChatResponse:
+    return ChatResponse(
+        type=row.role,
+        id=row.message_id,
+        name=row.name,
+        content=row.content,
+        imgdata=row.imgdata,
+        tool_calls=row.tool_calls,  # type: ignore[arg-type]
+        tool_output=row.tool_output,
+        documents=row.documents,
+    )
@@ -23,97 +23,112 @@ def convert_checkpoint_tuple_to_messages(
         list[ChatResponse]: A list of formatted messages.
     """
     checkpoint = checkpoint_tuple.checkpoint
-    all_messages: list[AnyMessage] = (
-            checkpoint["channel_values"]["all_messages"]
-            + checkpoint["channel_values"]["messages"]
-    )
+    all_messages = get_state_messages(checkpoint["channel_values"])
     formatted_messages: list[ChatResponse] = []
     for message in all_messages:
-        if isinstance(message, HumanMessage):
-            content = ""
-            imgdata = None
-
-            if isinstance(message.content, list):
-                for c in message.content:
-                    if isinstance(c, dict):
-                        if c.get("type") == "text":
-                            content += c.get("text", "")
-                        elif c.get("type") == "image_url":
-                            imgdata = c.get("image_url", {}).get("url")
-            else:
-                content = message.content
-
-            formatted_messages.append(
-                ChatResponse(
-                    type="human",
-                    id=message.id if message.id is not None else str(uuid4()),
-                    name=message.name or "",
-                    content=content,
-                    imgdata=imgdata,
-                )
-            )
-        elif (
-                isinstance(message, AIMessage)
-                and message.id
-                and message.name
-                and isinstance(message.content, str)
-        ):
-            formatted_messages.append(
-                ChatResponse(
-                    type="ai",
-                    id=message.id if message.id is not None else str(uuid4()),
-                    name=message.name or "",
-                    tool_calls=message.tool_calls,
-                    content=message.content,
-                )
-            )
-        elif isinstance(message, ToolMessage) and message.name:
-            documents: list[dict[str, Any]] = []
-            if message.name == "KnowledgeBase":
-                docs: list[Document] = message.artifact
-                for doc in docs:
-                    documents.append(
-                        {
-                            "score": doc.metadata["score"],
-                            "content": doc.page_content,
-                        }
-                    )
-            formatted_messages.append(
-                ChatResponse(
-                    type="tool",
-                    id=message.tool_call_id,
-                    name=message.name,
-                    tool_output=json.dumps(message.content),
-                    documents=json.dumps(documents),
-                )
-            )
-        else:
-            continue
-
-    last_message = all_messages[-1]
-    if last_message.type == "ai" and last_message.tool_calls:
-        # Check if any tool in last message is asking for human input
-        for tool_call in last_message.tool_calls:
-            if tool_call["name"] == "ask-human":
-                formatted_messages.append(
-                    ChatResponse(
-                        type="interrupt",
-                        name="human",
-                        tool_calls=last_message.tool_calls,
-                        id=str(uuid4()),
-                    )
-                )
-                break
+        formatted_message = convert_message_to_response(message)
+        if formatted_message is not None:
+            formatted_messages.append(formatted_message)
+
+    interrupt = get_pending_interrupt(all_messages[-1]) if all_messages else None
+    if interrupt is not None:
+        formatted_messages.append(interrupt)
+    return formatted_messages
+
+
+def get_state_messages(values: dict[str, Any]) -> list[AnyMessage]:
+    """
+    Return the messages of a thread state, all_messages followed by the pending messages not in it yet.
+    """
+    all_messages = values.get("all_messages", [])
+    ids = {message.id for message in all_messages}
+    return all_messages + [message for message in values.get("messages", []) if message.id not in ids]
+
+
+def convert_message_to_response(message: AnyMessage) -> ChatResponse | None:
+    """
+    Convert a message to a ChatResponse, None for messages that are not shown in the history.
+    """
+    if isinstance(message, HumanMessage):
+        content = ""
+        imgdata = None
+
+        if isinstance(message.content, list):
+            for c in message.content:
+                if isinstance(c, dict):
+                    if c.get("type") == "text":
+                        content += c.get("text", "")
+                    elif c.get("type") == "image_url":
+                        imgdata = c.get("image_url", {}).get("url")
         else:
-            formatted_messages.append(
-                ChatResponse(
-                    type="interrupt",
-                    name="interrupt",
-                    tool_calls=last_message.tool_calls,
-                    id=str(uuid4()),
+            content = message.content
+
+        return ChatResponse(
+            type="human",
+            id=message.id if message.id is not None else str(uuid4()),
+            name=message.name or "",
+            content=content,
+            imgdata=imgdata,
+        )
+    elif (
+            isinstance(message, AIMessage)
+            and message.id
+            and message.name
+            and isinstance(message.content, str)
+    ):
+        return ChatResponse(
+            type="ai",
+            id=message.id if message.id is not None else str(uuid4()),
+            name=message.name or "",
+            tool_calls=message.tool_calls,
+            content=message.content,
+        )
+    elif isinstance(message, ToolMessage) and message.name:
+        documents: list[dict[str, Any]] = []
+        if message.name == "KnowledgeBase":
+            docs: list[Document] = message.artifact
+            for doc in docs:
+                documents.append(
+                    {
+                        "score": doc.metadata["score"],
+                        "content": doc.page_content,
+                    }
                 )
+        return ChatResponse(
+            type="tool",
+            id=message.tool_call_id,
+            name=message.name,
+            tool_output=json.dumps(message.content),
+            documents=json.dumps(documents),
+        )
+    return None
+
+
+def get_pending_interrupt(last_message: Any) -> ChatResponse | None:
+    """
+    Return the interrupt awaiting the user when the last message of a thread is a tool call.
+
+    Args:
+        last_message: The last message of the thread, a message or a ChatResponse.
+    """
+    if last_message.type != "ai" or not last_message.tool_calls:
+        return None
+
+    # Check if any tool in last message is asking for human input
+    for tool_call in last_message.tool_calls:
+        if tool_call["name"] == "ask-human":
+            return ChatResponse(
+                type="interrupt",
+                name="human",
+                tool_calls=last_message.tool_calls,
+                id=str(uuid4()),
             )
-    return formatted_messages
+    return ChatResponse(
+        type="interrupt",
+        name="interrupt",
+        tool_calls=last_message.tool_calls,
+        id=str(uuid4()),
+    )
 
 
 async def get_checkpoint_tuples(thread_id: str) -> CheckpointTuple | None:
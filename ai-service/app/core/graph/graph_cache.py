@@ -0,0 +1,215 @@
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Optional
+from typing import OrderedDict as OrderedDictType
+
+from langgraph.graph.graph import CompiledGraph
+from sqlalchemy import inspect
+
+from app.core import logging
+from app.core.enums import WorkflowType
+from app.core.settings import env_settings
+from app.db_models import Member, Skill, Team
+
+logger = logging.get_logger(__name__)
+
+# --- Constants ---
+MAX_CACHED_GRAPHS = env_settings.MAX_CACHED_GRAPHS
+
+
+def compute_team_fingerprint(team: Team, members: list[Member]) -> str:
+    """
+    Computes a content hash of everything a compiled team graph is built from.
+
+    The hash covers the team's workflow type, every member's configuration,
+    the skills and uploads linked to each member, the MCP and extension
+    connections the skills' tools are loaded from and the team's graph configs,
+    so any change to those rows produces a new fingerprint (and thereby a new
+    cache version).
+
+    Args:
+        team: The team being streamed.
+        members: The team's members with skills, their connections and uploads loaded.
+
+    Returns:
+        A hex digest identifying the current version of the team.
+    """
+    payload: dict[str, Any] = {
+        "team_id": team.id,
+        "workflow_type": team.workflow_type,
+        "members": [
+            {
+                "id": member.id,
+                "name": member.name,
+                "type": member.type,
+                "source": member.source,
+                "role": member.role,
+                "backstory": member.backstory,
+                "provider": member.provider,
+                "model": member.model,
+                "temperature": member.temperature,
+                "interrupt": member.interrupt,
+                "skills": sorted(
+                    (
+                        {
+                            "id": skill.id,
+                            "name": skill.name,
+                            "display_name": skill.display_name,
+                            "strategy": skill.strategy,
+                            "tool_definition": skill.tool_definition,
+                            "reference_type": skill.reference_type,
+                            "extension_id": skill.extension_id,
+                            "mcp_id": skill.mcp_id,
+                            "connection": _connection_fingerprint(skill),
+                        }
+                        for skill in member.skills
+                    ),
+                    key=lambda skill: skill["id"],
+                ),
+                "uploads": sorted(
+                    (
+                        {
+                            "id": upload.id,
+                            "name": upload.name,
+                            "description": upload.description,
+                            "user_id": upload.user_id,
+                        }
+                        for upload in member.uploads
+                    ),
+                    key=lambda upload: upload["id"],
+                ),
+            }
+            for member in sorted(members, key=lambda member: member.id)
+        ],
+        "graphs": (
+            [{"id": graph.id, "config": graph.config} for graph in team.graphs]
+            if team.workflow_type == WorkflowType.WORKFLOW
+            else []
+        ),
+    }
+    serialized = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def _connection_fingerprint(skill: Skill) -> Optional[dict[str, Any]]:
+    # The connection of a skill, if it was loaded with it. Secrets only enter the hash.
+    state = inspect(skill)
+    if skill.mcp_id is not None and "mcp" not in state.unloaded and skill.mcp is not None:
+        return {
+            "url": skill.mcp.url,
+            "transport": skill.mcp.transport,
+            "is_deleted": skill.mcp.is_deleted,
+        }
+    if skill.extension_id is not None and "extension" not in state.unloaded and skill.extension is not None:
+        return {
+            "connection_status": skill.extension.connection_status,
+            "connected_account_id": skill.extension.connected_account_id,
+            "auth_scheme": skill.extension.auth_scheme,
+            "auth_value": skill.extension.auth_value,
+            "is_deleted": skill.extension.is_deleted,
+        }
+    return None
+
+
+class CompiledGraphCache:
+    """
+    Caches compiled LangGraph graphs per team.
+    Entries are keyed by team id and versioned by the team's content fingerprint,
+    so only the latest compiled version of a team is kept. The cache is bounded
+    and evicts the least recently used team when full.
+    """
+
+    def __init__(self):
+        """
+        Initializes the CompiledGraphCache.
+        - Initializes an LRU cache for compiled graphs.
+        - Sets up a lock for async-safe operations.
+        """
+        # LRU Cache for compiled graphs.
+        # Key: team_id (str), Value: (fingerprint, CompiledGraph)
+        self.graph_cache: OrderedDictType[str, tuple[str, CompiledGraph]] = OrderedDict()
+
+        # Lock for ensuring async-safety when accessing/modifying the graph_cache.
+        self.cache_lock = asyncio.Lock()
+
+        if MAX_CACHED_GRAPHS <= 0:
+            logger.warning("MAX_CACHED_GRAPHS is non-positive. Graph cache will be disabled.")
+
+    async def aget_graph(self, team_id: str, fingerprint: str) -> Optional[CompiledGraph]:
+        """
+        Retrieves the compiled graph of a team if the cached version matches the fingerprint.
+
+        Args:
+            team_id: The team's ID.
+            fingerprint: The team's current content fingerprint.
+
+        Returns:
+            The cached CompiledGraph, or None on a miss or a stale version.
+        """
+        if MAX_CACHED_GRAPHS <= 0:
+            return None
+
+        async with self.cache_lock:
+            entry = self.graph_cache.get(team_id)
+            if entry is None:
+                return None
+
+            cached_fingerprint, graph = entry
+            if cached_fingerprint != fingerprint:
+                # The team changed since the graph was compiled, drop the stale version
+                del self.graph_cache[team_id]
+                logger.debug(f"Compiled graph for team '{team_id}' is stale. Removed from cache.")
+                return None
+
+            self.graph_cache.move_to_end(team_id)  # Mark as recently used
+            return graph
+
+    async def aput_graph(self, team_id: str, fingerprint: str, graph: CompiledGraph) -> None:
+        """
+        Adds or replaces the compiled graph of a team.
+        Uses LRU eviction when the cache is full.
+
+        Args:
+            team_id: The team's ID.
+            fingerprint: The content fingerprint the graph was compiled from.
+            graph: The compiled graph.
+        """
+        if MAX_CACHED_GRAPHS <= 0:
+            return
+
+        async with self.cache_lock:
+            if team_id in self.graph_cache:
+                self.graph_cache.move_to_end(team_id)
+            elif len(self.graph_cache) >= MAX_CACHED_GRAPHS:
+                # Evict the least recently used team (oldest item)
+                evicted_team_id, _ = self.graph_cache.popitem(last=False)
+                logger.info(
+                    f"Graph cache limit ({MAX_CACHED_GRAPHS}) reached. "
+                    f"Evicted team '{evicted_team_id}' to make space for team '{team_id}'."
+                )
+
+            self.graph_cache[team_id] = (fingerprint, graph)
+
+    async def ainvalidate_team(self, team_id: str) -> None:
+        """
+        Removes the compiled graph of a team from the cache.
+
+        Args:
+            team_id: The team's ID.
+        """
+        async with self.cache_lock:
+            if self.graph_cache.pop(team_id, None) is not None:
+                logger.debug(f"Compiled graph for team '{team_id}' invalidated.")
+
+    async def aclear(self) -> None:
+        """
+        Removes all compiled graphs from the cache.
+        """
+        async with self.cache_lock:
+            self.graph_cache.clear()
+
+
+# Singleton instance of CompiledGraphCache
+compiled_graph_cache = CompiledGraphCache()
@@ -11,7 +11,6 @@ from langchain_core.runnables import (
 )
 from langchain_core.tools import BaseTool
 from langchain_openai import ChatOpenAI
-from langgraph.graph import add_messages
 from typing_extensions import NotRequired, TypedDict
 
 from app.core.model_providers.model_provider_manager import model_provider_manager
@@ -21,16 +20,18 @@ from app.core.state import (
     GraphMember,
     GraphTeam,
     add_or_replace_messages,
+    aget_tools,
+    append_messages,
 )
 from app.core.tools.tool_args_sanitizer import sanitize_tool_calls_list
 
 
 class GraphTeamState(TypedDict):
     all_messages: Annotated[
-        list[AnyMessage], add_messages
+        list[AnyMessage], append_messages
     ]  # Stores all messages in this thread
     messages: Annotated[list[AnyMessage], add_or_replace_messages]
-    history: Annotated[list[AnyMessage], add_messages]
+    history: Annotated[list[AnyMessage], append_messages]
     team: GraphTeam
     next: str
     main_task: list[AnyMessage]
@@ -202,10 +203,7 @@ class WorkerNode(BaseNode):
         )
         # If member has no tools, then use a regular model instead of an agent
         if len(member.tools) >= 1:
-            tools: list[BaseTool] = []
-            for tool in member.tools:
-                tool_instance = await tool.aget_tool()
-                tools.append(tool_instance)
+            tools: list[BaseTool] = await aget_tools(member.tools)
             chain = prompt | self.model.bind_tools(tools)
         else:
             chain: RunnableSerializable[dict[str, Any], AnyMessage] = (  # type: ignore[no-redef]
@@ -218,12 +216,12 @@ class WorkerNode(BaseNode):
         result: AIMessage = await self._handle_messages(state, config, work_chain)
 
         if result.tool_calls:
-            return {"messages": [result]}
+            return {"messages": [result], "all_messages": [result]}
         else:
             return {
                 "history": [result],
                 "messages": [],
-                "all_messages": state["messages"] + [result],
+                "all_messages": [result],
             }
 
 
@@ -270,10 +268,7 @@ class SequentialWorkerNode(WorkerNode):
         prompt = self.worker_prompt.partial(persona=member.persona, history_string=self.get_optimized_context_string(state["history"]))
         # If member has no tools, then use a regular model instead of an agent
         if len(member.tools) >= 1:
-            tools: list[BaseTool] = []
-            for tool in member.tools:
-                tool_instance = await tool.aget_tool()
-                tools.append(tool_instance)
+            tools: list[BaseTool] = await aget_tools(member.tools)
             chain = prompt | self.model.bind_tools(tools)
         else:
             chain: RunnableSerializable[dict[str, Any], AnyMessage] = (  # type: ignore[no-redef]
@@ -288,14 +283,14 @@ class SequentialWorkerNode(WorkerNode):
         next: str | None
         if result.tool_calls:
             next = name
-            return {"messages": [result], "next": next}
+            return {"messages": [result], "all_messages": [result], "next": next}
         else:
             next = self.get_next_member_in_sequence(team.members, name)
             return {
                 "history": [result],
                 "messages": [],
                 "next": next,
-                "all_messages": state["messages"] + [result],
+                "all_messages": [result],
             }
 
 
@@ -513,10 +508,7 @@ class ChatBotNode(BaseNode):
         prompt = self.worker_prompt.partial(persona=member.persona, history_string=self.get_optimized_context_string(state["history"]))
         # If member has no tools, then use a regular model instead of an agent
         if len(member.tools) >= 1:
-            tools: list[BaseTool] = []
-            for tool in member.tools:
-                tool_instance = await tool.aget_tool()
-                tools.append(tool_instance)
+            tools: list[BaseTool] = await aget_tools(member.tools)
             chain = prompt | self.model.bind_tools(tools)
         else:
             chain: RunnableSerializable[dict[str, Any], AnyMessage] = (  # type: ignore[no-redef]
@@ -529,12 +521,12 @@ class ChatBotNode(BaseNode):
         result: AIMessage = await self._handle_messages(state, config, work_chain)
 
         if result.tool_calls:
-            return {"messages": [result]}
+            return {"messages": [result], "all_messages": [result]}
         else:
             return {
                 "history": [result],
                 "messages": [],
-                "all_messages": state["messages"] + [result],
+                "all_messages": [result],
             }
 
 
@@ -574,10 +566,7 @@ class RAGBotNode(BaseNode):
         prompt = self.worker_prompt.partial(persona=member.persona, history_string=self.get_optimized_context_string(state["history"]))
         # If member has no tools, then use a regular model instead of an agent
         if len(member.tools) >= 1:
-            tools: list[BaseTool] = []
-            for tool in member.tools:
-                tool_instance = await tool.aget_tool()
-                tools.append(tool_instance)
+            tools: list[BaseTool] = await aget_tools(member.tools)
             chain = prompt | self.model.bind_tools(tools)
         else:
             chain: RunnableSerializable[dict[str, Any], AnyMessage] = (  # type: ignore[no-redef]
@@ -590,10 +579,10 @@ class RAGBotNode(BaseNode):
         result: AIMessage = await self._handle_messages(state, config, work_chain)
 
         if result.tool_calls:
-            return {"messages": [result]}
+            return {"messages": [result], "all_messages": [result]}
         else:
             return {
                 "history": [result],
                 "messages": [],
-                "all_messages": state["messages"] + [result],
+                "all_messages": [result],
             }
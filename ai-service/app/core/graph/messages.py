@@ -1,4 +1,5 @@
 import json
+from json.encoder import encode_basestring
 from typing import Any, Dict, Optional
 
 from langchain_core.documents import Document
@@ -14,6 +15,15 @@ from langchain_core.messages import (
 from langchain_core.runnables.schema import StreamEvent
 from pydantic import BaseModel
 
+# Run types whose events event_to_response converts. Chain events are only converted for workflow
+# nodes whose id starts with one of STREAMED_NODE_PREFIXES.
+STREAMED_RUN_TYPES = ("chat_model", "tool")
+STREAMED_NODE_PREFIXES = ("answer", "retrieval", "crewai", "classifier", "code")
+
+# Serialised form of a token chunk, identical to ChatResponse.model_dump_json() with only type, id, name and content set
+_STREAM_CHUNK_PREFIX = 'data: {"type":"ai",'
+_STREAM_CHUNK_SUFFIX = ',"imgdata":null,"tool_calls":[],"tool_output":null,"documents":null,"next":null}\n\n'
+
 
 def get_node_label(node_id: str, nodes: list[Dict[str, Any]] | None = None) -> str:
     """Get node label from node id"""
@@ -292,3 +302,72 @@ def event_to_response(
                 )
 
     return None
+
+
+def get_stream_event_filters(graph: Any, nodes: list[Dict[str, Any]] | None = None) -> dict[str, Any]:
+    """
+    Returns astream_events keyword arguments that restrict streaming to the events event_to_response converts.
+
+    Node names are collected from the graph and its nested subgraphs. Workflow subgraph nodes load their
+    graph at run time, so their node names cannot be known up front and no filter is applied.
+    """
+    if nodes and any(node.get("type") == "subgraph" for node in nodes):
+        return {}
+
+    try:
+        node_names = set(graph.nodes)
+        for _, subgraph in graph.get_subgraphs(recurse=True):
+            node_names.update(subgraph.nodes)
+    except Exception:
+        return {}
+
+    return {
+        "include_types": list(STREAMED_RUN_TYPES),
+        "include_names": sorted(name for name in node_names if name.startswith(STREAMED_NODE_PREFIXES)),
+    }
+
+
+def format_stream_chunk(run_id: str, name: str, content: str) -> str:
+    """Serialise an ai token chunk into a server-sent event line."""
+    return (
+        f'{_STREAM_CHUNK_PREFIX}"id":{encode_basestring(run_id)},'
+        f'"name":{encode_basestring(name)},"content":{encode_basestring(content)}{_STREAM_CHUNK_SUFFIX}'
+    )
+
+
+def parse_stream_chunk(line: str) -> tuple[str, str, str] | None:
+    """Returns (id, name, content) of a line written by format_stream_chunk, or None for any other line."""
+    if not (line.startswith(_STREAM_CHUNK_PREFIX) and line.endswith(_STREAM_CHUNK_SUFFIX)):
+        return None
+    data = json.loads(line[len("data: ") :])
+    return data["id"], data["name"], data["content"]
+
+
+def event_to_sse(event: StreamEvent, nodes: list[Dict[str, Any]] | None = None) -> str | None:
+    """
+    Convert event to a server-sent event line.
+
+    Token chunks of on_chat_model_stream, by far the most frequent event, are serialised directly
+    into a fixed template instead of building and dumping a ChatResponse.
+    """
+    if event["event"] == "on_chat_model_stream":
+        message_chunk = event.get("data", {}).get("chunk")
+        if isinstance(message_chunk, AIMessageChunk) and not message_chunk.tool_calls:
+            content = message_chunk.content
+            if isinstance(content, list):
+                content = "".join(
+                    c if isinstance(c, str) else c.get("text", "")
+                    for c in content
+                    if isinstance(c, str) or (isinstance(c, dict) and c.get("type") == "text")
+                )
+            if not content:
+                return None
+
+            node_id = event.get("metadata", {}).get("langgraph_node", "unknown")
+            name = get_node_label(node_id, nodes) if nodes else node_id
+            return format_stream_chunk(str(event["run_id"]), name, content)
+
+    response = event_to_response(event, nodes=nodes)
+    if response:
+        return f"data: {response.model_dump_json()}\n\n"
+    return None
@@ -0,0 +1,144 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+from app.core import logging
+from app.core.graph.messages import format_stream_chunk, parse_stream_chunk
+from app.core.settings import env_settings
+
+logger = logging.get_logger(__name__)
+
+# --- Constants ---
+# Frames buffered between the graph and the client before the graph is paused
+MAX_BUFFERED_FRAMES = 256
+
+_END_OF_STREAM = object()
+
+
+def _split_event_id(frame: str) -> tuple[str, str]:
+    # Splits the optional "id:" line of a buffered event from its data
+    if frame.startswith("id: "):
+        newline = frame.index("\n") + 1
+        return frame[:newline], frame[newline:]
+    return "", frame
+
+
+async def acoalesce_stream(frames: AsyncIterator[str], flush_interval_ms: int, max_bytes: int) -> AsyncIterator[str]:
+    """
+    Merges consecutive token chunks of the same message into fewer server-sent events.
+
+    Token chunks are accumulated per message id and flushed once flush_interval_ms elapsed since the
+    first buffered chunk or max_bytes of content are buffered. Every other frame (tool calls, tool
+    output, interrupts, stop and error events) flushes the buffer and is forwarded immediately, so
+    the order of events is preserved.
+
+    The source is consumed by a separate task, which lets the flush interval elapse while the graph
+    is busy between tokens.
+
+    Args:
+        frames: The server-sent events produced by the graph stream.
+        flush_interval_ms: Maximum time a token chunk is held back.
+        max_bytes: Buffered content size that triggers a flush.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=MAX_BUFFERED_FRAMES)
+
+    async def _apump() -> None:
+        try:
+            async for frame in frames:
+                await queue.put(frame)
+            await queue.put(_END_OF_STREAM)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            # Runs the cleanup of the source, e.g. when the consumer went away mid-stream
+            aclose = getattr(frames, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    pump_task = asyncio.create_task(_apump())
+    loop = asyncio.get_running_loop()
+    flush_interval = flush_interval_ms / 1000
+
+    # Buffered chunk: message id, node name, content parts, content size, flush deadline and event id line
+    pending_id: str | None = None
+    pending_name = ""
+    pending_parts: list[str] = []
+    pending_size = 0
+    deadline = 0.0
+    pending_event_id = ""
+
+    def _flush() -> str:
+        nonlocal pending_id, pending_parts, pending_size
+        frame = pending_event_id + format_stream_chunk(pending_id, pending_name, "".join(pending_parts))
+        pending_id, pending_parts, pending_size = None, [], 0
+        return frame
+
+    try:
+        while True:
+            if pending_id is None:
+                item = await queue.get()
+            else:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    yield _flush()
+                    continue
+
+            if item is _END_OF_STREAM:
+                break
+            if isinstance(item, Exception):
+                raise item
+
+            event_id, frame = _split_event_id(item)
+            chunk = parse_stream_chunk(frame)
+            if chunk is None:
+                if pending_id is not None:
+                    yield _flush()
+                yield item
+                continue
+
+            chunk_id, chunk_name, content = chunk
+            if pending_id is not None and (chunk_id != pending_id or chunk_name != pending_name):
+                yield _flush()
+            if pending_id is None:
+                pending_id, pending_name = chunk_id, chunk_name
+                deadline = loop.time() + flush_interval
+
+            # A merged event carries the id of its last chunk, so resuming after it skips all of them
+            pending_event_id = event_id
+            pending_parts.append(content)
+            pending_size += len(content.encode("utf-8"))
+            if pending_size >= max_bytes:
+                yield _flush()
+
+        if pending_id is not None:
+            yield _flush()
+    finally:
+        # Closes this subscription when the client disconnects, the run itself keeps going
+        pump_task.cancel()
+        try:
+            await pump_task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"Error closing coalesced stream: {e}")
+
+
+def create_streaming_response(frames: AsyncIterator[str], coalesce: bool = False) -> StreamingResponse:
+    """
+    Returns the server-sent event response of a stream, coalescing token chunks when requested.
+    """
+    if coalesce:
+        frames = acoalesce_stream(
+            frames,
+            flush_interval_ms=env_settings.STREAM_COALESCE_INTERVAL_MS,
+            max_bytes=env_settings.STREAM_COALESCE_MAX_BYTES,
+        )
+
+    return StreamingResponse(
+        frames,
+        media_type="text/event-stream",
+    )
@@ -1,3 +1,4 @@
+import asyncio
 import socket
 from contextlib import asynccontextmanager
 
@@ -6,6 +7,10 @@ from fastapi import FastAPI
 
 from app.core import logging
 from app.core.db_session import async_engine
+from app.core.graph.graph_cache import compiled_graph_cache
+from app.core.redis_client import aclose_redis_client
+from app.core.stream_buffer import stream_buffers
+from app.core.stream_control import stream_control
 from app.db_models import Base
 from app.memory.checkpoint import AsyncPostgresPool
 
@@ -46,9 +51,26 @@ async def lifespan(app: FastAPI):
             await conn.run_sync(Base.metadata.create_all)
             logger.info("Database migrations completed")
 
+        # Warm up the shared vector store, this also creates any missing vector indexes
+        try:
+            from app.core.rag.pgvector import get_pgvector_store
+
+            await asyncio.to_thread(get_pgvector_store)
+        except Exception as e:
+            logger.warning(f"Vector store warm-up failed, it will be initialised on first use: {e}")
+
+        # Subscribe to stream stop requests published by other workers
+        await stream_control.astart()
+
         # Manually resolve dependencies at startup
         # checkpointer = await get_checkpointer()
 
         yield
     finally:
+        await stream_control.aclose()
+        await stream_buffers.aclose()
+        await aclose_redis_client()
+
+        # Compiled graphs hold checkpointers bound to the pool being torn down
+        await compiled_graph_cache.aclear()
         await AsyncPostgresPool.atear_down()
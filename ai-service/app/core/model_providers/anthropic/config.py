@@ -50,10 +50,13 @@ SUPPORTED_MODELS = [
     },
 ]
 
+# Index of SUPPORTED_MODELS by model name
+SUPPORTED_MODELS_BY_NAME = {m["name"]: m for m in SUPPORTED_MODELS}
+
 
 def init_model(model: str, temperature: float, api_key: str, base_url: str, **kwargs):
     """Initialize a ChatAnthropic model for LangChain."""
-    model_info = next((m for m in SUPPORTED_MODELS if m["name"] == model), None)
+    model_info = SUPPORTED_MODELS_BY_NAME.get(model)
     if model_info and ModelCategory.CHAT in model_info["categories"]:
         return ChatAnthropic(
             model_name=model,
@@ -78,7 +81,7 @@ def init_model(model: str, temperature: float, api_key: str, base_url: str, **kw
 
 def init_crewai_model(model: str, api_key: str, base_url: str, **kwargs):
     """Initialize an Anthropic model for CrewAI."""
-    model_info = next((m for m in SUPPORTED_MODELS if m["name"] == model), None)
+    model_info = SUPPORTED_MODELS_BY_NAME.get(model)
     if model_info and ModelCategory.CHAT in model_info["categories"]:
         return LLM(
             model=f"anthropic/{model}",  # CrewAI format: provider/model
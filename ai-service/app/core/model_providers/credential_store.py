@@ -0,0 +1,136 @@
+"""
+TTL cache of the provider credentials and model metadata stored in the database.
+
+Looking up a provider's API key or a model's embedding dimension used to run a synchronous
+query on every call. Entries are now kept for PROVIDER_CREDENTIAL_CACHE_TTL_SECONDS and
+dropped as soon as a ModelProvider or Model row of this process changes. Changes made by
+other workers become visible once the entry expired.
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core import logging
+from app.core.model_providers.model_provider_manager import model_provider_manager
+from app.core.settings import env_settings
+from app.core.workflow.utils.db_utils import db_operation
+from app.db_models import Model, ModelProvider
+
+logger = logging.get_logger(__name__)
+
+# --- Constants ---
+CREDENTIAL_CACHE_TTL_SECONDS = env_settings.PROVIDER_CREDENTIAL_CACHE_TTL_SECONDS
+
+T = TypeVar("T")
+
+
+class ProviderCredentialStore:
+    """
+    Caches the database lookups of provider credentials and model metadata.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        # Key: ("api_key", provider_name) or ("dimension", provider_name, model_name), Value: (expires at, value)
+        self._entries: dict[tuple[str, ...], tuple[float, Any]] = {}
+        # Lookups run in worker threads as well as on the event loop
+        self._lock = threading.Lock()
+
+    def get_api_key(self, provider_name: str) -> str:
+        """
+        Returns the decrypted API key of a provider.
+
+        Raises:
+            ValueError: If the provider does not exist.
+        """
+
+        def _get_api_key(session: Session) -> str:
+            provider = session.execute(
+                select(ModelProvider).where(ModelProvider.provider_name == provider_name)
+            ).scalars().first()
+            if not provider:
+                raise ValueError(f"Provider {provider_name} not found")
+            return provider.decrypted_api_key
+
+        return self._get_or_load(("api_key", provider_name), lambda: db_operation(_get_api_key))
+
+    def get_embedding_dimension(self, provider_name: str, model_name: str) -> int:
+        """
+        Returns the embedding dimension of a model, from the database or else from the provider's configuration.
+
+        Raises:
+            ValueError: If the provider does not exist or the dimension is unknown.
+        """
+
+        def _get_dimension(session: Session) -> int:
+            provider = session.execute(
+                select(ModelProvider.id).where(ModelProvider.provider_name == provider_name)
+            ).first()
+            if not provider:
+                raise ValueError(f"Provider {provider_name} not found")
+
+            model = session.execute(select(Model).where(Model.ai_model_name == model_name)).scalars().first()
+
+            if not model:
+                # If not found in the database, get from configuration
+                model_info = model_provider_manager.get_supported_model(provider_name, model_name)
+                if not model_info or "dimension" not in model_info:
+                    raise ValueError(f"No dimension information found for model {model_name}")
+                return model_info["dimension"]
+
+            dimension = model.metadata_.get("dimension")
+            if dimension is None:
+                raise ValueError(f"No dimension information found in database for model {model_name}")
+            return dimension
+
+        return self._get_or_load(("dimension", provider_name, model_name), lambda: db_operation(_get_dimension))
+
+    def invalidate(self) -> None:
+        """
+        Drops every cached entry.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def _get_or_load(self, key: tuple[str, ...], load: Callable[[], T]) -> T:
+        if self.ttl_seconds <= 0:
+            return load()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        # Loaded outside the lock, failed lookups raise and are not cached
+        value = load()
+        with self._lock:
+            self._entries[key] = (now + self.ttl_seconds, value)
+        return value
+
+
+# Singleton instance of ProviderCredentialStore
+provider_credential_store = ProviderCredentialStore(CREDENTIAL_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(ModelProvider, "after_insert")
+@event.listens_for(ModelProvider, "after_update")
+@event.listens_for(ModelProvider, "after_delete")
+def _invalidate_credentials_on_provider_change(mapper, connection, target: ModelProvider) -> None:
+    """Drop cached credentials and the chat models created with them when a provider changes."""
+    provider_credential_store.invalidate()
+    model_provider_manager.invalidate_models(target.provider_name)
+    logger.info(f"Provider credentials invalidated: {target.provider_name}")
+
+
+@event.listens_for(Model, "after_insert")
+@event.listens_for(Model, "after_update")
+@event.listens_for(Model, "after_delete")
+def _invalidate_credentials_on_model_change(mapper, connection, target: Model) -> None:
+    """Drop cached model metadata when a model changes."""
+    provider_credential_store.invalidate()
@@ -1,10 +1,24 @@
+import hashlib
 import importlib
+import json
 import os
+import threading
+from collections import OrderedDict
 from collections.abc import Callable
 from typing import Any
+from typing import OrderedDict as OrderedDictType
 
+from app.core import logging
 from app.core.settings import env_settings
 
+logger = logging.get_logger(__name__)
+
+# --- Constants ---
+MAX_CACHED_CHAT_MODELS = env_settings.MAX_CACHED_CHAT_MODELS
+
+# Key: (provider, base_url, api key hash, model, temperature, serialised kwargs)
+ChatModelKey = tuple[str, str, str, str, float, str]
+
 
 class ModelProviderManager:
     def __init__(self):
@@ -12,6 +26,19 @@ class ModelProviderManager:
         self.models: dict[str, list[dict[str, Any]]] = {}
         self.init_functions: dict[str, Callable] = {}
         self.init_crewai_functions: dict[str, Callable] = {}
+
+        # Model catalogue indexed once when the providers are loaded, so lookups are O(1)
+        # Key: model name, Value: (provider name, model info) of the first provider supporting it
+        self.models_by_name: dict[str, tuple[str, dict[str, Any]]] = {}
+        # Key: provider name, Value: {model name: model info}
+        self.models_by_provider: dict[str, dict[str, dict[str, Any]]] = {}
+
+        # LRU cache of initialised chat models. Chat model clients are stateless and keep their HTTP
+        # connection pool, so sharing them across nodes and requests avoids new TLS handshakes.
+        self.chat_models: OrderedDictType[ChatModelKey, Any] = OrderedDict()
+        # init_model is called from the event loop and from worker threads
+        self.chat_models_lock = threading.Lock()
+
         self.load_providers()
 
     def load_providers(self):
@@ -38,12 +65,26 @@ class ModelProviderManager:
                 except ImportError as e:
                     print(f"Failed to load provider config for {item}: {e}")
 
+        self._index_models()
+
+    def _index_models(self) -> None:
+        self.models_by_name = {}
+        self.models_by_provider = {}
+        for provider_name, models in self.models.items():
+            provider_models = self.models_by_provider.setdefault(provider_name, {})
+            for model in models:
+                provider_models.setdefault(model["name"], model)
+                self.models_by_name.setdefault(model["name"], (provider_name, model))
+
     def get_provider_config(self, provider_name: str) -> dict[str, Any]:
         return self.providers.get(provider_name, {})
 
     def get_supported_models(self, provider_name: str) -> list[dict[str, Any]]:
         return self.models.get(provider_name, [])
 
+    def get_supported_model(self, provider_name: str, model_name: str) -> dict[str, Any] | None:
+        return self.models_by_provider.get(provider_name, {}).get(model_name)
+
     def get_all_providers(self) -> dict[str, dict[str, Any]]:
         return self.providers
 
@@ -51,15 +92,15 @@ class ModelProviderManager:
         return self.models
 
     def get_model_info(self, model_name: str | None) -> dict[str, Any]:
-        for key, value in self.models.items():
-            for model in value:
-                if model["name"] == model_name:
-                    return {
-                        "provider": key,
-                        "model_name": model["name"],
-                        "base_url": self.providers[key]["base_url"],
-                        "api_key": self.providers[key]["api_key"],
-                    }
+        entry = self.models_by_name.get(model_name) if model_name else None
+        if entry is not None:
+            provider_name, model = entry
+            return {
+                "provider": provider_name,
+                "model_name": model["name"],
+                "base_url": self.providers[provider_name]["base_url"],
+                "api_key": self.providers[provider_name]["api_key"],
+            }
 
         # If model not found, return an default configuration
         return {
@@ -78,15 +119,59 @@ class ModelProviderManager:
         base_url: str,
         **kwargs,
     ):
+        """
+        Returns a chat model of the provider, reusing a cached instance with the same configuration.
+        """
         init_function = self.init_functions.get(provider_name)
-        if init_function:
-
-            return init_function(model, temperature, api_key, base_url, **kwargs)
-        else:
+        if not init_function:
             raise ValueError(
                 f"No initialization function found for provider: {provider_name}"
             )
 
+        if MAX_CACHED_CHAT_MODELS <= 0:
+            return init_function(model, temperature, api_key, base_url, **kwargs)
+
+        key: ChatModelKey = (
+            provider_name,
+            base_url or "",
+            hashlib.sha256((api_key or "").encode("utf-8")).hexdigest(),
+            model,
+            float(temperature),
+            json.dumps(kwargs, sort_keys=True, default=repr),
+        )
+        with self.chat_models_lock:
+            chat_model = self.chat_models.get(key)
+            if chat_model is not None:
+                self.chat_models.move_to_end(key)  # Mark as recently used
+                return chat_model
+
+        # Created outside the lock, a concurrent miss at worst creates one extra instance
+        chat_model = init_function(model, temperature, api_key, base_url, **kwargs)
+
+        with self.chat_models_lock:
+            if key in self.chat_models:
+                self.chat_models.move_to_end(key)
+                return self.chat_models[key]
+            if len(self.chat_models) >= MAX_CACHED_CHAT_MODELS:
+                # Evict the least recently used model (oldest item)
+                evicted_key, _ = self.chat_models.popitem(last=False)
+                logger.info(
+                    f"Chat model cache limit ({MAX_CACHED_CHAT_MODELS}) reached. "
+                    f"Evicted model '{evicted_key[0]}/{evicted_key[3]}'."
+                )
+            self.chat_models[key] = chat_model
+        return chat_model
+
+    def invalidate_models(self, provider_name: str | None = None) -> None:
+        """
+        Removes the cached chat models of a provider, or of every provider.
+        Must be called when a provider's credentials or base URL change.
+        """
+        with self.chat_models_lock:
+            for key in list(self.chat_models):
+                if provider_name is None or key[0] == provider_name:
+                    del self.chat_models[key]
+
     def init_crewai_model(
         self,
         provider_name: str,
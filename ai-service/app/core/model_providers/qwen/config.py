@@ -48,9 +48,12 @@ SUPPORTED_MODELS = [
     },
 ]
 
+# Index of SUPPORTED_MODELS by model name
+SUPPORTED_MODELS_BY_NAME = {m["name"]: m for m in SUPPORTED_MODELS}
+
 
 def init_model(model: str, temperature: float, api_key: str, base_url: str, **kwargs):
-    model_info = next((m for m in SUPPORTED_MODELS if m["name"] == model), None)
+    model_info = SUPPORTED_MODELS_BY_NAME.get(model)
     if model_info and ModelCategory.CHAT in model_info["categories"]:
         return ChatOpenAI(
             model=model,
@@ -64,7 +67,7 @@ def init_model(model: str, temperature: float, api_key: str, base_url: str, **kw
 
 
 def init_crewai_model(model: str, api_key: str, base_url: str, **kwargs):
-    model_info = next((m for m in SUPPORTED_MODELS if m["name"] == model), None)
+    model_info = SUPPORTED_MODELS_BY_NAME.get(model)
     if model_info and ModelCategory.CHAT in model_info["categories"]:
         return LLM(
             model=f"openai/{model}",
@@ -1,4 +1,6 @@
 import logging
+from collections.abc import Iterable, Iterator
+from itertools import islice
 
 from langchain_community.document_loaders import (
     PyMuPDFLoader,
@@ -10,54 +12,83 @@ from langchain_community.document_loaders import (
     UnstructuredWordDocumentLoader,
     WebBaseLoader,
 )
+from langchain_core.document_loaders import BaseLoader
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 logger = logging.getLogger(__name__)
 
 
-def load_and_split_document(
+def _get_loader(file_path: str) -> BaseLoader:
+    if file_path.startswith("http://") or file_path.startswith("https://"):
+        return WebBaseLoader(web_path=file_path)
+
+    # Select the appropriate loader based on the file type
+    if file_path.endswith(".pdf"):
+        return PyMuPDFLoader(file_path)
+    elif file_path.endswith(".docx"):
+        return UnstructuredWordDocumentLoader(file_path)
+    elif file_path.endswith(".pptx"):
+        return UnstructuredPowerPointLoader(file_path)
+    elif file_path.endswith(".xlsx"):
+        return UnstructuredExcelLoader(file_path)
+    elif file_path.endswith(".txt"):
+        return TextLoader(file_path)
+    elif file_path.endswith(".html"):
+        return UnstructuredHTMLLoader(file_path)
+    elif file_path.endswith(".md"):
+        return UnstructuredMarkdownLoader(file_path)
+    else:
+        raise ValueError(f"Unsupported file type: {file_path}")
+
+
+def iter_split_documents(
     file_path: str,
     user_id: str,
     upload_id: str,
     chunk_size: int = 500,
     chunk_overlap: int = 50,
-) -> list[Document]:
-    logger.debug(f"Loading document from: {file_path}")
+) -> Iterator[Document]:
+    """
+    Lazily loads and splits a document.
 
-    if file_path.startswith("http://") or file_path.startswith("https://"):
-        loader = WebBaseLoader(web_path=file_path)
-    else:
-        # Select the appropriate loader based on the file type
-        if file_path.endswith(".pdf"):
-            loader = PyMuPDFLoader(file_path)
-        elif file_path.endswith(".docx"):
-            loader = UnstructuredWordDocumentLoader(file_path)
-        elif file_path.endswith(".pptx"):
-            loader = UnstructuredPowerPointLoader(file_path)
-        elif file_path.endswith(".xlsx"):
-            loader = UnstructuredExcelLoader(file_path)
-        elif file_path.endswith(".txt"):
-            loader = TextLoader(file_path)
-        elif file_path.endswith(".html"):
-            loader = UnstructuredHTMLLoader(file_path)
-        elif file_path.endswith(".md"):
-            loader = UnstructuredMarkdownLoader(file_path)
-        else:
-            raise ValueError(f"Unsupported file type: {file_path}")
-
-    documents = loader.load()
-    logger.debug(f"Loaded {len(documents)} documents")
-
-    # Update document metadata
-    for doc in documents:
-        doc.metadata.update({"user_id": user_id, "upload_id": upload_id})
+    Loaders yield one page or section at a time and each one is split as soon as it is loaded,
+    so only the current page and its chunks are held in memory regardless of the document size.
+    """
+    logger.debug(f"Loading document from: {file_path}")
+    loader = _get_loader(file_path)
 
     # Text splitting
     text_splitter = RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap,
     )
-    split_docs = text_splitter.split_documents(documents)
-    logger.debug(f"Split into {len(split_docs)} chunks")
-    return split_docs
+
+    loaded_count = 0
+    split_count = 0
+    for document in loader.lazy_load():
+        loaded_count += 1
+        # Update document metadata
+        document.metadata.update({"user_id": user_id, "upload_id": upload_id})
+        for split_doc in text_splitter.split_documents([document]):
+            split_count += 1
+            yield split_doc
+
+    logger.debug(f"Split {loaded_count} documents into {split_count} chunks")
+
+
+def iter_batches(documents: Iterable[Document], batch_size: int) -> Iterator[list[Document]]:
+    """Groups documents into lists of at most batch_size documents."""
+    iterator = iter(documents)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def load_and_split_document(
+    file_path: str,
+    user_id: str,
+    upload_id: str,
+    chunk_size: int = 500,
+    chunk_overlap: int = 50,
+) -> list[Document]:
+    return list(iter_split_documents(file_path, user_id, upload_id, chunk_size, chunk_overlap))
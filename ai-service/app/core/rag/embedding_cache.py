@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+import unicodedata
+from array import array
+
+from langchain_core.embeddings import Embeddings
+from sqlalchemy import delete, func, literal_column, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.db_session import sync_engine
+from app.core.settings import env_settings
+from app.db_models import EmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+MAX_CACHED_EMBEDDINGS = env_settings.EMBEDDING_CACHE_MAX_ENTRIES
+# Rows per lookup/insert statement
+CACHE_QUERY_BATCH_SIZE = 1000
+# Hits only refresh last_used_at when it is older than this, to avoid a write per lookup
+TOUCH_INTERVAL = "1 hour"
+# Minimum seconds between two eviction passes of a process
+EVICTION_INTERVAL_SECONDS = 300
+# Extra fraction of rows evicted beyond the limit, so that eviction does not run on every insert
+EVICTION_SLACK = 0.1
+
+
+def hash_text(text_: str) -> str:
+    """Returns the content hash of a chunk, insensitive to unicode form and whitespace differences."""
+    normalized = " ".join(unicodedata.normalize("NFC", text_).split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCacheStats:
+    """Process-wide hit and miss counters of the embedding cache."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+
+    def record(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def record_eviction(self, evicted: int) -> None:
+        with self._lock:
+            self.evicted += evicted
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evicted": self.evicted,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Singleton instance of EmbeddingCacheStats
+embedding_cache_stats = EmbeddingCacheStats()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embedding model with a persistent, content-addressed cache.
+
+    Embeddings are stored in the embedding_cache table keyed by (content hash, provider, model),
+    so identical chunks are only embedded once across re-uploads, edits and users. The table is
+    bounded by EMBEDDING_CACHE_MAX_ENTRIES and evicts the least recently used rows. Cache failures
+    never fail an embedding call, they only fall back to the wrapped model.
+    """
+
+    def __init__(self, embeddings: Embeddings, provider: str, model: str) -> None:
+        self.embeddings = embeddings
+        self.provider = provider
+        self.model = model
+        self.dimension = getattr(embeddings, "dimension", None)
+        self._last_eviction_check = 0.0
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+
+        hashes = [hash_text(t) for t in texts]
+        cached = self._load(hashes)
+        missing = self._missing(hashes, texts, cached)
+
+        if missing:
+            new_embeddings = dict(zip(missing.keys(), self.embeddings.embed_documents(list(missing.values()))))
+            self._store(new_embeddings)
+            cached.update(new_embeddings)
+
+        self._record(len(texts), len(missing))
+        return [cached[h] for h in hashes]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+
+        hashes = [hash_text(t) for t in texts]
+        cached = await asyncio.to_thread(self._load, hashes)
+        missing = self._missing(hashes, texts, cached)
+
+        if missing:
+            new_embeddings = dict(zip(missing.keys(), await self.embeddings.aembed_documents(list(missing.values()))))
+            await asyncio.to_thread(self._store, new_embeddings)
+            cached.update(new_embeddings)
+
+        self._record(len(texts), len(missing))
+        return [cached[h] for h in hashes]
+
+    # Queries are rarely repeated and some models embed them differently from documents, so they bypass the cache
+
+    def embed_query(self, text_: str) -> list[float]:
+        return self.embeddings.embed_query(text_)
+
+    async def aembed_query(self, text_: str) -> list[float]:
+        return await self.embeddings.aembed_query(text_)
+
+    @staticmethod
+    def _missing(hashes: list[str], texts: list[str], cached: dict[str, list[float]]) -> dict[str, str]:
+        # One text per uncached hash, duplicates within a document are embedded once
+        missing: dict[str, str] = {}
+        for content_hash, text_ in zip(hashes, texts):
+            if content_hash not in cached and content_hash not in missing:
+                missing[content_hash] = text_
+        return missing
+
+    def _record(self, total: int, missing: int) -> None:
+        embedding_cache_stats.record(hits=total - missing, misses=missing)
+        logger.debug(f"Embedding cache ({self.provider}/{self.model}): {total - missing} hits, {missing} misses")
+
+    def _load(self, hashes: list[str]) -> dict[str, list[float]]:
+        unique_hashes = list(dict.fromkeys(hashes))
+        result: dict[str, list[float]] = {}
+        try:
+            with sync_engine.connect() as conn:
+                for i in range(0, len(unique_hashes), CACHE_QUERY_BATCH_SIZE):
+                    batch = unique_hashes[i : i + CACHE_QUERY_BATCH_SIZE]
+                    rows = conn.execute(
+                        select(EmbeddingCache.content_hash, EmbeddingCache.embedding).where(
+                            EmbeddingCache.provider == self.provider,
+                            EmbeddingCache.model == self.model,
+                            EmbeddingCache.content_hash.in_(batch),
+                        )
+                    ).all()
+                    for content_hash, embedding in rows:
+                        result[content_hash] = _unpack(embedding)
+
+                    if rows:
+                        conn.execute(
+                            update(EmbeddingCache)
+                            .where(
+                                EmbeddingCache.provider == self.provider,
+                                EmbeddingCache.model == self.model,
+                                EmbeddingCache.content_hash.in_([row[0] for row in rows]),
+                                EmbeddingCache.last_used_at < func.now() - literal_column(f"interval '{TOUCH_INTERVAL}'"),
+                            )
+                            .values(last_used_at=func.now())
+                        )
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed, embedding without cache: {e}")
+            return {}
+        return result
+
+    def _store(self, embeddings: dict[str, list[float]]) -> None:
+        rows = [
+            {
+                "content_hash": content_hash,
+                "provider": self.provider,
+                "model": self.model,
+                "dimension": len(embedding),
+                "embedding": _pack(embedding),
+            }
+            for content_hash, embedding in embeddings.items()
+        ]
+        try:
+            with sync_engine.connect() as conn:
+                for i in range(0, len(rows), CACHE_QUERY_BATCH_SIZE):
+                    conn.execute(insert(EmbeddingCache).values(rows[i : i + CACHE_QUERY_BATCH_SIZE]).on_conflict_do_nothing())
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+            return
+
+        self._maybe_evict()
+
+    # noinspection SqlNoDataSourceInspection
+    def _maybe_evict(self) -> None:
+        now = time.monotonic()
+        if MAX_CACHED_EMBEDDINGS <= 0 or now - self._last_eviction_check < EVICTION_INTERVAL_SECONDS:
+            return
+        self._last_eviction_check = now
+
+        try:
+            with sync_engine.connect() as conn:
+                # The planner estimate is enough to decide whether to evict, and costs nothing on large tables
+                estimated_rows = conn.execute(
+                    text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'embedding_cache'")
+                ).scalar() or 0
+                if estimated_rows <= MAX_CACHED_EMBEDDINGS:
+                    return
+
+                excess = int(estimated_rows - MAX_CACHED_EMBEDDINGS * (1 - EVICTION_SLACK))
+                oldest = (
+                    select(EmbeddingCache.content_hash, EmbeddingCache.provider, EmbeddingCache.model)
+                    .order_by(EmbeddingCache.last_used_at)
+                    .limit(excess)
+                    .subquery()
+                )
+                result = conn.execute(
+                    delete(EmbeddingCache).where(
+                        EmbeddingCache.content_hash == oldest.c.content_hash,
+                        EmbeddingCache.provider == oldest.c.provider,
+                        EmbeddingCache.model == oldest.c.model,
+                    )
+                )
+                conn.commit()
+                embedding_cache_stats.record_eviction(result.rowcount)
+                logger.info(f"Embedding cache limit ({MAX_CACHED_EMBEDDINGS}) reached. Evicted {result.rowcount} least recently used entries.")
+        except Exception as e:
+            logger.warning(f"Embedding cache eviction failed: {e}")
+
+
+def _pack(embedding: list[float]) -> bytes:
+    return array("f", embedding).tobytes()
+
+
+def _unpack(data: bytes) -> list[float]:
+    values = array("f")
+    values.frombytes(data)
+    return values.tolist()
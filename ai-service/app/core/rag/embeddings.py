@@ -1,61 +1,72 @@
+import asyncio
 import json
 import logging
-
-import requests
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+import httpx
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_core.embeddings import Embeddings
 from langchain_openai import OpenAIEmbeddings
-from pydantic import BaseModel, SecretStr
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from pydantic import BaseModel, PrivateAttr, SecretStr
 
-from app.core.model_providers.model_provider_manager import model_provider_manager
+from app.core.model_providers.credential_store import provider_credential_store
+from app.core.rag.embedding_cache import CachedEmbeddings
 from app.core.settings import env_settings
-from app.core.workflow.utils.db_utils import db_operation
-from app.db_models import Model, ModelProvider
 
 logger = logging.getLogger(__name__)
 
+SILICONFLOW_EMBEDDINGS_URL = "https://api.siliconflow.cn/v1/embeddings"
 
-def get_api_key(provider_name: str) -> str:
-    def _get_api_key(session: Session):
-        provider = session.execute(select(ModelProvider).where(ModelProvider.provider_name == provider_name)).first()
-        if not provider:
-            raise ValueError(f"Provider {provider_name} not found")
-        return provider.decrypted_api_key
+# Maximum number of inputs per embedding request accepted by each provider
+EMBEDDING_BATCH_SIZES = {
+    "openai": 512,
+    "zhipuai": 64,
+    "siliconflow": 32,
+    "local": 64,
+}
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+EMBEDDING_BASE_BACKOFF_SECONDS = 0.5
+EMBEDDING_MAX_BACKOFF_SECONDS = 30.0
 
-    return db_operation(_get_api_key)
+T = TypeVar("T")
 
+# Keep-alive HTTP clients shared by the HTTP based embedding providers, created on first use
+_http_client: httpx.Client | None = None
+_async_http_client: httpx.AsyncClient | None = None
+
+
+def _http_client_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=env_settings.EMBEDDING_MAX_CONCURRENCY * 2,
+        max_keepalive_connections=env_settings.EMBEDDING_MAX_CONCURRENCY,
+    )
 
-def get_embedding_dimension(provider_name: str, model_name: str) -> int:
-    def _get_dimension(session: Session):
-        provider = session.execute(select(ModelProvider).where(ModelProvider.provider_name == provider_name)).first()
-        if not provider:
-            raise ValueError(f"Provider {provider_name} not found")
-
-        model = session.execute(select(Model).where(Model.ai_model_name == model_name)).first()
-
-        if not model:
-            # If not found in the database, get from configuration
-            provider_models = model_provider_manager.get_supported_models(provider_name)
-            model_info = next(
-                (m for m in provider_models if m["name"] == model_name), None
-            )
-            if not model_info or "dimension" not in model_info:
-                raise ValueError(
-                    f"No dimension information found for model {model_name}"
-                )
-            dimension = model_info["dimension"]
-        else:
-            dimension = model.metadata_.get("dimension")
-            if dimension is None:
-                raise ValueError(
-                    f"No dimension information found in database for model {model_name}"
-                )
 
-        return dimension
+def _get_http_client() -> httpx.Client:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(timeout=env_settings.EMBEDDING_REQUEST_TIMEOUT, limits=_http_client_limits())
+    return _http_client
 
-    return db_operation(_get_dimension)
+
+def _get_async_http_client() -> httpx.AsyncClient:
+    global _async_http_client
+    if _async_http_client is None:
+        _async_http_client = httpx.AsyncClient(timeout=env_settings.EMBEDDING_REQUEST_TIMEOUT, limits=_http_client_limits())
+    return _async_http_client
+
+
+def get_api_key(provider_name: str) -> str:
+    return provider_credential_store.get_api_key(provider_name)
+
+
+def get_embedding_dimension(provider_name: str, model_name: str) -> int:
+    return provider_credential_store.get_embedding_dimension(provider_name, model_name)
 
 
 class ZhipuAIEmbeddings(BaseModel, Embeddings):
@@ -63,6 +74,9 @@ class ZhipuAIEmbeddings(BaseModel, Embeddings):
     model: str = "embedding-3"
     dimension: int | None = None
 
+    # The SDK client keeps a pooled HTTP connection, so it is created once and reused
+    _client: Any = PrivateAttr(default=None)
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.dimension = get_embedding_dimension("zhipuai", self.model)
@@ -71,10 +85,11 @@ class ZhipuAIEmbeddings(BaseModel, Embeddings):
         extra = "forbid"
 
     def embed_documents(self, texts: list[str]) -> list[list[float]]:
-        from zhipuai import ZhipuAI
+        if self._client is None:
+            from zhipuai import ZhipuAI
 
-        client = ZhipuAI(api_key=self.api_key)
-        response = client.embeddings.create(model=self.model, input=texts)
+            self._client = ZhipuAI(api_key=self.api_key)
+        response = self._client.embeddings.create(model=self.model, input=texts)
         embeddings = [item.embedding for item in response.data]
         if embeddings:
             self.dimension = len(embeddings[0])
@@ -97,15 +112,33 @@ class SiliconFlowEmbeddings(BaseModel, Embeddings):
         extra = "forbid"
 
     def embed_documents(self, texts: list[str]) -> list[list[float]]:
-        url = "https://api.siliconflow.cn/v1/embeddings"
-        headers = {
+        response = _get_http_client().post(SILICONFLOW_EMBEDDINGS_URL, json=self._payload(texts), headers=self._headers())
+        response.raise_for_status()
+        return self._parse_embeddings(response.json())
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        response = await _get_async_http_client().post(SILICONFLOW_EMBEDDINGS_URL, json=self._payload(texts), headers=self._headers())
+        response.raise_for_status()
+        return self._parse_embeddings(response.json())
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self.aembed_documents([text]))[0]
+
+    def _headers(self) -> dict[str, str]:
+        return {
             "accept": "application/json",
             "content-type": "application/json",
             "Authorization": f"Bearer {self.api_key}",
         }
-        payload = {"model": self.model, "input": texts, "encoding_format": "float"}
-        response = requests.post(url, json=payload, headers=headers)
-        response_json = response.json()
+
+    def _payload(self, texts: list[str]) -> dict:
+        return {"model": self.model, "input": texts, "encoding_format": "float"}
+
+    @staticmethod
+    def _parse_embeddings(response_json: dict) -> list[list[float]]:
         logger.debug(
             f"SiliconFlow API response: {json.dumps(response_json, indent=2)[:20]}"
         )
@@ -123,11 +156,150 @@ class SiliconFlowEmbeddings(BaseModel, Embeddings):
 
         return embeddings
 
+
+class BatchedEmbeddings(Embeddings):
+    """
+    Wraps a provider embedding model for bulk ingestion.
+
+    Inputs are split into provider-sized batches which are embedded concurrently with bounded
+    parallelism. Transient failures (rate limits, 5xx responses, network errors) are retried per
+    batch with exponential backoff, so a single 429 no longer fails a whole upload.
+    """
+
+    def __init__(self, embeddings: Embeddings, batch_size: int, max_concurrency: int, max_retries: int) -> None:
+        self.embeddings = embeddings
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(0, max_retries)
+        self.dimension = getattr(embeddings, "dimension", None)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="embedding")
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+
+        started_at = time.perf_counter()
+        batches = self._split(texts)
+        if len(batches) == 1:
+            results = [self._embed_batch(batches[0])]
+        else:
+            results = list(self._executor.map(self._embed_batch, batches))
+        self._log_throughput(len(texts), len(batches), started_at)
+        return [embedding for batch in results for embedding in batch]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+
+        started_at = time.perf_counter()
+        batches = self._split(texts)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _aembed_with_limit(batch: list[str]) -> list[list[float]]:
+            async with semaphore:
+                return await self._aembed_batch(batch)
+
+        results = await asyncio.gather(*[_aembed_with_limit(batch) for batch in batches])
+        self._log_throughput(len(texts), len(batches), started_at)
+        return [embedding for batch in results for embedding in batch]
+
     def embed_query(self, text: str) -> list[float]:
-        return self.embed_documents([text])[0]
+        return self._with_retry(lambda: self.embeddings.embed_query(text))
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return await self._awith_retry(lambda: self.embeddings.aembed_query(text))
+
+    def _split(self, texts: list[str]) -> list[list[str]]:
+        return [texts[i : i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+
+    def _embed_batch(self, batch: list[str]) -> list[list[float]]:
+        return self._with_retry(lambda: self.embeddings.embed_documents(batch))
+
+    async def _aembed_batch(self, batch: list[str]) -> list[list[float]]:
+        return await self._awith_retry(lambda: self.embeddings.aembed_documents(batch))
+
+    def _with_retry(self, operation: Callable[[], T]) -> T:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return operation()
+            except Exception as e:
+                if attempt >= self.max_retries or not _is_retryable_error(e):
+                    raise
+                delay = _backoff_delay(attempt)
+                logger.warning(f"Embedding request failed ({e}), retrying in {delay:.2f}s ({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+        raise RuntimeError("Unreachable")
+
+    async def _awith_retry(self, operation: Callable[[], Awaitable[T]]) -> T:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await operation()
+            except Exception as e:
+                if attempt >= self.max_retries or not _is_retryable_error(e):
+                    raise
+                delay = _backoff_delay(attempt)
+                logger.warning(f"Embedding request failed ({e}), retrying in {delay:.2f}s ({attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(delay)
+        raise RuntimeError("Unreachable")
+
+    @staticmethod
+    def _log_throughput(text_count: int, batch_count: int, started_at: float) -> None:
+        elapsed = time.perf_counter() - started_at
+        logger.info(
+            f"Embedded {text_count} texts in {batch_count} batches in {elapsed:.2f}s "
+            f"({text_count / elapsed if elapsed > 0 else float(text_count):.1f} texts/s)"
+        )
+
+
+def _is_retryable_error(error: Exception) -> bool:
+    if isinstance(error, (httpx.TransportError, TimeoutError, ConnectionError)):
+        return True
+    status_code = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status_code in RETRYABLE_STATUS_CODES
+
+
+def _backoff_delay(attempt: int) -> float:
+    # Exponential backoff with full jitter, capped so retries stay within a task's time budget
+    return random.uniform(0, min(EMBEDDING_MAX_BACKOFF_SECONDS, EMBEDDING_BASE_BACKOFF_SECONDS * 2**attempt))
+
+
+# Embedding models are built once per provider and shared by the whole process,
+# building one costs DB lookups and, for the local provider, loading the model weights.
+_embedding_models: dict[str, Embeddings] = {}
+_embedding_models_lock = threading.Lock()
 
 
 def get_embedding_model(model__provider_name: str) -> Embeddings:
+    """
+    Returns the shared embedding model of a provider, creating it on first use.
+    """
+    embedding_model = _embedding_models.get(model__provider_name)
+    if embedding_model is not None:
+        return embedding_model
+
+    with _embedding_models_lock:
+        # Another thread may have created the model while waiting for the lock
+        embedding_model = _embedding_models.get(model__provider_name)
+        if embedding_model is None:
+            embedding_model = _create_embedding_model(model__provider_name)
+            _embedding_models[model__provider_name] = embedding_model
+        return embedding_model
+
+
+def invalidate_embedding_model(model__provider_name: str | None = None) -> None:
+    """
+    Drops the shared embedding model of a provider, or of all providers if none is given,
+    so that the next call to get_embedding_model picks up fresh credentials.
+    """
+    with _embedding_models_lock:
+        if model__provider_name is None:
+            _embedding_models.clear()
+        else:
+            _embedding_models.pop(model__provider_name, None)
+    logger.info(f"Embedding model invalidated: {model__provider_name or 'all providers'}")
+
+
+def _create_embedding_model(model__provider_name: str) -> Embeddings:
     logger.info(f"Initializing embedding model: {model__provider_name}")
     try:
         if model__provider_name == "openai":
@@ -158,6 +330,17 @@ def get_embedding_model(model__provider_name: str) -> Embeddings:
 
         logger.info(f"Embedding model created: {type(embedding_model)}")
 
+        model_name = getattr(embedding_model, "model", None) or getattr(embedding_model, "model_name", None) or model__provider_name
+        embedding_model = BatchedEmbeddings(
+            embedding_model,
+            batch_size=min(EMBEDDING_BATCH_SIZES[model__provider_name], env_settings.EMBEDDING_BATCH_SIZE),
+            # Local models are CPU bound and batch internally, concurrent calls would only contend
+            max_concurrency=1 if model__provider_name == "local" else env_settings.EMBEDDING_MAX_CONCURRENCY,
+            max_retries=env_settings.EMBEDDING_MAX_RETRIES,
+        )
+        if env_settings.EMBEDDING_CACHE_ENABLED:
+            embedding_model = CachedEmbeddings(embedding_model, provider=model__provider_name, model=model_name)
+
         # Check if the embedding model has a dimension attribute before logging it
         dimension = getattr(embedding_model, "dimension", None)
         if dimension is not None:
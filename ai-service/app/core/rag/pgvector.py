@@ -1,36 +1,64 @@
 import logging
-import math
-import re
-from collections import Counter
+import threading
+from collections import defaultdict
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_postgres import PGVector
-from sqlalchemy import create_engine, text
+from sqlalchemy import delete, event, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from app.core.rag.document_processor import load_and_split_document
-from app.core.rag.embeddings import get_embedding_model
+from app.core.db_session import sync_engine
+from app.core.rag.document_processor import iter_batches, iter_split_documents
+from app.core.rag.embedding_cache import hash_text
+from app.core.rag.embeddings import get_embedding_model, invalidate_embedding_model
+from app.core.rag.vector_indexes import FULLTEXT_SEARCH_CONFIG, check_vector_indexes, configure_vector_search_session
 from app.core.settings import env_settings
+from app.db_models import ModelProvider
 
 logger = logging.getLogger(__name__)
 
+# Hybrid search settings
+HYBRID_FUSION_METHODS = ("rrf", "weighted")
+HYBRID_CANDIDATE_MULTIPLIER = 4
+# Chunk ids per SELECT or DELETE statement of an incremental update
+UPDATE_DELETE_BATCH_SIZE = 1000
+# Chunks embedded and inserted per batch when indexing an upload
+INGEST_BATCH_SIZE = 256
+# cmetadata key of the content hash of a chunk, compared by incremental updates
+CHUNK_HASH_METADATA_KEY = "content_hash"
+_hybrid_search_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hybrid-search")
+
+# Engine used by the async-mode vector stores, langchain_postgres runs its async queries through psycopg 3
+async_vector_engine = create_async_engine(
+    f"postgresql+psycopg://{env_settings.POSTGRES_URL_PATH}",
+    pool_pre_ping=True,
+    echo=env_settings.DEBUG_SQLALCHEMY,
+)
+
+configure_vector_search_session(sync_engine)
+configure_vector_search_session(async_vector_engine.sync_engine)
+
 
 class PGVectorWrapper:
-    def __init__(self) -> None:
+    def __init__(self, embedding_model: Embeddings | None = None) -> None:
         self.collection_name = env_settings.PGVECTOR_COLLECTION  # Reusing the collection name setting
-        self.connection_string = f"postgresql+psycopg2://{env_settings.POSTGRES_URL_PATH}"
-        self.embedding_model = get_embedding_model(env_settings.EMBEDDING_PROVIDER)
-
-        logger.debug(f"Initializing PGVector with connection: {self.connection_string}")
+        self.embedding_model = embedding_model or get_embedding_model(env_settings.EMBEDDING_PROVIDER)
 
-        # Create synchronous engine for initialization
-        self.sync_engine = create_engine(self.connection_string)
+        # Share the application's synchronous engine so all vector operations use one connection pool
+        self.sync_engine = sync_engine
         self.Session = sessionmaker(bind=self.sync_engine)
 
         logger.debug("PGVector engine initialized successfully")
 
         self._initialize_vector_store()
+        check_vector_indexes(self.sync_engine, getattr(self.embedding_model, "dimension", None))
+
+        # Created on first use, Celery workers only need the synchronous store
+        self._async_vector_store: PGVector | None = None
 
     def _initialize_vector_store(self):
         try:
@@ -38,7 +66,9 @@ class PGVectorWrapper:
             self.vector_store = PGVector(
                 embeddings=self.embedding_model,
                 collection_name=self.collection_name,
-                connection=self.connection_string,
+                connection=self.sync_engine,
+                # A fixed dimension lets the embedding column carry an HNSW index
+                embedding_length=getattr(self.embedding_model, "dimension", None),
                 use_jsonb=True,
             )
 
@@ -48,6 +78,21 @@ class PGVectorWrapper:
             logger.error(f"Error initializing vector store: {str(e)}", exc_info=True)
             raise
 
+    @property
+    def async_vector_store(self) -> PGVector:
+        """The async-mode PGVector store, sharing this wrapper's embedding model and collection."""
+        if self._async_vector_store is None:
+            self._async_vector_store = PGVector(
+                embeddings=self.embedding_model,
+                collection_name=self.collection_name,
+                connection=async_vector_engine,
+                embedding_length=getattr(self.embedding_model, "dimension", None),
+                use_jsonb=True,
+                async_mode=True,
+            )
+            logger.debug(f"Async PGVector store initialized with collection: {self.collection_name}")
+        return self._async_vector_store
+
     def add(
         self,
         file_path_or_url: str,
@@ -57,24 +102,26 @@ class PGVectorWrapper:
         chunk_overlap: int = 50,
         callback: Callable[[], None] | None = None,
     ) -> None:
+        """
+        Indexes an upload.
+
+        Chunks are streamed from the loader and embedded and inserted in micro-batches of
+        INGEST_BATCH_SIZE, so memory use does not grow with the document size. If a batch
+        fails, the chunks already inserted for the upload are removed again.
+        """
+        added_count = 0
         try:
-            docs = load_and_split_document(
-                file_path_or_url, user_id, upload_id, chunk_size, chunk_overlap
-            )
-            # Ensure metadata is correctly set
-            for doc in docs:
-                doc.metadata["user_id"] = user_id
-                doc.metadata["upload_id"] = upload_id
-
-            # Count initial documents
-            initial_count = self._count_documents(user_id, upload_id)
-
-            # Add documents to vector store
-            self.vector_store.add_documents(docs)
-
-            # Count final documents
-            final_count = self._count_documents(user_id, upload_id)
-            added_count = final_count - initial_count
+            docs = iter_split_documents(file_path_or_url, user_id, upload_id, chunk_size, chunk_overlap)
+            for batch in iter_batches(docs, INGEST_BATCH_SIZE):
+                # Ensure metadata is correctly set
+                for doc in batch:
+                    doc.metadata["user_id"] = user_id
+                    doc.metadata["upload_id"] = upload_id
+                    doc.metadata[CHUNK_HASH_METADATA_KEY] = hash_text(doc.page_content)
+
+                # Add documents to vector store
+                added_count += len(self.vector_store.add_documents(batch))
+                logger.debug(f"Inserted {added_count} chunks so far for upload_id: {upload_id}")
 
             logger.info(
                 f"Added {added_count} documents for upload_id: {upload_id}, user_id: {user_id}"
@@ -84,6 +131,9 @@ class PGVectorWrapper:
                 callback()
         except Exception as e:
             logger.error(f"Error adding document: {str(e)}", exc_info=True)
+            if added_count:
+                # Do not leave a partially indexed upload behind
+                self.delete(upload_id, user_id)
             raise
 
     # noinspection SqlNoDataSourceInspection
@@ -138,14 +188,96 @@ class PGVectorWrapper:
         chunk_overlap: int = 50,
         callback: Callable[[], None] | None = None,
     ) -> None:
-        deletion_successful = self.delete(upload_id, user_id)
-        if not deletion_successful:
-            logger.warning(
-                f"Failed to delete existing documents for upload_id: {upload_id}, user_id: {user_id}. Proceeding with add operation."
+        """
+        Re-indexes an upload incrementally.
+
+        The new version is chunked and its chunk hashes are diffed against the hashes stored in
+        the cmetadata of the stored chunks: only removed chunks are deleted and only new chunks
+        are embedded and inserted. New chunks are embedded and inserted in micro-batches of
+        INGEST_BATCH_SIZE, like add(), and each batch is visible to searches once it is inserted.
+        The removed chunks are deleted in one transaction after all new chunks are in, so until
+        that commits searches can return chunks of both the old and the new version. If a batch
+        fails, the inserted chunks are removed again and the stored version stays as it was.
+        Unchanged chunks keep their stored rows, including their metadata.
+        """
+        embedding_store = self.vector_store.EmbeddingStore
+        inserted_ids: list[str] = []
+        try:
+            # Stored chunk ids grouped by content hash, duplicated chunks map to several ids
+            stored_ids_by_hash: defaultdict[str, list[str]] = defaultdict(list)
+            with self.Session() as session:
+                collection = self.vector_store.get_collection(session)
+                stored_chunks = session.execute(
+                    select(embedding_store.id, embedding_store.cmetadata[CHUNK_HASH_METADATA_KEY].astext).where(
+                        embedding_store.collection_id == collection.uuid,
+                        embedding_store.cmetadata["user_id"].astext == str(user_id),
+                        embedding_store.cmetadata["upload_id"].astext == str(upload_id),
+                    )
+                ).all()
+
+                # Chunks indexed before their hash was stored are hashed from their text
+                unhashed_ids: list[str] = []
+                for chunk_id, chunk_hash in stored_chunks:
+                    if chunk_hash is None:
+                        unhashed_ids.append(chunk_id)
+                    else:
+                        stored_ids_by_hash[chunk_hash].append(chunk_id)
+                for i in range(0, len(unhashed_ids), UPDATE_DELETE_BATCH_SIZE):
+                    unhashed_chunks = session.execute(
+                        select(embedding_store.id, embedding_store.document).where(
+                            embedding_store.id.in_(unhashed_ids[i : i + UPDATE_DELETE_BATCH_SIZE])
+                        )
+                    ).all()
+                    for chunk_id, document in unhashed_chunks:
+                        stored_ids_by_hash[hash_text(document or "")].append(chunk_id)
+
+            total_count = 0
+
+            def _iter_new_docs():
+                # Match each new chunk with a stored chunk of the same content, the rest must be embedded
+                nonlocal total_count
+                for doc in iter_split_documents(file_path_or_url, user_id, upload_id, chunk_size, chunk_overlap):
+                    total_count += 1
+                    doc.metadata["user_id"] = user_id
+                    doc.metadata["upload_id"] = upload_id
+                    doc.metadata[CHUNK_HASH_METADATA_KEY] = hash_text(doc.page_content)
+                    matching_ids = stored_ids_by_hash.get(doc.metadata[CHUNK_HASH_METADATA_KEY])
+                    if matching_ids:
+                        matching_ids.pop()
+                    else:
+                        yield doc
+
+            for batch in iter_batches(_iter_new_docs(), INGEST_BATCH_SIZE):
+                inserted_ids.extend(self.vector_store.add_documents(batch))
+                logger.debug(f"Inserted {len(inserted_ids)} new chunks so far for upload_id: {upload_id}")
+
+            # Whatever was not matched by a chunk of the new version is removed
+            removed_ids = [chunk_id for chunk_ids in stored_ids_by_hash.values() for chunk_id in chunk_ids]
+            with self.Session.begin() as session:
+                for i in range(0, len(removed_ids), UPDATE_DELETE_BATCH_SIZE):
+                    session.execute(
+                        delete(embedding_store).where(embedding_store.id.in_(removed_ids[i : i + UPDATE_DELETE_BATCH_SIZE]))
+                    )
+
+            logger.info(
+                f"Updated upload_id: {upload_id}, user_id: {user_id}: "
+                f"{total_count - len(inserted_ids)} chunks unchanged, {len(inserted_ids)} added, {len(removed_ids)} removed"
             )
-        self.add(file_path_or_url, upload_id, user_id, chunk_size, chunk_overlap)
-        if callback:
-            callback()
+
+            if callback:
+                callback()
+        except Exception as e:
+            logger.error(f"Error updating document: {str(e)}", exc_info=True)
+            if inserted_ids:
+                # Do not leave a partially indexed version behind
+                with self.Session.begin() as session:
+                    for i in range(0, len(inserted_ids), UPDATE_DELETE_BATCH_SIZE):
+                        session.execute(
+                            delete(embedding_store).where(
+                                embedding_store.id.in_(inserted_ids[i : i + UPDATE_DELETE_BATCH_SIZE])
+                            )
+                        )
+            raise
 
     def search(self, user_id: str, upload_ids: list[str], query: str) -> list[Document]:
         try:
@@ -190,6 +322,18 @@ class PGVectorWrapper:
         logger.debug(f"Retriever created: {retriever}")
         return retriever
 
+    def async_retriever(self, user_id: str, upload_id: str):
+        """Same as retriever, but backed by the async store so ainvoke never blocks the event loop."""
+        filter_dict = {
+            "user_id": user_id,
+            "upload_id": upload_id
+        }
+
+        return self.async_vector_store.as_retriever(
+            search_kwargs={"filter": filter_dict, "k": 5},
+            search_type="similarity",
+        )
+
     def debug_retriever(self, user_id: str, upload_id: str, query: str):
         logger.debug(
             f"Debug retriever for user_id: {user_id}, upload_id: {upload_id}, query: '{query}'"
@@ -268,6 +412,7 @@ class PGVectorWrapper:
             logger.error(f"Error in vector search: {str(e)}", exc_info=True)
             return []
 
+    # noinspection SqlNoDataSourceInspection
     def fulltext_search(
             self,
             user_id: int,
@@ -277,71 +422,51 @@ class PGVectorWrapper:
             score_threshold: float = 0.5,
     ):
         try:
-            # Get all documents for the user and upload_ids
-            filter_dict = {
-                "user_id": user_id,
-                "upload_id": {"$in": upload_ids}
-            }
+            if not query.strip():
+                return []
 
-            # Get more documents for full-text processing
-            all_docs = self.vector_store.similarity_search(
-                query="",  # Empty query to get all matching metadata
-                k=1000,
-                filter=filter_dict
-            )
+            with self.sync_engine.connect() as conn:
+                # Terms are OR-ed so that chunks matching any query term are ranked, like the vector leg
+                result = conn.execute(
+                    text(f"""
+                        WITH q AS (
+                            SELECT replace(plainto_tsquery('{FULLTEXT_SEARCH_CONFIG}', :query)::text, '&', '|')::tsquery AS query
+                        )
+                        SELECT e.id, e.document, e.cmetadata, ts_rank(e.document_tsv, q.query) AS rank
+                        FROM langchain_pg_embedding e, q
+                        WHERE e.collection_id = (
+                            SELECT uuid FROM langchain_pg_collection
+                            WHERE name = :collection_name
+                        )
+                        AND e.cmetadata->>'user_id' = :user_id
+                        AND e.cmetadata->>'upload_id' = ANY(:upload_ids)
+                        AND e.document_tsv @@ q.query
+                        ORDER BY rank DESC
+                        LIMIT :top_k
+                    """),
+                    {
+                        "query": query,
+                        "collection_name": self.collection_name,
+                        "user_id": str(user_id),
+                        "upload_ids": [str(upload_id) for upload_id in upload_ids],
+                        "top_k": top_k,
+                    },
+                )
+                rows = result.fetchall()
 
-            # Implement TF-IDF scoring
-            query_terms = Counter(re.findall(r"\w+", query.lower()))
-            filtered_results = []
+            if not rows:
+                return []
 
-            for doc in all_docs:
-                content = doc.page_content.lower()
-                content_terms = Counter(re.findall(r"\w+", content))
-
-                # Calculate improved TF-IDF similarity score
-                score = 0
-                for term, query_count in query_terms.items():
-                    if term in content_terms:
-                        tf = content_terms[term] / len(content_terms)
-                        idf = math.log(
-                            len(all_docs)
-                            / (
-                                    sum(
-                                        1
-                                        for d in all_docs
-                                        if term in d.page_content.lower()
-                                    )
-                                    + 1
-                            )
-                        )
-                        score += (tf * idf) * query_count
-
-                if score > 0:
-                    filtered_results.append((doc, score))
-
-            # Normalize scores
-            if filtered_results:
-                max_score = max(score for _, score in filtered_results)
-                filtered_results = [
-                    (doc, score / max_score) for doc, score in filtered_results
-                ]
-
-            # Apply score threshold
-            filtered_results = [
-                (doc, score)
-                for doc, score in filtered_results
-                if score >= score_threshold
-            ]
-
-            # Sort by score and take top_k
-            filtered_results.sort(key=lambda x: x[1], reverse=True)
-            top_results = filtered_results[:top_k]
-
-            # Add scores to document metadata
+            # Normalize ranks against the best match and apply the score threshold
+            max_rank = rows[0].rank or 1.0
             result_docs = []
-            for doc, score in top_results:
-                doc.metadata["score"] = score
-                result_docs.append(doc)
+            for row in rows:
+                score = row.rank / max_rank
+                if score < score_threshold:
+                    continue
+                metadata = dict(row.cmetadata or {})
+                metadata["score"] = score
+                result_docs.append(Document(id=str(row.id), page_content=row.document or "", metadata=metadata))
 
             return result_docs
 
@@ -356,18 +481,29 @@ class PGVectorWrapper:
             query: str,
             top_k: int = 5,
             score_threshold: float = 0.5,
+            fusion: str = "rrf",
+            rrf_k: int = 60,
+            vector_weight: float = 0.5,
     ):
-        vector_results = self.vector_search(
-            user_id, upload_ids, query, top_k, score_threshold
+        # Each leg returns a deeper candidate list so fusion can promote chunks ranked well by both
+        candidate_k = top_k * HYBRID_CANDIDATE_MULTIPLIER
+
+        # Run both legs concurrently, each one holds its own pooled connection
+        vector_future = _hybrid_search_executor.submit(
+            self.vector_search, user_id, upload_ids, query, candidate_k, score_threshold
         )
-        fulltext_results = self.fulltext_search(
-            user_id, upload_ids, query, top_k, score_threshold
+        fulltext_future = _hybrid_search_executor.submit(
+            self.fulltext_search, user_id, upload_ids, query, candidate_k, score_threshold
         )
 
-        # Combine results and sort by score
-        combined_results = vector_results + fulltext_results
-        combined_results.sort(key=lambda x: x.metadata["score"], reverse=True)
-        return combined_results[:top_k]
+        return fuse_search_results(
+            vector_future.result(),
+            fulltext_future.result(),
+            top_k=top_k,
+            fusion=fusion,
+            rrf_k=rrf_k,
+            vector_weight=vector_weight,
+        )
 
     # noinspection SqlNoDataSourceInspection
     def _count_documents(self, user_id: str, upload_id: str) -> int:
@@ -392,3 +528,144 @@ class PGVectorWrapper:
         except Exception as e:
             logger.error(f"Error counting documents: {str(e)}", exc_info=True)
             return 0
+
+
+def fuse_search_results(
+    vector_results: list[Document],
+    fulltext_results: list[Document],
+    top_k: int = 5,
+    fusion: str = "rrf",
+    rrf_k: int = 60,
+    vector_weight: float = 0.5,
+) -> list[Document]:
+    """
+    Fuses the results of the vector and full-text legs into a single ranking.
+
+    Chunks returned by both legs are merged by id. With "rrf" (reciprocal rank fusion)
+    each leg contributes weight / (rrf_k + rank), with "weighted" each leg contributes
+    its normalised score multiplied by its weight.
+
+    Args:
+        vector_results: Results of vector_search, best first.
+        fulltext_results: Results of fulltext_search, best first.
+        top_k: The number of fused results to return.
+        fusion: The fusion method, either "rrf" or "weighted".
+        rrf_k: The rank offset used by reciprocal rank fusion.
+        vector_weight: The weight of the vector leg, the full-text leg gets 1 - vector_weight.
+
+    Returns:
+        The top_k fused documents with the fused score in metadata["score"].
+    """
+    if fusion not in HYBRID_FUSION_METHODS:
+        raise ValueError(f"Invalid fusion method: {fusion}")
+
+    fused_docs: dict[str, Document] = {}
+    fused_scores: dict[str, float] = {}
+
+    legs = [
+        ("vector_score", vector_results, vector_weight),
+        ("fulltext_score", fulltext_results, 1 - vector_weight),
+    ]
+    for score_key, results, weight in legs:
+        for rank, doc in enumerate(results, start=1):
+            # Chunks without an id (should not happen with PGVector) are deduplicated by content
+            chunk_id = doc.id or str(hash(doc.page_content))
+            leg_score = doc.metadata.get("score", 0.0)
+
+            if chunk_id not in fused_docs:
+                fused_docs[chunk_id] = doc
+                fused_scores[chunk_id] = 0.0
+            fused_docs[chunk_id].metadata[score_key] = leg_score
+
+            if fusion == "rrf":
+                fused_scores[chunk_id] += weight / (rrf_k + rank)
+            else:
+                fused_scores[chunk_id] += weight * leg_score
+
+    ranked_ids = sorted(fused_scores, key=lambda chunk_id: fused_scores[chunk_id], reverse=True)[:top_k]
+
+    result_docs = []
+    for chunk_id in ranked_ids:
+        doc = fused_docs[chunk_id]
+        doc.metadata["score"] = fused_scores[chunk_id]
+        result_docs.append(doc)
+    return result_docs
+
+
+class VectorStoreManager:
+    """
+    Manages the process-wide PGVectorWrapper instances.
+    One store is lazily created per embedding provider and shared by API requests,
+    graph nodes and Celery tasks, so the vector store and embedding model are only
+    built once per process.
+    """
+
+    def __init__(self):
+        """
+        Initializes the VectorStoreManager.
+        - Initializes the store registry.
+        - Sets up a lock for thread-safe initialization.
+        """
+        # Key: embedding provider name (str), Value: PGVectorWrapper
+        self.stores: dict[str, PGVectorWrapper] = {}
+
+        # Lock for ensuring thread-safety when creating or invalidating stores.
+        self.store_lock = threading.Lock()
+
+    def get_store(self, provider_name: str | None = None) -> PGVectorWrapper:
+        """
+        Retrieves the shared vector store of an embedding provider, creating it on first use.
+
+        Args:
+            provider_name: The embedding provider, defaults to the EMBEDDING_PROVIDER setting.
+
+        Returns:
+            The shared PGVectorWrapper.
+        """
+        provider_name = provider_name or env_settings.EMBEDDING_PROVIDER
+
+        store = self.stores.get(provider_name)
+        if store is not None:
+            return store
+
+        with self.store_lock:
+            # Another thread may have created the store while waiting for the lock
+            store = self.stores.get(provider_name)
+            if store is None:
+                logger.info(f"Creating shared vector store for embedding provider: {provider_name}")
+                store = PGVectorWrapper(get_embedding_model(provider_name))
+                self.stores[provider_name] = store
+            return store
+
+    def invalidate(self, provider_name: str | None = None) -> None:
+        """
+        Drops the shared vector store and embedding model of a provider,
+        or of all providers if none is given.
+
+        Args:
+            provider_name: The embedding provider whose credentials changed.
+        """
+        with self.store_lock:
+            if provider_name is None:
+                self.stores.clear()
+            else:
+                self.stores.pop(provider_name, None)
+        invalidate_embedding_model(provider_name)
+
+
+# Singleton instance of VectorStoreManager
+vector_store_manager = VectorStoreManager()
+
+
+def get_pgvector_store() -> PGVectorWrapper:
+    """
+    Get the shared vector store for the configured embedding provider.
+    """
+    return vector_store_manager.get_store()
+
+
+@event.listens_for(ModelProvider, "after_update")
+@event.listens_for(ModelProvider, "after_delete")
+def _invalidate_vector_store_on_provider_change(mapper, connection, target: ModelProvider) -> None:
+    """Rebuild the embedding clients of a provider when its credentials change."""
+    vector_store_manager.invalidate(target.provider_name)
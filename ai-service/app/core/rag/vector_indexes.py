@@ -0,0 +1,220 @@
+import logging
+
+from sqlalchemy import Engine, event, text
+
+from app.core.settings import env_settings
+
+logger = logging.getLogger(__name__)
+
+# Text search configuration of the document_tsv column, "simple" keeps multilingual chunks searchable
+FULLTEXT_SEARCH_CONFIG = "simple"
+
+# Secondary indexes on langchain_pg_embedding, keyed by index name.
+# Every vector query filters by collection plus cmetadata user_id/upload_id, which the btree
+# expression index serves directly; the GIN index serves langchain_postgres' JSONB filters.
+# noinspection SqlNoDataSourceInspection
+METADATA_INDEXES = {
+    "ix_langchain_pg_embedding_user_upload": """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_langchain_pg_embedding_user_upload
+            ON langchain_pg_embedding (collection_id, (cmetadata->>'user_id'), (cmetadata->>'upload_id'))
+    """,
+    "ix_cmetadata_gin": """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cmetadata_gin
+            ON langchain_pg_embedding USING gin (cmetadata jsonb_path_ops)
+    """,
+    "ix_langchain_pg_embedding_document_tsv": """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_langchain_pg_embedding_document_tsv
+            ON langchain_pg_embedding USING gin (document_tsv)
+    """,
+}
+
+HNSW_INDEX_NAME = "ix_langchain_pg_embedding_embedding_hnsw"
+
+
+# noinspection SqlNoDataSourceInspection
+def check_vector_indexes(engine: Engine, dimension: int | None = None) -> None:
+    """
+    Logs the full-text column and the indexes of langchain_pg_embedding that are missing or invalid.
+
+    Changing the column type and building the indexes can take long on large collections, so they
+    are left to the migrations and to scripts/create_vector_indexes.py instead of every process
+    that opens a vector store.
+
+    Args:
+        engine: The synchronous engine of the vector store.
+        dimension: The dimension of the current embedding model, the HNSW index is only expected when known.
+    """
+    try:
+        with engine.connect() as conn:
+            if conn.execute(text("SELECT to_regclass('public.langchain_pg_embedding')")).scalar() is None:
+                logger.debug("langchain_pg_embedding does not exist yet, skipping vector index check")
+                return
+
+            if not _has_tsv_column(conn):
+                logger.error(
+                    "langchain_pg_embedding has no document_tsv column, full-text search will fail. "
+                    "Run python -m scripts.create_vector_indexes to add it."
+                )
+
+            valid_indexes, invalid_indexes = _get_indexes(conn)
+            expected_indexes = list(METADATA_INDEXES)
+            if dimension:
+                expected_indexes.append(HNSW_INDEX_NAME)
+            missing_indexes = [name for name in expected_indexes if name not in valid_indexes]
+            if invalid_indexes:
+                logger.warning(
+                    f"Invalid indexes on langchain_pg_embedding, left by a failed concurrent build: {', '.join(invalid_indexes)}. "
+                    "Run python -m scripts.create_vector_indexes to rebuild them."
+                )
+            if missing_indexes:
+                logger.warning(
+                    f"Missing indexes on langchain_pg_embedding: {', '.join(missing_indexes)}. "
+                    "Run python -m scripts.create_vector_indexes to create them."
+                )
+    except Exception as e:
+        logger.error(f"Error checking vector indexes: {str(e)}", exc_info=True)
+
+
+# noinspection SqlNoDataSourceInspection
+def create_vector_indexes(engine: Engine, dimension: int | None = None) -> None:
+    """
+    Creates the full-text column and the secondary indexes of langchain_pg_embedding when missing.
+
+    langchain_postgres creates its tables on first use, which can happen after migrations ran,
+    so this is run once per deployment by scripts/create_vector_indexes.py. Indexes are built
+    concurrently to avoid blocking writers on large collections. Invalid indexes left by a failed
+    concurrent build are dropped and built again.
+
+    Args:
+        engine: The synchronous engine of the vector store.
+        dimension: The dimension of the current embedding model. The HNSW index needs a fixed
+            dimension column and is skipped when this is unknown.
+    """
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+
+        if conn.execute(text("SELECT to_regclass('public.langchain_pg_embedding')")).scalar() is None:
+            logger.warning("langchain_pg_embedding does not exist, no vector index created")
+            return
+
+        if not _has_tsv_column(conn):
+            logger.info("Adding full-text search column to langchain_pg_embedding")
+            conn.execute(
+                text(f"""
+                    ALTER TABLE langchain_pg_embedding
+                        ADD COLUMN IF NOT EXISTS document_tsv tsvector
+                        GENERATED ALWAYS AS (to_tsvector('{FULLTEXT_SEARCH_CONFIG}', coalesce(document, ''))) STORED
+                """)
+            )
+
+        valid_indexes, invalid_indexes = _get_indexes(conn)
+        for index_name in invalid_indexes:
+            logger.info(f"Dropping invalid index {index_name} on langchain_pg_embedding")
+            conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index_name}"'))
+
+        for index_name, statement in METADATA_INDEXES.items():
+            if index_name not in valid_indexes:
+                logger.info(f"Creating index {index_name} on langchain_pg_embedding")
+                conn.execute(text(statement))
+
+        if HNSW_INDEX_NAME not in valid_indexes and dimension:
+            _create_hnsw_index(conn, dimension)
+
+
+# noinspection SqlNoDataSourceInspection
+def _has_tsv_column(conn) -> bool:
+    return (
+        conn.execute(
+            text("""
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'langchain_pg_embedding' AND column_name = 'document_tsv'
+            """)
+        ).first()
+        is not None
+    )
+
+
+# noinspection SqlNoDataSourceInspection
+def _get_indexes(conn) -> tuple[set[str], list[str]]:
+    """Returns the names of the valid and of the invalid indexes of langchain_pg_embedding."""
+    rows = conn.execute(
+        text("""
+            SELECT c.relname, i.indisvalid FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = 'langchain_pg_embedding'::regclass
+        """)
+    ).all()
+    return {name for name, is_valid in rows if is_valid}, [name for name, is_valid in rows if not is_valid]
+
+
+# noinspection SqlNoDataSourceInspection
+def _create_hnsw_index(conn, dimension: int) -> None:
+    # HNSW requires a typed vector(n) column, langchain_postgres creates an untyped one unless told otherwise
+    column_dimension = conn.execute(
+        text("""
+            SELECT atttypmod FROM pg_attribute
+            WHERE attrelid = 'langchain_pg_embedding'::regclass AND attname = 'embedding'
+        """)
+    ).scalar()
+
+    if column_dimension is None or column_dimension <= 0:
+        has_other_dimensions = conn.execute(
+            text("SELECT EXISTS (SELECT 1 FROM langchain_pg_embedding WHERE vector_dims(embedding) <> :dimension)"),
+            {"dimension": dimension},
+        ).scalar()
+        if has_other_dimensions:
+            logger.warning(
+                "langchain_pg_embedding contains embeddings of several dimensions, skipping HNSW index. "
+                "Re-index the collection with a single embedding model to enable it."
+            )
+            return
+
+        logger.info(f"Fixing langchain_pg_embedding.embedding to vector({dimension})")
+        conn.execute(text(f"ALTER TABLE langchain_pg_embedding ALTER COLUMN embedding TYPE vector({int(dimension)})"))
+    elif column_dimension != dimension:
+        logger.warning(
+            f"Embedding column has dimension {column_dimension} but the embedding model has {dimension}, skipping HNSW index."
+        )
+        return
+
+    logger.info(f"Creating index {HNSW_INDEX_NAME} on langchain_pg_embedding, this may take a while on large collections")
+    conn.execute(
+        text(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {HNSW_INDEX_NAME}
+                ON langchain_pg_embedding USING hnsw (embedding vector_cosine_ops)
+                WITH (m = {int(env_settings.PGVECTOR_HNSW_M)}, ef_construction = {int(env_settings.PGVECTOR_HNSW_EF_CONSTRUCTION)})
+        """)
+    )
+
+
+def configure_vector_search_session(engine: Engine) -> None:
+    """
+    Sets hnsw.ef_search and hnsw.iterative_scan on every new connection of the engine.
+
+    Higher ef_search values improve recall of filtered similarity searches at the cost of latency.
+    With iterative scans (pgvector >= 0.8) the index keeps scanning until enough rows pass the
+    user and upload filters, instead of returning fewer than k results for selective filters.
+    """
+
+    @event.listens_for(engine, "connect")
+    def _set_ef_search(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"SET hnsw.ef_search = {int(env_settings.PGVECTOR_HNSW_EF_SEARCH)}")
+        finally:
+            cursor.close()
+        # Commit so that the pool's reset-on-return rollback does not revert the setting
+        dbapi_connection.commit()
+
+        if env_settings.PGVECTOR_HNSW_ITERATIVE_SCAN == "off":
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"SET hnsw.iterative_scan = {env_settings.PGVECTOR_HNSW_ITERATIVE_SCAN}")
+            dbapi_connection.commit()
+        except Exception as e:
+            # pgvector < 0.8 does not know the setting
+            dbapi_connection.rollback()
+            logger.warning(f"Could not enable HNSW iterative scans, pgvector 0.8 or later is required: {str(e)}")
+        finally:
+            cursor.close()
@@ -0,0 +1,57 @@
+"""
+Shared asyncio Redis client used to coordinate streams across workers.
+
+Redis is optional: without REDIS_URL get_redis_client returns None and callers fall back
+to worker-local behaviour.
+"""
+
+from typing import Any, Optional
+
+from app.core import logging
+from app.core.settings import env_settings
+
+logger = logging.get_logger(__name__)
+
+_redis_client: Optional[Any] = None
+_redis_unavailable = False
+
+
+def get_redis_client() -> Optional[Any]:
+    """
+    Returns the shared Redis client, creating it on first use.
+
+    Returns:
+        The redis.asyncio client, or None when Redis is not configured or not installed.
+    """
+    global _redis_client, _redis_unavailable
+
+    if _redis_client is not None or _redis_unavailable:
+        return _redis_client
+
+    if not env_settings.REDIS_URL:
+        _redis_unavailable = True
+        logger.info("REDIS_URL is not set. Stream coordination will stay local to each worker.")
+        return None
+
+    try:
+        import redis.asyncio as redis
+    except ImportError:
+        _redis_unavailable = True
+        logger.error(
+            "REDIS_URL is set but the redis package cannot be imported. Stream coordination will stay local to each worker."
+        )
+        return None
+
+    _redis_client = redis.from_url(env_settings.REDIS_URL)
+    return _redis_client
+
+
+async def aclose_redis_client() -> None:
+    """
+    Closes the shared Redis client.
+    """
+    global _redis_client
+
+    if _redis_client is not None:
+        await _redis_client.aclose()
+        _redis_client = None
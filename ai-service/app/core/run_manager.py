@@ -0,0 +1,131 @@
+"""
+Run manager module for graph runs detached from HTTP requests.
+
+Runs are started in background tasks of the worker process, buffered by the stream
+buffer and addressed by run id, so clients can stream, poll or cancel them from any
+request. The number of concurrent runs per worker is bounded by the admission controller,
+callers start a run once they hold its permit.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from typing import Optional
+
+from app.core import logging
+from app.core.stream_buffer import RunStream, stream_buffers
+from app.core.stream_control import stream_control
+
+logger = logging.get_logger(__name__)
+
+# --- Constants ---
+# Seconds a cancelled run gets to stop at its next event before its task is cancelled
+CANCEL_GRACE_SECONDS = 5.0
+# Seconds to wait for the stop-control cleanup of a finished run
+CLEANUP_TIMEOUT_SECONDS = 15.0
+
+
+class RunManager:
+    """
+    Starts and tracks the graph runs of this worker process.
+    """
+
+    def __init__(self):
+        """
+        Initializes the RunManager.
+        - Initializes the set of running run ids.
+        """
+        self.active_runs: set[str] = set()
+
+    async def astart(
+        self,
+        user_id: str,
+        thread_id: str,
+        run: Callable[[asyncio.Event], AsyncIterator[str]],
+        on_done: Optional[Callable[[], None]] = None,
+    ) -> RunStream:
+        """
+        Starts a run in the background.
+
+        Args:
+            user_id: The user identifier
+            thread_id: The thread identifier
+            run: Creates the run's server-sent events, given the run's stop event.
+            on_done: Called once the run ended, e.g. to release its admission permit.
+
+        Returns:
+            RunStream: The buffered stream of the run.
+        """
+        stop_event = await stream_control.acreate_stop_event(user_id, thread_id)
+
+        run_stream = stream_buffers.create(
+            user_id,
+            thread_id,
+            self._acontrolled(user_id, thread_id, stop_event, run(stop_event)),
+            stop_event=stop_event,
+            # Runs after this method returned, once the run's task is done
+            on_done=lambda: self._on_run_done(run_stream.run_id, on_done),
+        )
+        self.active_runs.add(run_stream.run_id)
+
+        logger.info(f"Started run {run_stream.run_id} for user {user_id}, thread {thread_id}")
+        return run_stream
+
+    def get(self, run_id: str) -> Optional[RunStream]:
+        """
+        Returns a run of this worker by run id, if it is running or finished recently.
+        """
+        return stream_buffers.get_run(run_id)
+
+    async def acancel(self, run_id: str) -> bool:
+        """
+        Cancels a run of this worker.
+
+        Args:
+            run_id: The run identifier
+
+        Returns:
+            bool: True if the run was running, False otherwise
+        """
+        run_stream = stream_buffers.get_run(run_id)
+        if run_stream is None or run_stream.done:
+            return False
+
+        await run_stream.acancel(grace_seconds=CANCEL_GRACE_SECONDS)
+        logger.info(f"Cancelled run {run_id}")
+        return True
+
+    def _on_run_done(self, run_id: str, on_done: Optional[Callable[[], None]]) -> None:
+        self.active_runs.discard(run_id)
+        if on_done is not None:
+            on_done()
+
+    def snapshot(self) -> dict[str, int]:
+        return {
+            "active_runs": len(self.active_runs),
+        }
+
+    @staticmethod
+    async def _acontrolled(
+        user_id: str,
+        thread_id: str,
+        stop_event: asyncio.Event,
+        frames: AsyncIterator[str],
+    ) -> AsyncIterator[str]:
+        try:
+            async for frame in frames:
+                yield frame
+        finally:
+            # Clean up the connection when streaming ends with timeout protection
+            try:
+                await asyncio.wait_for(
+                    stream_control.acleanup_connection(user_id, thread_id, stop_event),
+                    timeout=CLEANUP_TIMEOUT_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"Cleanup connection timeout for user {user_id}, thread {thread_id}")
+            except Exception as e:
+                logger.error(f"Error during cleanup connection: {e}", exc_info=True)
+
+
+# Singleton instance of RunManager
+run_manager = RunManager()
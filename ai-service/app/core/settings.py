@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -80,16 +81,50 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "<secret-key>"
     MODEL_PROVIDER_ENCRYPTION_KEY: str = "<encryption-key>"
 
+    # Embedding settings
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_MAX_CONCURRENCY: int = 4
+    EMBEDDING_MAX_RETRIES: int = 5
+    EMBEDDING_REQUEST_TIMEOUT: float = 60.0
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 1_000_000
+
     # Vectorstore settings
     PGVECTOR_COLLECTION: str = "<collection-name>"
+    PGVECTOR_HNSW_M: int = 16
+    PGVECTOR_HNSW_EF_CONSTRUCTION: int = 64
+    PGVECTOR_HNSW_EF_SEARCH: int = 100
+    PGVECTOR_HNSW_ITERATIVE_SCAN: Literal["relaxed_order", "strict_order", "off"] = "relaxed_order"
 
     # Graph settings
-    RECURSION_LIMIT: int = 25  # Cache settings
+    RECURSION_LIMIT: int = 25
+    # Only request the astream_events kinds and node names that are sent to clients
+    STREAM_EVENT_FILTERING: bool = True
+    # Token coalescing of streams that opt in: flush after this many milliseconds or buffered content bytes
+    STREAM_COALESCE_INTERVAL_MS: int = 50
+    STREAM_COALESCE_MAX_BYTES: int = 2048
+    # Events kept in memory per run for resuming streams, older ones are spilled to Redis when configured
+    STREAM_BUFFER_MAX_EVENTS: int = 2000
+    # Seconds a finished run stays resumable
+    STREAM_BUFFER_RETENTION_SECONDS: int = 300
+    # Admission control of graph runs per worker, non-positive values disable a limit.
+    # Runs beyond ADMISSION_MAX_CONCURRENT_RUNS wait up to ADMISSION_QUEUE_TIMEOUT_SECONDS, then get a 429.
+    ADMISSION_MAX_CONCURRENT_RUNS: int = 20
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 30.0
+    ADMISSION_MAX_RUNS_PER_USER: int = 3
+    ADMISSION_USER_RUNS_PER_MINUTE: float = 20.0
+    ADMISSION_USER_BURST: int = 5
+
+    # Cache settings
     MAX_PERSONAL_TOOLS_PER_USER: int = 500
     MAX_CACHED_USERS: int = 200
     MAX_CACHED_EXTENSION_SERVICES: int = 400
     MAX_CACHED_MCP_USERS: int = 100
     MAX_MCP_CLIENT_INSTANCES_PER_USER: int = 20
+    MAX_CACHED_GRAPHS: int = 300
+    MAX_CACHED_CHAT_MODELS: int = 128
+    PROVIDER_CREDENTIAL_CACHE_TTL_SECONDS: int = 300
+    TOOL_LOAD_FAILURE_TTL_SECONDS: int = 30
 
     # Upload settings
     MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024  # 50 MB
@@ -101,6 +136,28 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = ""
     CELERY_RESULT_BACKEND: str = ""
 
+    # Checkpoint retention, run by Celery beat every CHECKPOINT_RETENTION_INTERVAL_SECONDS (0 disables it)
+    CHECKPOINT_RETENTION_KEEP_LAST: int = 20
+    CHECKPOINT_RETENTION_BATCH_SIZE: int = 100
+    CHECKPOINT_RETENTION_IDLE_SECONDS: int = 3600
+    CHECKPOINT_RETENTION_INTERVAL_SECONDS: int = 3600
+
+    # zstd compression of checkpoint values of at least CHECKPOINT_COMPRESSION_MIN_BYTES
+    CHECKPOINT_COMPRESSION_ENABLED: bool = True
+    CHECKPOINT_COMPRESSION_MIN_BYTES: int = 1024
+    CHECKPOINT_COMPRESSION_LEVEL: int = 3
+
+    # When the checkpoints of a run are written, per workflow type: every-step, on-interrupt-and-exit or exit-only.
+    # Unlisted workflow types write every step. Teams with human-in-the-loop members never use exit-only.
+    CHECKPOINT_DURABILITY: dict[str, str] = {
+        "chatbot": "exit-only",
+        "ragbot": "exit-only",
+        "searchbot": "exit-only",
+    }
+
+    # Redis used to coordinate streams across workers (stop requests, spilled stream events). Leave empty to keep them worker-local.
+    REDIS_URL: str = ""
+
     # Embedding model. See the list of supported models: https://qdrant.github.io/fastembed/examples/Supported_Models/
     DENSE_EMBEDDING_MODEL: str = "BAAI/bge-small-en-v1.5"
     SPARSE_EMBEDDING_MODEL: str = "prithivida/Splade_PP_en_v1"
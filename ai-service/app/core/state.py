@@ -1,16 +1,20 @@
+import asyncio
 import re
 from enum import Enum
 from typing import Annotated, Any
+from uuid import uuid4
 
-from langchain_core.messages import AnyMessage
+from langchain_core.messages import AnyMessage, RemoveMessage, convert_to_messages, message_chunk_to_message
+from langchain_core.runnables import Runnable, RunnableLambda
 from langchain_core.tools import BaseTool
 from langgraph.graph import add_messages
+from langgraph.prebuilt import ToolNode
 from pydantic import BaseModel, Field
 from typing_extensions import NotRequired, TypedDict
 
 from app.core import logging
 from app.core.enums import StorageStrategy
-from app.core.rag.pgvector import PGVectorWrapper
+from app.core.rag.pgvector import get_pgvector_store
 from app.core.tools.api_tool import dynamic_api_tool
 from app.core.tools.retriever_tool import create_retriever_tool_custom_modified
 from app.core.tools.tool_manager import global_tools, tool_manager
@@ -134,8 +138,36 @@ class GraphUpload(BaseModel):
     upload_id: str = Field(description="Id of the upload")
 
     async def aget_tool(self) -> BaseTool:
-        retriever = PGVectorWrapper().retriever(self.user_id, self.upload_id)
-        return create_retriever_tool_custom_modified(retriever)
+        pgvector_store = get_pgvector_store()
+        return create_retriever_tool_custom_modified(
+            pgvector_store.retriever(self.user_id, self.upload_id),
+            async_retriever=pgvector_store.async_retriever(self.user_id, self.upload_id),
+        )
+
+
+async def aget_tools(tools: list[GraphSkill | GraphUpload]) -> list[BaseTool]:
+    """
+    Resolve the tools of a member concurrently, in the given order.
+
+    Personal tools missing from the cache are loaded first, once per MCP or extension
+    connection, so skills sharing a connection share one fetch.
+    """
+    missing_by_member: dict[str, list[str]] = {}
+    for tool in tools:
+        if isinstance(tool, GraphSkill) and tool.strategy == StorageStrategy.PERSONAL_TOOL_CACHE:
+            try:
+                await tool_manager.aget_personal_tool(tool.user_id, tool.name)
+            except KeyError:
+                missing_by_member.setdefault(tool.member_id, []).append(tool.skill_id)
+
+    if missing_by_member:
+        from app.core.utils.tool_cache_loader import aload_tools_to_cache_by_skills
+
+        await asyncio.gather(
+            *(aload_tools_to_cache_by_skills(skill_ids, member_id) for member_id, skill_ids in missing_by_member.items())
+        )
+
+    return list(await asyncio.gather(*(tool.aget_tool() for tool in tools)))
 
 
 class GraphPerson(BaseModel):
@@ -193,6 +225,87 @@ def add_or_replace_messages(
         return add_messages(messages, new_messages)  # type: ignore[return-value, arg-type]
 
 
+class _MessageIndex:
+    """Positions of the message ids of a MessageList, shared by the lists appended from it."""
+
+    __slots__ = ("positions", "size")
+
+    def __init__(self, messages: list[AnyMessage]):
+        self.positions: dict[str, int] = {message.id: i for i, message in enumerate(messages)}  # type: ignore[misc]
+        self.size = len(messages)
+
+
+class MessageList(list):
+    """
+    A list of messages that knows the ids it contains, built by append_messages.
+
+    Checkpoints store it as a plain list, its index is rebuilt by the first append after a restore.
+    """
+
+    __slots__ = ("_ids",)
+
+
+def append_messages(
+        messages: list[AnyMessage], new_messages: list[AnyMessage] | AnyMessage
+) -> list[AnyMessage]:
+    """
+    Append new messages to the state, like add_messages but without re-merging the whole list.
+
+    Nodes return only the messages they add. Messages with new ids are appended in constant time
+    per message. Updates and removals of existing messages fall back to add_messages.
+    """
+    new_messages = [
+        message_chunk_to_message(message)  # type: ignore[arg-type]
+        for message in convert_to_messages(new_messages if isinstance(new_messages, list) else [new_messages])
+    ]
+    for message in new_messages:
+        if message.id is None:
+            message.id = str(uuid4())
+
+    index = getattr(messages, "_ids", None)
+    if index is None or index.size != len(messages):
+        # Restored from a checkpoint, or another list was already appended to this one
+        merged = add_messages(messages or [], new_messages)  # type: ignore[arg-type]
+        result = MessageList(merged)
+        result._ids = _MessageIndex(result)
+        return result
+
+    new_ids = {message.id for message in new_messages}
+    if (
+            len(new_ids) != len(new_messages)
+            or any(isinstance(message, RemoveMessage) for message in new_messages)
+            or any(message_id in index.positions for message_id in new_ids)
+    ):
+        result = MessageList(add_messages(messages, new_messages))  # type: ignore[arg-type]
+        result._ids = _MessageIndex(result)
+        return result
+
+    # The index is handed over to the new list, the old list must not be appended to again
+    result = MessageList(messages)
+    for message in new_messages:
+        index.positions[message.id] = len(result)  # type: ignore[index]
+        result.append(message)
+    index.size = len(result)
+    result._ids = index
+    return result
+
+
+def _copy_tool_messages(output: Any) -> Any:
+    if isinstance(output, dict) and output.get("messages"):
+        return {**output, "all_messages": output["messages"]}
+    return output
+
+
+def create_tool_node(tools: list[BaseTool]) -> Runnable:
+    """
+    Create a ToolNode that also appends the tool messages to all_messages.
+
+    Every node appends the messages it produces to all_messages itself, so the tool messages are
+    not copied over again from messages when the member answers.
+    """
+    return ToolNode(tools) | RunnableLambda(_copy_tool_messages)
+
+
 def format_messages(messages: list[AnyMessage]) -> str:
     """Format list of messages to string with context optimization"""
     from app.core.utils.context_manager import default_context_manager
@@ -240,8 +353,8 @@ def update_node_outputs(node_outputs: dict[str, Any], new_outputs: dict[str, Any
 
 
 class WorkflowTeamState(TypedDict):
-    all_messages: Annotated[list[AnyMessage], add_messages]
-    history: Annotated[list[AnyMessage], add_messages]
+    all_messages: Annotated[list[AnyMessage], append_messages]
+    history: Annotated[list[AnyMessage], append_messages]
     messages: Annotated[list[AnyMessage], add_or_replace_messages]
     team: GraphTeam
     next: str
@@ -0,0 +1,303 @@
+"""
+Stream buffer module for resumable streaming sessions.
+
+A run's server-sent events are produced by a background task into a per-run ring buffer
+and tagged with increasing event ids. Clients read from the buffer, so a client that
+disconnects can reconnect with its Last-Event-ID and continue where it left off while
+the run keeps going. Events that fall out of the in-process buffer are spilled to Redis
+when it is configured. Subscribers that fall behind further than the events still available
+receive a "gap" event and are expected to reload the thread history.
+"""
+
+import asyncio
+import json
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime
+from typing import Optional
+
+from app.core import logging
+from app.core.enums import RunStatus
+from app.core.graph.messages import ChatResponse
+from app.core.redis_client import get_redis_client
+from app.core.settings import env_settings
+
+logger = logging.get_logger(__name__)
+
+# --- Constants ---
+MAX_BUFFERED_EVENTS = env_settings.STREAM_BUFFER_MAX_EVENTS
+BUFFER_RETENTION_SECONDS = env_settings.STREAM_BUFFER_RETENTION_SECONDS
+SPILL_KEY_PREFIX = "stream-buffer:"
+# Evicted events written to Redis per round trip
+SPILL_BATCH_SIZE = 50
+# Spilled events read back from Redis per round trip
+SPILL_READ_BATCH_SIZE = 500
+
+
+def _format_event(event_id: int, frame: str) -> str:
+    return f"id: {event_id}\n{frame}"
+
+
+class RunStream:
+    """
+    The buffered event log of one streaming run.
+    """
+
+    def __init__(self, user_id: str, thread_id: str):
+        self.user_id = user_id
+        self.thread_id = thread_id
+        self.key = f"{user_id}:{thread_id}"
+        self.run_id = str(uuid.uuid4())
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self.status = RunStatus.RUNNING
+        self.done = False
+        # Stop event of the run, checked by the graph stream
+        self.stop_event: Optional[asyncio.Event] = None
+
+        # Ring buffer of (event_id, frame), the oldest events are spilled to Redis when evicted
+        self.buffer: deque[tuple[int, str]] = deque()
+        self.next_event_id = 1
+
+        self._spill_batch: list[tuple[int, str]] = []
+        self._spilled_until = 0  # Highest event id written to Redis
+        self._redis = get_redis_client()
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def last_event_id(self) -> int:
+        return self.next_event_id - 1
+
+    @property
+    def spill_key(self) -> str:
+        return f"{SPILL_KEY_PREFIX}{self.run_id}"
+
+    def start(self, frames: AsyncIterator[str], on_done: Optional[Callable[[], None]] = None) -> None:
+        """
+        Starts consuming the run's frames in a background task, independent of any client.
+
+        Args:
+            frames: The server-sent events of the run.
+            on_done: Called once the run ended, was cancelled or failed.
+        """
+        self._task = asyncio.create_task(self._aconsume(frames))
+        if on_done is not None:
+            self._task.add_done_callback(lambda _: on_done())
+
+    async def acancel(self, grace_seconds: float = 0) -> None:
+        """
+        Cancels the run.
+
+        The stop event is set first so the graph stream can end with a stop message. The background
+        task is cancelled when it did not end within grace_seconds.
+        """
+        if self._task is None or self._task.done():
+            return
+
+        if self.stop_event is not None and grace_seconds > 0:
+            self.stop_event.set()
+            done, _ = await asyncio.wait({self._task}, timeout=grace_seconds)
+            if done:
+                self.status = RunStatus.CANCELLED
+                return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def asubscribe(self, last_event_id: int = 0) -> AsyncIterator[str]:
+        """
+        Yields the events after last_event_id, then follows the live stream until the run ends.
+
+        Events that are no longer available, because they were evicted from the buffer and could not
+        be read back from Redis, are replaced by a single "gap" event telling the client to reload.
+
+        Args:
+            last_event_id: The id of the last event the client received, 0 to read from the start.
+        """
+        next_id = last_event_id + 1
+        while True:
+            changed = self._changed
+
+            # Events waiting to be spilled stay readable until they are in Redis
+            local_events = [*self._spill_batch, *self.buffer]
+            first_local_id = local_events[0][0] if local_events else self.next_event_id
+            while next_id < first_local_id:
+                spilled = await self._aload_spilled(next_id, first_local_id)
+                if not spilled:
+                    break
+                for event_id, frame in spilled:
+                    if event_id > next_id:
+                        yield self._gap_event(next_id, event_id - 1)
+                    yield _format_event(event_id, frame)
+                    next_id = event_id + 1
+            if next_id < first_local_id:
+                yield self._gap_event(next_id, first_local_id - 1)
+                next_id = first_local_id
+
+            for event_id, frame in local_events:
+                if event_id >= next_id:
+                    yield _format_event(event_id, frame)
+                    next_id = event_id + 1
+
+            if self.done and next_id >= self.next_event_id:
+                return
+            if next_id >= self.next_event_id:
+                await changed.wait()
+
+    def _gap_event(self, first_id: int, last_id: int) -> str:
+        logger.warning(f"Events {first_id}-{last_id} of stream {self.key} are no longer available")
+        response = ChatResponse(
+            type="gap",
+            content=f"Events {first_id}-{last_id} of this stream are no longer available. Reload the thread history.",
+            id=str(uuid.uuid4()),
+            name="system",
+        )
+        # Carries the id of the last missing event, so a reconnect resumes after the gap
+        return _format_event(last_id, f"data: {response.model_dump_json()}\n\n")
+
+    async def _aconsume(self, frames: AsyncIterator[str]) -> None:
+        try:
+            async for frame in frames:
+                await self._aappend(frame)
+            self.status = RunStatus.CANCELLED if self.stop_event is not None and self.stop_event.is_set() else RunStatus.COMPLETED
+        except asyncio.CancelledError:
+            self.status = RunStatus.CANCELLED
+            raise
+        except Exception as e:
+            self.status = RunStatus.FAILED
+            logger.error(f"Error producing stream {self.key}: {e}", exc_info=True)
+        finally:
+            self.done = True
+            self.finished_at = datetime.now()
+            self._notify()
+            aclose = getattr(frames, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    async def _aappend(self, frame: str) -> None:
+        self.buffer.append((self.next_event_id, frame))
+        self.next_event_id += 1
+
+        if len(self.buffer) > MAX_BUFFERED_EVENTS:
+            evicted = self.buffer.popleft()
+            if self._redis is not None:
+                self._spill_batch.append(evicted)
+
+        self._notify()
+
+        if len(self._spill_batch) >= SPILL_BATCH_SIZE:
+            await self._aspill()
+
+    def _notify(self) -> None:
+        # Wake up every subscriber waiting on the current event, later waits use a fresh one
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _aspill(self) -> None:
+        batch = list(self._spill_batch)
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                # Scored by event id, so subscribers read back only the range they missed
+                pipe.zadd(self.spill_key, {json.dumps(event): event[0] for event in batch})
+                pipe.expire(self.spill_key, BUFFER_RETENTION_SECONDS + 3600)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not spill events of stream {self.key} to Redis: {e}")
+        # Dropped from the batch and marked as spilled in one step, subscribers read either of them
+        del self._spill_batch[: len(batch)]
+        self._spilled_until = max(self._spilled_until, batch[-1][0])
+
+    async def _aload_spilled(self, start_id: int, end_id: int) -> list[tuple[int, str]]:
+        if self._redis is None or self._spilled_until < start_id:
+            return []
+        try:
+            items = await self._redis.zrangebyscore(
+                self.spill_key, start_id, end_id - 1, start=0, num=SPILL_READ_BATCH_SIZE
+            )
+        except Exception as e:
+            logger.warning(f"Could not load spilled events of stream {self.key}: {e}")
+            return []
+        return [tuple(json.loads(item)) for item in items]  # type: ignore[misc]
+
+
+class StreamBufferRegistry:
+    """
+    Keeps the latest run stream of every user and thread of this worker process.
+    Finished streams are kept for STREAM_BUFFER_RETENTION_SECONDS so clients can still catch up.
+    """
+
+    def __init__(self):
+        # Key: f"{user_id}:{thread_id}", Value: RunStream
+        self.streams: dict[str, RunStream] = {}
+        # Key: run_id, Value: RunStream
+        self.runs: dict[str, RunStream] = {}
+
+    def create(
+        self,
+        user_id: str,
+        thread_id: str,
+        frames: AsyncIterator[str],
+        stop_event: Optional[asyncio.Event] = None,
+        on_done: Optional[Callable[[], None]] = None,
+    ) -> RunStream:
+        """
+        Starts buffering a run's frames in the background.
+
+        Args:
+            user_id: The user identifier
+            thread_id: The thread identifier
+            frames: The server-sent events of the run.
+            stop_event: The stop event checked by the run, used to cancel it gracefully.
+            on_done: Called once the run ended.
+
+        Returns:
+            RunStream: The buffered stream of the run.
+        """
+        run_stream = RunStream(user_id, thread_id)
+        run_stream.stop_event = stop_event
+        self.streams[run_stream.key] = run_stream
+        self.runs[run_stream.run_id] = run_stream
+
+        def _on_done() -> None:
+            if on_done is not None:
+                on_done()
+            asyncio.get_running_loop().call_later(BUFFER_RETENTION_SECONDS, self._remove, run_stream)
+
+        run_stream.start(frames, on_done=_on_done)
+        return run_stream
+
+    def get(self, user_id: str, thread_id: str) -> Optional[RunStream]:
+        """
+        Returns the latest run stream of a user and thread, if it is still buffered.
+        """
+        return self.streams.get(f"{user_id}:{thread_id}")
+
+    def get_run(self, run_id: str) -> Optional[RunStream]:
+        """
+        Returns a run stream by run id, if it is still buffered.
+        """
+        return self.runs.get(run_id)
+
+    async def aclose(self) -> None:
+        """
+        Cancels every running stream and drops all buffers.
+        """
+        for run_stream in list(self.runs.values()):
+            await run_stream.acancel()
+        self.streams.clear()
+        self.runs.clear()
+
+    def _remove(self, run_stream: RunStream) -> None:
+        self.runs.pop(run_stream.run_id, None)
+        # A newer run on the same thread may have replaced this one already
+        if self.streams.get(run_stream.key) is run_stream:
+            del self.streams[run_stream.key]
+
+
+# Singleton instance of StreamBufferRegistry
+stream_buffers = StreamBufferRegistry()
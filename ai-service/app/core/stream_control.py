@@ -1,101 +1,205 @@
 """
 Stream control module for managing active streaming connections.
 
-This module provides async-safe operations for managing streaming session state,
-including stop flags and active connection tracking.
+Each streaming session owns an asyncio.Event that the stream loop checks directly,
+without taking any lock. Stop requests are applied to the local event and, when
+Redis is configured, published on a Redis channel so that the worker process
+(or pod) actually serving the stream stops it as well.
 """
 
 import asyncio
-from typing import Dict
+import threading
+from typing import Any, Optional
 
-# Async-safe dictionary to track active streaming connections
-# Key: f"{user_id}:{thread_id}", Value: asyncio.Event
-active_connections: Dict[str, asyncio.Event] = {}
-_connections_lock = asyncio.Lock()
+from app.core import logging
+from app.core.redis_client import get_redis_client
 
+logger = logging.get_logger(__name__)
 
-async def acreate_stop_event(user_id: str, thread_id: str) -> asyncio.Event:
-    """
-    Create a stop event for a specific user and thread combination.
-
-    Args:
-        user_id: The user identifier
-        thread_id: The thread identifier
-
-    Returns:
-        asyncio.Event: The stop event for this connection
-    """
-    connection_key = f"{user_id}:{thread_id}"
-    stop_event = asyncio.Event()
+# --- Constants ---
+STOP_CHANNEL = "stream-control:stop"
+ACTIVE_KEY_PREFIX = "stream-control:active:"
+# Upper bound on how long a stream is advertised as active, in case a worker dies without cleaning up
+ACTIVE_KEY_TTL_SECONDS = 6 * 60 * 60
+# Seconds to wait before resubscribing after the Redis connection was lost
+RESUBSCRIBE_DELAY_SECONDS = 5
 
-    async with _connections_lock:
-        active_connections[connection_key] = stop_event
 
-    return stop_event
+def _connection_key(user_id: str, thread_id: str) -> str:
+    return f"{user_id}:{thread_id}"
 
 
-async def atrigger_stop(user_id: str, thread_id: str) -> bool:
+class StreamControl:
     """
-    Trigger stop for a specific user and thread combination.
+    Tracks the active streams of this worker process and their stop events.
 
-    Args:
-        user_id: The user identifier
-        thread_id: The thread identifier
-
-    Returns:
-        bool: True if the connection was found and stop was triggered, False otherwise
+    All bookkeeping happens on the event loop without awaiting in between, so the
+    registry needs no lock. The stream loop only ever reads its own event.
     """
-    connection_key = f"{user_id}:{thread_id}"
-
-    async with _connections_lock:
-        if connection_key in active_connections:
-            active_connections[connection_key].set()
-            return True
-
-    return False
-
-
-async def acleanup_connection(user_id: str, thread_id: str) -> None:
-    """
-    Clean up a connection after streaming is complete.
-
-    Args:
-        user_id: The user identifier
-        thread_id: The thread identifier
-    """
-    connection_key = f"{user_id}:{thread_id}"
-
-    async with _connections_lock:
-        if connection_key in active_connections:
-            del active_connections[connection_key]
 
-
-async def ais_stop_requested(user_id: str, thread_id: str) -> bool:
-    """
-    Check if stop has been requested for a specific connection.
-
-    Args:
-        user_id: The user identifier
-        thread_id: The thread identifier
-
-    Returns:
-        bool: True if stop was requested, False otherwise
-    """
-    connection_key = f"{user_id}:{thread_id}"
-
-    async with _connections_lock:
-        if connection_key in active_connections:
-            return active_connections[connection_key].is_set()
-
-    return False
-
-
-async def aget_active_connections_count() -> int:
-    """
-    Get the number of active streaming connections.
-
-    Returns:
-        int: Number of active connections
-    """
-    async with _connections_lock:
-        return len(active_connections)
+    def __init__(self):
+        """
+        Initializes the StreamControl.
+        - Initializes the registry of active streams.
+        - Prepares the optional Redis client used to propagate stop requests.
+        """
+        # Key: f"{user_id}:{thread_id}", Value: asyncio.Event
+        self.active_connections: dict[str, asyncio.Event] = {}
+
+        self._redis: Any = None
+        self._listener_task: Optional[asyncio.Task] = None
+
+        # Counters exposed through the metrics endpoint
+        self._stats_lock = threading.Lock()
+        self.local_stops = 0
+        self.remote_stops = 0
+
+    async def astart(self) -> None:
+        """
+        Subscribes to stop requests of other workers.
+        Without Redis, stop requests only reach streams of this worker.
+        """
+        self._redis = get_redis_client()
+        if self._redis is not None:
+            self._listener_task = asyncio.create_task(self._alisten())
+
+    async def aclose(self) -> None:
+        """
+        Stops listening for stop requests.
+        """
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+        self._redis = None
+
+    async def acreate_stop_event(self, user_id: str, thread_id: str) -> asyncio.Event:
+        """
+        Create a stop event for a specific user and thread combination.
+
+        Args:
+            user_id: The user identifier
+            thread_id: The thread identifier
+
+        Returns:
+            asyncio.Event: The stop event for this connection
+        """
+        connection_key = _connection_key(user_id, thread_id)
+        stop_event = asyncio.Event()
+        self.active_connections[connection_key] = stop_event
+
+        if self._redis is not None:
+            try:
+                await self._redis.set(ACTIVE_KEY_PREFIX + connection_key, 1, ex=ACTIVE_KEY_TTL_SECONDS)
+            except Exception as e:
+                logger.warning(f"Could not advertise stream {connection_key} in Redis: {e}")
+
+        return stop_event
+
+    async def atrigger_stop(self, user_id: str, thread_id: str) -> bool:
+        """
+        Trigger stop for a specific user and thread combination, on any worker.
+
+        Args:
+            user_id: The user identifier
+            thread_id: The thread identifier
+
+        Returns:
+            bool: True if the connection was found and stop was triggered, False otherwise
+        """
+        connection_key = _connection_key(user_id, thread_id)
+        stopped = self._set_stop(connection_key, remote=False)
+
+        if not stopped and self._redis is not None:
+            try:
+                if await self._redis.exists(ACTIVE_KEY_PREFIX + connection_key):
+                    await self._redis.publish(STOP_CHANNEL, connection_key)
+                    stopped = True
+            except Exception as e:
+                logger.warning(f"Could not publish stop request for stream {connection_key}: {e}")
+
+        return stopped
+
+    async def acleanup_connection(self, user_id: str, thread_id: str, stop_event: Optional[asyncio.Event] = None) -> None:
+        """
+        Clean up a connection after streaming is complete.
+
+        Args:
+            user_id: The user identifier
+            thread_id: The thread identifier
+            stop_event: The stream's own event. When given, a newer stream on the same thread is left untouched.
+        """
+        connection_key = _connection_key(user_id, thread_id)
+        current_event = self.active_connections.get(connection_key)
+        if current_event is None or (stop_event is not None and current_event is not stop_event):
+            return
+        del self.active_connections[connection_key]
+
+        if self._redis is not None:
+            try:
+                await self._redis.delete(ACTIVE_KEY_PREFIX + connection_key)
+            except Exception as e:
+                logger.warning(f"Could not remove stream {connection_key} from Redis: {e}")
+
+    def active_connections_count(self) -> int:
+        """
+        Get the number of active streaming connections of this worker.
+
+        Returns:
+            int: Number of active connections
+        """
+        return len(self.active_connections)
+
+    def snapshot(self) -> dict[str, int]:
+        with self._stats_lock:
+            return {
+                "active_streams": self.active_connections_count(),
+                "local_stops": self.local_stops,
+                "remote_stops": self.remote_stops,
+            }
+
+    def _set_stop(self, connection_key: str, remote: bool) -> bool:
+        stop_event = self.active_connections.get(connection_key)
+        if stop_event is None:
+            return False
+
+        if not stop_event.is_set():
+            stop_event.set()
+            with self._stats_lock:
+                if remote:
+                    self.remote_stops += 1
+                else:
+                    self.local_stops += 1
+        return True
+
+    async def _alisten(self) -> None:
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(STOP_CHANNEL)
+                logger.info(f"Listening for stream stop requests on Redis channel '{STOP_CHANNEL}'")
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    data = message["data"]
+                    connection_key = data.decode() if isinstance(data, bytes) else str(data)
+                    if self._set_stop(connection_key, remote=True):
+                        logger.debug(f"Stream {connection_key} stopped by a request from another worker")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Stream stop subscription failed, retrying in {RESUBSCRIBE_DELAY_SECONDS}s: {e}")
+                await asyncio.sleep(RESUBSCRIBE_DELAY_SECONDS)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+# Singleton instance of StreamControl
+stream_control = StreamControl()
@@ -15,6 +15,7 @@ class RetrieverTool(BaseTool):
     response_format: Literal["content", "content_and_artifact"] = "content_and_artifact"
 
     retriever: BaseRetriever
+    async_retriever: BaseRetriever | None = None
     document_prompt: BasePromptTemplate | PromptTemplate
     document_separator: str
 
@@ -25,7 +26,19 @@ class RetrieverTool(BaseTool):
         logger.debug(f"Retrieving documents for query: {query}")
         docs = self.retriever.invoke(query, config={"callbacks": self.callbacks})
         logger.debug(f"Retrieved {len(docs)} documents")
+        return self._format_result(docs)
 
+    async def _arun(
+        self, query: Annotated[str, "query to look up in retriever"]
+    ) -> tuple[str, list[Document]]:
+        """Retrieve documents from knowledge base without blocking the event loop."""
+        logger.debug(f"Retrieving documents asynchronously for query: {query}")
+        retriever = self.async_retriever or self.retriever
+        docs = await retriever.ainvoke(query, config={"callbacks": self.callbacks})
+        logger.debug(f"Retrieved {len(docs)} documents")
+        return self._format_result(docs)
+
+    def _format_result(self, docs: list[Document]) -> tuple[str, list[Document]]:
         if not docs:
             logger.warning("No documents retrieved")
             return "", []
@@ -43,10 +56,12 @@ def create_retriever_tool_custom_modified(
     retriever: BaseRetriever,
     document_prompt: BasePromptTemplate | None = None,
     document_separator: str = "\n\n",
+    async_retriever: BaseRetriever | None = None,
 ) -> BaseTool:
     document_prompt = document_prompt or PromptTemplate.from_template("{page_content}")
     return RetrieverTool(
         retriever=retriever,
+        async_retriever=async_retriever,
         document_prompt=document_prompt,
         document_separator=document_separator,
     )
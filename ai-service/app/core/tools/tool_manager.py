@@ -2,7 +2,9 @@ import asyncio
 import importlib
 import os
 import re
+import time
 from collections import OrderedDict
+from collections.abc import Awaitable, Callable
 from typing import Any, Dict
 
 from langchain.tools import BaseTool
@@ -28,8 +30,12 @@ logger = logging.get_logger(__name__)
 # --- Constants ---
 MAX_PERSONAL_TOOLS_PER_USER = env_settings.MAX_PERSONAL_TOOLS_PER_USER
 MAX_CACHED_USERS = env_settings.MAX_CACHED_USERS
+TOOL_LOAD_FAILURE_TTL_SECONDS = env_settings.TOOL_LOAD_FAILURE_TTL_SECONDS
 DEFAULT_TOOLS_PACKAGE_PATH = "app.core.tools"
 
+# Key: (connection type, connection id, user id)
+ConnectionKey = tuple[str, str, str]
+
 
 def _standardize_name_part(text_part: str) -> str:
     """
@@ -99,6 +105,11 @@ class ToolManager:
         # Initialize the lock
         self.cache_lock = asyncio.Lock()  # Using asyncio.Lock() for async operations
 
+        # Tool fetches of MCP and extension connections currently running, shared by concurrent loaders
+        self.inflight_fetches: Dict[ConnectionKey, asyncio.Task] = {}
+        # Connections whose last fetch failed -> (retry allowed at, error message)
+        self.failed_fetches: Dict[ConnectionKey, tuple[float, str]] = {}
+
         if MAX_CACHED_USERS <= 0:
             logger.warning("Warning: MAX_CACHED_USERS non-positive. Personal user caching disabled.")
         if MAX_PERSONAL_TOOLS_PER_USER <= 0:
@@ -280,6 +291,66 @@ class ToolManager:
         available_tools.update(user_personal_tools_snapshot)
         return available_tools
 
+    async def afetch_connection_tools(
+        self,
+        connection_type: str,
+        connection_id: str,
+        user_id: str,
+        fetch: Callable[[], Awaitable[list[ToolInfo]]],
+    ) -> list[ToolInfo]:
+        """
+        Fetches the tools of an MCP or extension connection, at most once at a time.
+
+        Concurrent callers for the same connection and user await the fetch already in flight
+        instead of starting their own. A failed fetch is remembered for TOOL_LOAD_FAILURE_TTL_SECONDS,
+        during which callers fail fast without contacting the connection again.
+
+        Args:
+            connection_type: The type of the connection, MCP or extension.
+            connection_id: The ID of the connection.
+            user_id: The user the connection belongs to.
+            fetch: Fetches the tools of the connection.
+
+        Raises:
+            ValueError: If the connection failed recently.
+        """
+        key: ConnectionKey = (connection_type, connection_id, user_id)
+
+        failure = self.failed_fetches.get(key)
+        if failure is not None:
+            retry_at, error = failure
+            if time.monotonic() < retry_at:
+                raise ValueError(f"Loading tools of {connection_type} connection {connection_id} failed recently: {error}")
+            del self.failed_fetches[key]
+
+        task = self.inflight_fetches.get(key)
+        if task is None:
+            task = asyncio.create_task(fetch())
+            self.inflight_fetches[key] = task
+            task.add_done_callback(lambda done: self._on_fetch_done(key, done))
+        else:
+            logger.info(f"Joining the running tool fetch of {connection_type} connection {connection_id}")
+
+        # Shielded so a cancelled caller does not cancel the fetch of the others
+        return await asyncio.shield(task)
+
+    def _on_fetch_done(self, key: ConnectionKey, task: asyncio.Task) -> None:
+        if self.inflight_fetches.get(key) is task:
+            del self.inflight_fetches[key]
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None and TOOL_LOAD_FAILURE_TTL_SECONDS > 0:
+            self.failed_fetches[key] = (time.monotonic() + TOOL_LOAD_FAILURE_TTL_SECONDS, str(error))
+
+    def clear_failed_fetches(self, connection_id: str | None = None):
+        """
+        Forgets the failed fetches of a connection, or of every connection, e.g. after it was reconfigured.
+        """
+        for key in list(self.failed_fetches):
+            if connection_id is None or key[1] == connection_id:
+                del self.failed_fetches[key]
+
     def get_global_tools(self) -> Dict[str, ToolInfo]:
         # Reading global_tools is safe as it's populated at init and then read-only.
         return self.global_tools.copy()
@@ -13,9 +13,14 @@ See README files for detailed documentation:
 - README_enhanced_graphskill.md: Enhanced GraphSkill functionality
 """
 
-from .tool_cache_loader import aload_tools_to_cache_by_skill, apreload_member_tools_cache
+from .tool_cache_loader import (
+    aload_tools_to_cache_by_skill,
+    aload_tools_to_cache_by_skills,
+    apreload_member_tools_cache,
+)
 
 __all__ = [
     "aload_tools_to_cache_by_skill",
+    "aload_tools_to_cache_by_skills",
     "apreload_member_tools_cache",
 ]
@@ -2,11 +2,14 @@
 Helper functions for loading tools into cache based on skills.
 """
 
+import asyncio
+
 from sqlalchemy import select
 
 from app.core import logging
 from app.core.db_session import AsyncSessionLocal
 from app.core.enums import ConnectedServiceType
+from app.core.models import ToolInfo
 from app.core.tools.tool_manager import tool_manager
 from app.core.utils.convert_type import convert_base_tool_to_tool_info
 from app.db_models.connected_extension import ConnectedExtension
@@ -74,6 +77,60 @@ async def aload_tools_to_cache_by_skill(skill_id: str, member_id: str) -> None:
             raise
 
 
+async def aload_tools_to_cache_by_skills(skill_ids: list[str], member_id: str) -> None:
+    """
+    Load tools into cache for several skills of a member at once.
+
+    The skills are grouped by their MCP or extension connection and every connection is
+    loaded once, concurrently with the others. A connection that fails to load is logged
+    and does not prevent the others from being cached.
+
+    Args:
+        skill_ids: The IDs of the skills to load tools for
+        member_id: The ID of the member to find related skills for caching
+    """
+    if not skill_ids:
+        return
+
+    async with AsyncSessionLocal() as session:
+        skills_statement = select(Skill).where(Skill.id.in_(skill_ids), Skill.is_deleted.is_(False))
+        result = await session.execute(skills_statement)
+        skills = result.scalars().all()
+
+    connections: set[tuple[ConnectedServiceType, str]] = set()
+    for skill in skills:
+        if skill.reference_type == ConnectedServiceType.MCP and skill.mcp_id:
+            connections.add((ConnectedServiceType.MCP, skill.mcp_id))
+        elif skill.reference_type == ConnectedServiceType.EXTENSION and skill.extension_id:
+            connections.add((ConnectedServiceType.EXTENSION, skill.extension_id))
+
+    if not connections:
+        return
+
+    connections_list = list(connections)
+    results = await asyncio.gather(
+        *(_aload_connection_tools_to_cache(reference_type, reference_id, member_id) for reference_type, reference_id in connections_list),
+        return_exceptions=True,
+    )
+    for (reference_type, reference_id), result in zip(connections_list, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error loading {reference_type} tools of connection {reference_id} for member {member_id}: {result}")
+
+    logger.info(f"Loaded tools of {len(connections_list)} connections for {len(skill_ids)} skills of member {member_id}")
+
+
+async def _aload_connection_tools_to_cache(reference_type: ConnectedServiceType, reference_id: str, member_id: str) -> None:
+    """
+    Load the tools of one MCP or extension connection to cache, in its own session so
+    several connections can be loaded concurrently.
+    """
+    async with AsyncSessionLocal() as session:
+        if reference_type == ConnectedServiceType.MCP:
+            await _aload_mcp_tools_to_cache(session, reference_id, member_id)
+        elif reference_type == ConnectedServiceType.EXTENSION:
+            await _aload_extension_tools_to_cache(session, reference_id, member_id)
+
+
 async def _aload_mcp_tools_to_cache(session, mcp_id: str, member_id: str) -> None:
     """
     Load MCP tools to cache for related skills.
@@ -100,8 +157,13 @@ async def _aload_mcp_tools_to_cache(session, mcp_id: str, member_id: str) -> Non
             "transport": connected_mcp.transport.value,  # Convert enum to string
         }
     }
-    # Get tool information from MCP service
-    tool_infos = await McpService.aget_mcp_tool_info(connections=connections)  # type: ignore
+    # Get tool information from MCP service, shared with concurrent loaders of the same connection
+    tool_infos = await tool_manager.afetch_connection_tools(
+        ConnectedServiceType.MCP,
+        mcp_id,
+        connected_mcp.user_id,
+        lambda: McpService.aget_mcp_tool_info(connections=connections),  # type: ignore
+    )
     logger.info(f"Retrieved {len(tool_infos)} tools from MCP service")
 
     # Get all skills from member that have the same MCP reference
@@ -151,18 +213,27 @@ async def _aload_extension_tools_to_cache(session, extension_id: str, member_id:
 
     logger.info(f"Loading extension tools for '{connected_extension.extension_name}'")
 
-    # Get extension service info
-    extension_service_info = await extension_service_manager.aget_service_info(service_enum=connected_extension.extension_enum)
+    async def _afetch_extension_tools() -> list[ToolInfo]:
+        # Get extension service info
+        extension_service_info = await extension_service_manager.aget_service_info(service_enum=connected_extension.extension_enum)
+
+        if not extension_service_info or not extension_service_info.service_object:
+            raise ValueError(f"Extension service info for {connected_extension.extension_enum} not found or service object is None")
 
-    if not extension_service_info or not extension_service_info.service_object:
-        raise ValueError(f"Extension service info for {connected_extension.extension_enum} not found or service object is None")
+        # Get authenticated tools from extension service
+        extension_service = extension_service_info.service_object
+        tools = extension_service.get_authed_tools(user_id=connected_extension.user_id)
 
-    # Get authenticated tools from extension service
-    extension_service = extension_service_info.service_object
-    tools = extension_service.get_authed_tools(user_id=connected_extension.user_id)
+        # Convert BaseTool instances to ToolInfo instances
+        return [convert_base_tool_to_tool_info(tool) for tool in tools]
 
-    # Convert BaseTool instances to ToolInfo instances
-    tool_infos = [convert_base_tool_to_tool_info(tool) for tool in tools]
+    # Shared with concurrent loaders of the same connection
+    tool_infos = await tool_manager.afetch_connection_tools(
+        ConnectedServiceType.EXTENSION,
+        extension_id,
+        connected_extension.user_id,
+        _afetch_extension_tools,
+    )
     logger.info(f"Retrieved {len(tool_infos)} tools from extension service")
 
     # Get all skills from member that have the same extension reference
@@ -292,15 +363,12 @@ async def apreload_member_tools_cache(member_id: str) -> None:
                         extension_groups[skill.extension_id] = []
                     extension_groups[skill.extension_id].append(skill)
 
-            # Load MCP tools
-            for mcp_id in mcp_groups:
-                logger.info(f"Loading MCP tools for connection {mcp_id}")
-                await _aload_mcp_tools_to_cache(session, mcp_id, member_id)
-
-            # Load extension tools
-            for extension_id in extension_groups:
-                logger.info(f"Loading extension tools for connection {extension_id}")
-                await _aload_extension_tools_to_cache(session, extension_id, member_id)
+            # Load MCP and extension tools, every connection concurrently
+            logger.info(f"Loading tools for MCP connections {list(mcp_groups)} and extension connections {list(extension_groups)}")
+            await asyncio.gather(
+                *(_aload_connection_tools_to_cache(ConnectedServiceType.MCP, mcp_id, member_id) for mcp_id in mcp_groups),
+                *(_aload_connection_tools_to_cache(ConnectedServiceType.EXTENSION, extension_id, member_id) for extension_id in extension_groups),
+            )
 
             logger.info(f"Successfully preloaded all tools for member {member_id}")
 
@@ -1,4 +1,5 @@
 import time
+from functools import partial
 from typing import Any
 
 from langchain_core.messages import AIMessage, AnyMessage
@@ -6,14 +7,13 @@ from langchain_core.runnables import RunnableLambda
 from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.graph import CompiledGraph
-from langgraph.prebuilt import ToolNode
 
 from app.core.enums import InterruptType
 from app.core.workflow.node.parameter_extractor_node import ParameterExtractorNode
 from app.core.workflow.node.plugin_node import PluginNode
 from app.core.workflow.utils.tools_utils import get_retrieval_tool, get_tool
 
-from ..state import WorkflowTeamState
+from ..state import WorkflowTeamState, create_tool_node
 from .node.agent_node import AgentNode
 from .node.answer_node import AnswerNode
 from .node.classifier_node import ClassifierNode
@@ -33,11 +33,7 @@ def validate_config(config: dict[str, Any]) -> bool:
     return all(key in config for key in required_keys)
 
 
-# Add a global variable to store the mapping from tool names to node IDs
-tool_name_to_node_id: dict[str, str] = {}
-
-
-def should_continue_tools(state: WorkflowTeamState) -> str:
+def should_continue_tools(state: WorkflowTeamState, tool_name_to_node_id: dict[str, list[str]]) -> str:
     messages: list[AnyMessage] = state["messages"]
     if messages and isinstance(messages[-1], AIMessage) and messages[-1].tool_calls:
         for tool_call in messages[-1].tool_calls:
@@ -67,7 +63,7 @@ def should_continue_ifelse(state: WorkflowTeamState) -> str:
     return "false_else"  # Default return ELSE branch
 
 
-def _add_tools_conditional_edges(graph_builder, conditional_edges, nodes):
+def _add_tools_conditional_edges(graph_builder, conditional_edges, nodes, tool_name_to_node_id):
     """Add conditional edges to graph"""
     for node_id, conditions in conditional_edges.items():
         edges_dict = {
@@ -80,7 +76,9 @@ def _add_tools_conditional_edges(graph_builder, conditional_edges, nodes):
 
         if edges_dict != {"default": END}:
             graph_builder.add_conditional_edges(
-                node_id, should_continue_tools, edges_dict
+                node_id,
+                partial(should_continue_tools, tool_name_to_node_id=tool_name_to_node_id),
+                edges_dict,
             )
 
 
@@ -164,8 +162,6 @@ def initialize_graph(
     checkpointer: BaseCheckpointSaver | None,
     save_graph_img=False,
 ) -> CompiledGraph:
-    global tool_name_to_node_id
-
     if not validate_config(build_config):
         raise ValueError("Invalid configuration structure")
 
@@ -176,7 +172,8 @@ def initialize_graph(
 
         graph_builder.add_node("InputNode", InputNode)
 
-        # Create tool name to node ID mapping
+        # Create tool name to node ID mapping, bound to this graph so that
+        # cached and nested graphs do not share routing state
         tool_name_to_node_id = _create_tool_name_mapping(nodes)
 
         # Determine graph type
@@ -235,7 +232,7 @@ def initialize_graph(
             _add_edge(graph_builder, edge, nodes, conditional_edges)
 
         # Add conditional edges
-        _add_tools_conditional_edges(graph_builder, conditional_edges, nodes)
+        _add_tools_conditional_edges(graph_builder, conditional_edges, nodes, tool_name_to_node_id)
 
         # Add conditional edges for classifier nodes
         classifier_nodes = [
@@ -456,7 +453,7 @@ def _add_tool_node(graph_builder, node_id, node_type, node_data):
             )
             for tool in node_data["tools"]
         ]
-    graph_builder.add_node(node_id, ToolNode(tools))
+    graph_builder.add_node(node_id, create_tool_node(tools))
 
 
 def _add_edge(graph_builder, edge, nodes, conditional_edges):
@@ -198,9 +198,9 @@ class AgentNode:
         state["node_outputs"] = update_node_outputs(state["node_outputs"], new_output)
 
         return_state: ReturnWorkflowTeamState = {
-            "history": history + [result],
+            "history": [result],
             "messages": [result] if hasattr(result, "tool_calls") and result.tool_calls else [],
-            "all_messages": messages + [result],
+            "all_messages": messages,
             "node_outputs": state["node_outputs"],
         }
 
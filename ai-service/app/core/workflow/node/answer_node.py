@@ -35,9 +35,9 @@ class AnswerNode:
         new_output = {self.node_id: {"response": result.content}}
         state["node_outputs"] = update_node_outputs(state["node_outputs"], new_output)
         return_state: ReturnWorkflowTeamState = {
-            "history": state.get("history", []) + [result],
+            "history": [result],
             "messages": [result],
-            "all_messages": state.get("all_messages", []) + [result],
+            "all_messages": [result],
             "node_outputs": state["node_outputs"],
         }
         return return_state
@@ -434,9 +434,9 @@ class CodeNode:
             )
 
             return_state: ReturnWorkflowTeamState = {
-                "history": state.get("history", []) + [result],
+                "history": [result],
                 "messages": [result],
-                "all_messages": state.get("all_messages", []) + [result],
+                "all_messages": [result],
                 "node_outputs": state["node_outputs"],
             }
             return return_state
@@ -455,9 +455,9 @@ class CodeNode:
                 state["node_outputs"], new_output
             )
             return_state: ReturnWorkflowTeamState = {
-                "history": state.get("history", []) + [result],
+                "history": [result],
                 "messages": [result],
-                "all_messages": state.get("all_messages", []) + [result],
+                "all_messages": [result],
                 "node_outputs": state["node_outputs"],
             }
             return return_state
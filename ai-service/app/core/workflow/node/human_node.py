@@ -48,15 +48,8 @@ class HumanNode:
 
         if self.interaction_type == InterruptType.TOOL_REVIEW:
             if not isinstance(self.last_message, AIMessage) or not hasattr(self.last_message, "tool_calls") or not self.last_message.tool_calls:
-                return {
-                    "all_messages": state["all_messages"],
-                    "history": state["history"],
-                    "messages": state["messages"],
-                    "team": state["team"],
-                    "next": state["next"],
-                    "task": state["task"],
-                    "node_outputs": state["node_outputs"],
-                }
+                # Nothing to review, the state is left unchanged
+                return {}
 
             tool_call = self.last_message.tool_calls
             interrupt_data.update(
@@ -125,9 +118,9 @@ class HumanNode:
                 )
 
                 return_state: ReturnWorkflowTeamState = {
-                    "history": (self.history or []) + result,
+                    "history": result,
                     "messages": result,
-                    "all_messages": (self.all_messages or []) + result,
+                    "all_messages": result,
                 }
                 next_node = self.routes.get("rejected", "call_llm")
                 return Command(goto=next_node, update=return_state)
@@ -157,9 +150,9 @@ class HumanNode:
                 )
 
                 return_state: ReturnWorkflowTeamState = {
-                    "history": (self.history or []) + [updated_message],
+                    "history": [updated_message],
                     "messages": [updated_message],
-                    "all_messages": (self.all_messages or []) + [updated_message],
+                    "all_messages": [updated_message],
                 }
                 next_node = self.routes.get("update", "run_tool")
                 return Command(goto=next_node, update=return_state)
@@ -177,9 +170,9 @@ class HumanNode:
                 result = HumanMessage(content=review_data, name="user", id=str(uuid4()))
                 next_node = self.routes.get("review", "call_llm")
                 return_state: ReturnWorkflowTeamState = {
-                    "history": (self.history or []) + [result],
+                    "history": [result],
                     "messages": [result],
-                    "all_messages": (self.all_messages or []) + [result],
+                    "all_messages": [result],
                 }
                 return Command(goto=next_node, update=return_state)
 
@@ -199,9 +192,9 @@ class HumanNode:
 
             next_node = self.routes.get("continue", "call_llm")
             return_state: ReturnWorkflowTeamState = {
-                "history": (self.history or []) + [result],
+                "history": [result],
                 "messages": [result],
-                "all_messages": (self.all_messages or []) + [result],
+                "all_messages": [result],
             }
             return Command(goto=next_node, update=return_state)
         else:
@@ -107,7 +107,6 @@ class LLMNode(LLMBaseNode):
                 ]
             )
         history = state.get("history", [])
-        messages = state.get("messages", [])
         all_messages = state.get("all_messages", [])
         prompt = llm_node_prompts.partial(history_string=format_messages(history))
         chain: RunnableSerializable[dict[str, Any], AnyMessage] = prompt | self.model
@@ -143,9 +142,9 @@ class LLMNode(LLMBaseNode):
         state["node_outputs"] = update_node_outputs(state["node_outputs"], new_output)
 
         return_state: ReturnWorkflowTeamState = {
-            "history": history + [result],
+            "history": [result],
             "messages": [result] if hasattr(result, "tool_calls") else [],
-            "all_messages": messages + [result],
+            "all_messages": [result],
             "node_outputs": state["node_outputs"],
         }
         return return_state
\ No newline at end of file
@@ -134,10 +134,6 @@ class MCPNode(MCPBaseNode):
         if "node_outputs" not in state:
             state["node_outputs"] = {}
 
-        history = state.get("history", [])
-        messages = state.get("messages", [])
-        state.get("all_messages", [])
-
         input_text = (
             parse_variables(self.input, state["node_outputs"]) if self.input else None
         )
@@ -157,9 +153,9 @@ class MCPNode(MCPBaseNode):
         state["node_outputs"] = update_node_outputs(state["node_outputs"], new_output)
 
         return_state: ReturnWorkflowTeamState = {
-            "history": history + result["messages"],
+            "history": result["messages"],
             "messages": result["messages"],
-            "all_messages": messages + result["messages"],
+            "all_messages": result["messages"],
             "node_outputs": state["node_outputs"],
         }
 
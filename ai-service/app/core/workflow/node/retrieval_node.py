@@ -4,7 +4,7 @@ from langchain_core.messages import AIMessage, ToolMessage
 from langchain_core.runnables import RunnableConfig
 
 from app.core import logging
-from app.core.rag.pgvector import PGVectorWrapper
+from app.core.rag.pgvector import get_pgvector_store
 from app.core.state import (
     ReturnWorkflowTeamState,
     WorkflowTeamState,
@@ -20,7 +20,7 @@ class RetrievalNode:
     def __init__(self, node_id: str, query: str, user_id: str, kb_id: str):
         self.node_id = node_id
         self.query = query
-        self.pgvector_store = PGVectorWrapper()
+        self.pgvector_store = get_pgvector_store()
         self.user_id = user_id
         self.kb_id = kb_id
 
@@ -33,7 +33,7 @@ class RetrievalNode:
 
         if self.query:
             parsed_input_schema = parse_variables(self.query, state["node_outputs"])
-            retrieval_result = self._retrieval_work(parsed_input_schema)
+            retrieval_result = await self._aretrieval_work(parsed_input_schema)
             result = ToolMessage(
                 content=retrieval_result,
                 # name="KnowledgeBase",
@@ -50,20 +50,21 @@ class RetrievalNode:
         new_output = {self.node_id: {"response": result.content}}
         state["node_outputs"] = update_node_outputs(state["node_outputs"], new_output)
         return_state: ReturnWorkflowTeamState = {
-            "history": state.get("history", []) + [result],
+            "history": [result],
             "messages": [result],
-            "all_messages": state.get("all_messages", []) + [result],
+            "all_messages": [result],
             "node_outputs": state["node_outputs"],
         }
         return return_state
 
-    def _retrieval_work(self, qry):
+    async def _aretrieval_work(self, qry):
 
-        retriever = self.pgvector_store.retriever(self.user_id, self.kb_id)
+        retriever_tool = create_retriever_tool_custom_modified(
+            self.pgvector_store.retriever(self.user_id, self.kb_id),
+            async_retriever=self.pgvector_store.async_retriever(self.user_id, self.kb_id),
+        )
 
-        retriever_tool = create_retriever_tool_custom_modified(retriever)
-
-        result_string, docs = retriever_tool._run(qry)
+        result_string, docs = await retriever_tool._arun(qry)
 
         logger.info(f"Retriever tool result: {result_string[:100]}...")
         return result_string
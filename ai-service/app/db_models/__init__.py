@@ -5,6 +5,7 @@ from app.db_models.checkpoint import Checkpoint
 from app.db_models.checkpoint_blobs import CheckpointBlobs
 from app.db_models.connected_extension import ConnectedExtension
 from app.db_models.connected_mcp import ConnectedMcp
+from app.db_models.embedding_cache import EmbeddingCache
 from app.db_models.graph import Graph
 from app.db_models.member import Member
 from app.db_models.member_skill_link import MemberSkillLink
@@ -15,6 +16,7 @@ from app.db_models.skill import Skill
 from app.db_models.subgraph import Subgraph
 from app.db_models.team import Team
 from app.db_models.thread import Thread
+from app.db_models.thread_message import ThreadMessage
 from app.db_models.upload import Upload
 from app.db_models.user import User
 from app.db_models.user_api_key import UserApiKey
@@ -26,6 +28,7 @@ __all__ = [
     "BaseEntity",
     "ConnectedExtension",
     "ConnectedMcp",
+    "EmbeddingCache",
     "Thread",
     "User",
     "UserApiKey",
@@ -41,6 +44,7 @@ __all__ = [
     "Model",
     "Skill",
     "Subgraph",
+    "ThreadMessage",
     "Upload",
     "Write",
 ]
@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, LargeBinary, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db_models.base_entity import Base
+
+
+class EmbeddingCache(Base):
+    __tablename__ = "embedding_cache"
+
+    # sha256 of the normalised chunk text
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    provider: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model: Mapped[str] = mapped_column(String, primary_key=True)
+
+    dimension: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Packed float32 values
+    embedding: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_used_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (Index("ix_embedding_cache_last_used_at", "last_used_at"),)
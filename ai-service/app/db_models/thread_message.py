@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Identity, Index, String, Text, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db_models.base_entity import Base
+
+
+class ThreadMessage(Base):
+    """
+    Append-only projection of the messages of a thread, written after every run.
+    Serves the thread history without loading the thread's checkpoints.
+    """
+    __tablename__ = "thread_messages"
+
+    # Increasing across all threads, orders the messages of a thread and is the pagination key
+    seq: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    thread_id: Mapped[str] = mapped_column(String, ForeignKey("threads.id", ondelete="CASCADE"), nullable=False)
+    # LangGraph message id, or the tool call id for tool messages
+    message_id: Mapped[str] = mapped_column(String, nullable=False)
+
+    role: Mapped[str] = mapped_column(String(16), nullable=False)  # human | ai | tool
+    name: Mapped[str] = mapped_column(String, nullable=False, default="")
+    content: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    imgdata: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    tool_calls: Mapped[Optional[list[dict[str, Any]]]] = mapped_column(JSONB, nullable=True)
+    tool_output: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    documents: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("thread_id", "message_id", name="uq_thread_messages_thread_id_message_id"),
+        Index("ix_thread_messages_thread_id_seq", "thread_id", "seq"),
+    )
@@ -6,8 +6,10 @@ from app.core import logging
 from app.core.celery_app import celery_app
 from app.core.db_session import SyncSessionLocal
 from app.core.enums import UploadStatus
-from app.core.rag.pgvector import PGVectorWrapper
+from app.core.rag.pgvector import get_pgvector_store
 from app.db_models.upload import Upload
+from app.memory.checkpoint_retention import KEEP_LAST_CHECKPOINTS
+from app.memory.checkpoint_retention import purge_checkpoints as apply_checkpoint_retention
 
 logger = logging.get_logger(__name__)
 
@@ -23,7 +25,7 @@ def add_upload(file_path: str, upload_id: int, user_id: int, chunk_size: int, ch
         if not upload:
             raise ValueError("Upload not found")
         try:
-            PGVectorWrapper().add(file_path, upload_id, user_id, chunk_size, chunk_overlap)
+            get_pgvector_store().add(file_path, upload_id, user_id, chunk_size, chunk_overlap)
             setattr(upload, "status", UploadStatus.COMPLETED)
             session.add(upload)
             session.commit()
@@ -45,8 +47,7 @@ def edit_upload(file_path: str, upload_id: int, user_id: int, chunk_size: int, c
         if not upload:
             raise ValueError("Upload not found")
         try:
-            pgvector_store = PGVectorWrapper()
-            logger.info("PGVectorWrapper initialized successfully")
+            pgvector_store = get_pgvector_store()
             pgvector_store.update(file_path, upload_id, user_id, chunk_size, chunk_overlap)
             setattr(upload, "status", UploadStatus.COMPLETED)
             session.add(upload)
@@ -71,7 +72,7 @@ def remove_upload(upload_id: int, user_id: int) -> None:
             return
 
         try:
-            pgvector_store = PGVectorWrapper()
+            pgvector_store = get_pgvector_store()
             deletion_successful = pgvector_store.delete(upload_id, user_id)
 
             if deletion_successful:
@@ -101,15 +102,26 @@ def perform_search(
     search_type: str,
     top_k: int,
     score_threshold: float,
+    fusion: str = "rrf",
+    rrf_k: int = 60,
+    vector_weight: float = 0.5,
 ):
-    pgvector_store = PGVectorWrapper()
+    pgvector_store = get_pgvector_store()
     if search_type == "vector":
         results = pgvector_store.vector_search(user_id, [upload_id], query, top_k, score_threshold)
     elif search_type == "fulltext":
         results = pgvector_store.fulltext_search(user_id, [upload_id], query, top_k, score_threshold)
     elif search_type == "hybrid":
-        results = pgvector_store.hybrid_search(user_id, [upload_id], query, top_k, score_threshold)
+        results = pgvector_store.hybrid_search(
+            user_id, [upload_id], query, top_k, score_threshold, fusion=fusion, rrf_k=rrf_k, vector_weight=vector_weight
+        )
     else:
         raise ValueError(f"Invalid search type: {search_type}")
 
     return [{"content": doc.page_content, "score": doc.metadata.get("score", 0)} for doc in results]
+
+
+@celery_app.task
+def purge_checkpoints(keep_last: int | None = None) -> dict:
+    report = apply_checkpoint_retention(keep_last or KEEP_LAST_CHECKPOINTS)
+    return report.to_dict()
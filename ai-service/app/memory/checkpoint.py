@@ -8,6 +8,7 @@ from psycopg_pool import AsyncConnectionPool
 
 from app.core import logging
 from app.core.settings import env_settings
+from app.memory.serde import get_checkpoint_serializer
 
 Conn = AsyncConnection[DictRow] | AsyncConnectionPool[AsyncConnection[DictRow]]
 
@@ -17,6 +18,8 @@ logger = logging.get_logger(__name__)
 class AsyncPostgresPool:
     _async_pool: Optional[Conn] = None
     _is_initialized: bool = False
+    # Shared by every checkpointer, holds the per-thread zstd contexts
+    _serde = get_checkpoint_serializer()
 
     @classmethod
     async def asetup(cls) -> None:
@@ -56,7 +59,7 @@ class AsyncPostgresPool:
         """
         if cls._async_pool is None:
             raise HTTPException(status_code=500, detail="Connection pool not set up. Please call asetup() first.")
-        checkpoint = AsyncPostgresSaver(cls._async_pool)
+        checkpoint = AsyncPostgresSaver(cls._async_pool, serde=cls._serde)
         if not cls._is_initialized:
             await checkpoint.setup()
             cls._is_initialized = True
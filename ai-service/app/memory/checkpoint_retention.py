@@ -0,0 +1,228 @@
+"""
+Retention of LangGraph checkpoints.
+
+The checkpointer keeps every checkpoint and pending write of every step of every thread.
+The retention purge deletes all checkpoint data and projected messages of soft-deleted threads
+and keeps only the last CHECKPOINT_RETENTION_KEEP_LAST checkpoints of every other idle thread,
+together with their pending writes and the channel blobs they reference. Deletes run in batches of threads,
+each committed on its own, so that locks stay short and autovacuum can keep up.
+"""
+
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from sqlalchemy import Connection, text
+
+from app.core import logging
+from app.core.db_session import sync_engine
+from app.core.settings import env_settings
+
+logger = logging.get_logger(__name__)
+
+# --- Constants ---
+KEEP_LAST_CHECKPOINTS = env_settings.CHECKPOINT_RETENTION_KEEP_LAST
+THREADS_PER_BATCH = env_settings.CHECKPOINT_RETENTION_BATCH_SIZE
+# Threads with a newer checkpoint may be running, their latest blobs can precede their checkpoint
+IDLE_SECONDS = env_settings.CHECKPOINT_RETENTION_IDLE_SECONDS
+# Pause between batches, leaves room for the regular load of the database
+BATCH_PAUSE_SECONDS = 0.05
+
+
+@dataclass
+class RetentionReport:
+    """
+    Outcome of a retention purge. Bytes are the stored sizes of the deleted rows, the disk space
+    is reclaimed by the next (auto)vacuum.
+    """
+
+    threads: int = 0
+    checkpoints: int = 0
+    writes: int = 0
+    blobs: int = 0
+    messages: int = 0
+    reclaimed_bytes: int = 0
+    duration_seconds: float = 0.0
+
+    def add(self, table: str, deleted: int, size: int) -> None:
+        setattr(self, table, getattr(self, table) + deleted)
+        self.reclaimed_bytes += size
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+# noinspection SqlNoDataSourceInspection
+_DELETE_THREAD_MESSAGES = text("""
+    WITH deleted AS (
+        DELETE FROM thread_messages m WHERE m.thread_id = ANY(:thread_ids)
+        RETURNING pg_column_size(m.*) AS size
+    )
+    SELECT count(*), coalesce(sum(size), 0) FROM deleted
+""")
+
+# noinspection SqlNoDataSourceInspection
+_DELETE_THREAD_WRITES = text("""
+    WITH deleted AS (
+        DELETE FROM checkpoint_writes w WHERE w.thread_id = ANY(:thread_ids)
+        RETURNING pg_column_size(w.*) AS size
+    )
+    SELECT count(*), coalesce(sum(size), 0) FROM deleted
+""")
+
+# noinspection SqlNoDataSourceInspection
+_DELETE_THREAD_BLOBS = text("""
+    WITH deleted AS (
+        DELETE FROM checkpoint_blobs b WHERE b.thread_id = ANY(:thread_ids)
+        RETURNING pg_column_size(b.*) AS size
+    )
+    SELECT count(*), coalesce(sum(size), 0) FROM deleted
+""")
+
+# noinspection SqlNoDataSourceInspection
+_DELETE_THREAD_CHECKPOINTS = text("""
+    WITH deleted AS (
+        DELETE FROM checkpoints c WHERE c.thread_id = ANY(:thread_ids)
+        RETURNING pg_column_size(c.*) AS size
+    )
+    SELECT count(*), coalesce(sum(size), 0) FROM deleted
+""")
+
+# Checkpoint ids are time ordered, so the highest ids of a thread are its latest checkpoints
+# noinspection SqlNoDataSourceInspection
+_EXPIRED_CHECKPOINTS = """
+    SELECT thread_id, checkpoint_ns, checkpoint_id FROM (
+        SELECT thread_id, checkpoint_ns, checkpoint_id,
+               row_number() OVER (PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC) AS position
+        FROM checkpoints
+        WHERE thread_id = ANY(:thread_ids)
+    ) ranked
+    WHERE position > :keep_last
+"""
+
+# noinspection SqlNoDataSourceInspection
+_DELETE_EXPIRED_WRITES = text(f"""
+    WITH expired AS ({_EXPIRED_CHECKPOINTS}),
+    deleted AS (
+        DELETE FROM checkpoint_writes w USING expired e
+        WHERE w.thread_id = e.thread_id AND w.checkpoint_ns = e.checkpoint_ns AND w.checkpoint_id = e.checkpoint_id
+        RETURNING pg_column_size(w.*) AS size
+    )
+    SELECT count(*), coalesce(sum(size), 0) FROM deleted
+""")
+
+# noinspection SqlNoDataSourceInspection
+_DELETE_EXPIRED_CHECKPOINTS = text(f"""
+    WITH expired AS ({_EXPIRED_CHECKPOINTS}),
+    deleted AS (
+        DELETE FROM checkpoints c USING expired e
+        WHERE c.thread_id = e.thread_id AND c.checkpoint_ns = e.checkpoint_ns AND c.checkpoint_id = e.checkpoint_id
+        RETURNING pg_column_size(c.*) AS size
+    )
+    SELECT count(*), coalesce(sum(size), 0) FROM deleted
+""")
+
+# Blobs hold the channel values by version, a blob is kept while a remaining checkpoint references its version
+# noinspection SqlNoDataSourceInspection
+_DELETE_UNREFERENCED_BLOBS = text("""
+    WITH deleted AS (
+        DELETE FROM checkpoint_blobs b
+        WHERE b.thread_id = ANY(:thread_ids)
+          AND NOT EXISTS (
+              SELECT 1 FROM checkpoints c
+              WHERE c.thread_id = b.thread_id
+                AND c.checkpoint_ns = b.checkpoint_ns
+                AND c.checkpoint -> 'channel_versions' ->> b.channel = b.version
+          )
+        RETURNING pg_column_size(b.*) AS size
+    )
+    SELECT count(*), coalesce(sum(size), 0) FROM deleted
+""")
+
+
+def purge_checkpoints(
+    keep_last: int = KEEP_LAST_CHECKPOINTS,
+    threads_per_batch: int = THREADS_PER_BATCH,
+) -> RetentionReport:
+    """
+    Apply the checkpoint retention policy to every thread.
+
+    Args:
+        keep_last: Checkpoints kept per thread, at least the latest one is always kept.
+        threads_per_batch: Threads whose checkpoints are deleted in one transaction.
+
+    Returns:
+        RetentionReport: The deleted rows and their size.
+    """
+    keep_last = max(1, keep_last)
+    threads_per_batch = max(1, threads_per_batch)
+    started = time.monotonic()
+    report = RetentionReport()
+
+    with sync_engine.connect() as conn:
+        # noinspection SqlNoDataSourceInspection
+        deleted_threads = list(
+            conn.execute(
+                text("""
+                    SELECT id FROM threads t
+                    WHERE t.is_deleted
+                      AND (
+                          EXISTS (SELECT 1 FROM checkpoints c WHERE c.thread_id = t.id)
+                          OR EXISTS (SELECT 1 FROM thread_messages m WHERE m.thread_id = t.id)
+                      )
+                """)
+            ).scalars()
+        )
+        conn.commit()  # Ends the implicit transaction of the lookup, every batch runs in its own
+        for batch in _batches(deleted_threads, threads_per_batch):
+            _purge_deleted_threads(conn, batch, report)
+
+        # noinspection SqlNoDataSourceInspection
+        long_threads = list(
+            conn.execute(
+                text("""
+                    SELECT DISTINCT thread_id FROM checkpoints
+                    GROUP BY thread_id, checkpoint_ns
+                    HAVING count(*) > :keep_last
+                       AND max(created_at) < now() - make_interval(secs => :idle_seconds)
+                """),
+                {"keep_last": keep_last, "idle_seconds": IDLE_SECONDS},
+            ).scalars()
+        )
+        conn.commit()
+        for batch in _batches(long_threads, threads_per_batch):
+            _purge_expired_checkpoints(conn, batch, keep_last, report)
+
+    report.duration_seconds = time.monotonic() - started
+    logger.info(
+        f"Checkpoint retention purged {report.threads} threads: {report.checkpoints} checkpoints, {report.writes} writes, "
+        f"{report.blobs} blobs, {report.messages} messages, {report.reclaimed_bytes} bytes in {report.duration_seconds:.1f}s"
+    )
+    return report
+
+
+def _purge_deleted_threads(conn: Connection, thread_ids: list[str], report: RetentionReport) -> None:
+    params = {"thread_ids": thread_ids}
+    with conn.begin():
+        report.add("writes", *conn.execute(_DELETE_THREAD_WRITES, params).one())
+        report.add("blobs", *conn.execute(_DELETE_THREAD_BLOBS, params).one())
+        report.add("checkpoints", *conn.execute(_DELETE_THREAD_CHECKPOINTS, params).one())
+        report.add("messages", *conn.execute(_DELETE_THREAD_MESSAGES, params).one())
+    report.threads += len(thread_ids)
+    time.sleep(BATCH_PAUSE_SECONDS)
+
+
+def _purge_expired_checkpoints(conn: Connection, thread_ids: list[str], keep_last: int, report: RetentionReport) -> None:
+    params = {"thread_ids": thread_ids, "keep_last": keep_last}
+    with conn.begin():
+        # Writes first, they are matched against the checkpoints that are about to expire
+        report.add("writes", *conn.execute(_DELETE_EXPIRED_WRITES, params).one())
+        report.add("checkpoints", *conn.execute(_DELETE_EXPIRED_CHECKPOINTS, params).one())
+        report.add("blobs", *conn.execute(_DELETE_UNREFERENCED_BLOBS, {"thread_ids": thread_ids}).one())
+    report.threads += len(thread_ids)
+    time.sleep(BATCH_PAUSE_SECONDS)
+
+
+def _batches(items: list[str], size: int):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
@@ -0,0 +1,225 @@
+"""
+Checkpoint durability of graph runs.
+
+LangGraph saves a checkpoint, its channel blobs and pending writes after every step of a run.
+Runs of teams that never wait for a human only need their final state, so the
+DeferredCheckpointSaver keeps the checkpoints of a run in memory and writes only the last one:
+
+- every-step: every checkpoint is written, as LangGraph does by default.
+- on-interrupt-and-exit: the latest checkpoint is written as soon as the run is interrupted
+  and when the run ends.
+- exit-only: the latest checkpoint is written when the run ends.
+
+The flushed checkpoint points to the last checkpoint written before the run and carries the
+channel versions of all deferred steps, so it is read back like any other checkpoint and an
+interrupted run resumes exactly where it stopped. The run must call aflush() once it ended,
+also when it failed or was stopped.
+"""
+
+from collections.abc import AsyncIterator, Iterator, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.constants import INTERRUPT
+
+from app.core import logging
+from app.core.enums import CheckpointDurability
+
+logger = logging.get_logger(__name__)
+
+
+@dataclass
+class _PendingCheckpoint:
+    # Config of the last checkpoint written before the deferred steps, the parent of the flushed checkpoint
+    parent_config: RunnableConfig
+    config: RunnableConfig
+    checkpoint: Checkpoint
+    metadata: CheckpointMetadata
+    new_versions: ChannelVersions = field(default_factory=dict)
+    # (writes, task_id, task_path) of the tasks of the latest checkpoint
+    writes: list[tuple[Sequence[tuple[str, Any]], str, str]] = field(default_factory=list)
+
+
+class DeferredCheckpointSaver(BaseCheckpointSaver):
+    """
+    Wraps a checkpointer and defers the checkpoints of a run according to its durability.
+    """
+
+    def __init__(self, saver: BaseCheckpointSaver, durability: CheckpointDurability):
+        """
+        Args:
+            saver: The checkpointer the checkpoints are written to.
+            durability: When the checkpoints of a run are written.
+        """
+        super().__init__(serde=saver.serde)
+        self.saver = saver
+        self.durability = durability
+        # Key: (thread_id, checkpoint_ns), Value: the checkpoint not written yet
+        self._pending: dict[tuple[str, str], _PendingCheckpoint] = {}
+
+    @property
+    def config_specs(self) -> list:
+        return self.saver.config_specs
+
+    def get_next_version(self, current: Optional[Any], channel: Any) -> Any:
+        return self.saver.get_next_version(current, channel)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        pending = self._pending.get(_key(config))
+        checkpoint_id = config["configurable"].get("checkpoint_id")
+        if pending is None or checkpoint_id not in (None, pending.checkpoint["id"]):
+            return await self.saver.aget_tuple(config)
+
+        return CheckpointTuple(
+            config=pending.config,
+            checkpoint=pending.checkpoint,
+            metadata=pending.metadata,
+            parent_config=pending.parent_config if pending.parent_config["configurable"].get("checkpoint_id") else None,
+            pending_writes=[
+                (task_id, channel, value) for writes, task_id, _ in pending.writes for channel, value in writes
+            ],
+        )
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        async for checkpoint_tuple in self.saver.alist(config, filter=filter, before=before, limit=limit):
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        if self.durability == CheckpointDurability.EVERY_STEP:
+            return await self.saver.aput(config, checkpoint, metadata, new_versions)
+
+        key = _key(config)
+        next_config: RunnableConfig = {
+            "configurable": {
+                "thread_id": key[0],
+                "checkpoint_ns": key[1],
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _PendingCheckpoint(
+                parent_config=config,
+                config=next_config,
+                checkpoint=checkpoint,
+                metadata=metadata,
+            )
+        else:
+            pending.config = next_config
+            pending.checkpoint = checkpoint
+            pending.metadata = metadata
+            # The writes of the previous checkpoint are applied in this one
+            pending.writes = []
+        pending.new_versions.update(new_versions)
+        return next_config
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        key = _key(config)
+        pending = self._pending.get(key)
+        checkpoint_id = config["configurable"].get("checkpoint_id")
+
+        if pending is None or checkpoint_id == pending.parent_config["configurable"].get("checkpoint_id"):
+            # Writes of a written checkpoint, e.g. the resume value of an interrupted run
+            await self.saver.aput_writes(config, writes, task_id, task_path)
+            return
+        if checkpoint_id != pending.checkpoint["id"]:
+            # Writes of a checkpoint that was superseded before it was written
+            return
+
+        pending.writes.append((writes, task_id, task_path))
+        if self.durability == CheckpointDurability.ON_INTERRUPT_AND_EXIT and any(
+            channel == INTERRUPT for channel, _ in writes
+        ):
+            await self._aflush(key)
+
+    async def aflush(self, thread_id: str) -> None:
+        """
+        Write the deferred checkpoints of a thread.
+
+        Args:
+            thread_id: The thread identifier
+        """
+        for key in [key for key in self._pending if key[0] == thread_id]:
+            await self._aflush(key)
+
+    async def _aflush(self, key: tuple[str, str]) -> None:
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+
+        config = await self.saver.aput(pending.parent_config, pending.checkpoint, pending.metadata, pending.new_versions)
+        for writes, task_id, task_path in pending.writes:
+            await self.saver.aput_writes(config, writes, task_id, task_path)
+
+    # The synchronous methods are only used from other threads, they are not deferred
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.saver.get_tuple(config)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        return self.saver.list(config, filter=filter, before=before, limit=limit)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self.saver.put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self.saver.put_writes(config, writes, task_id, task_path)
+
+
+def with_durability(saver: BaseCheckpointSaver, durability: CheckpointDurability) -> BaseCheckpointSaver:
+    """
+    Returns the checkpointer to compile a graph with for the given durability.
+    """
+    if durability == CheckpointDurability.EVERY_STEP:
+        return saver
+    return DeferredCheckpointSaver(saver, durability)
+
+
+def _key(config: RunnableConfig) -> tuple[str, str]:
+    return config["configurable"]["thread_id"], config["configurable"].get("checkpoint_ns", "")
@@ -0,0 +1,104 @@
+"""
+Compressed serializer for LangGraph checkpoints.
+
+Channel values and pending writes are encoded by LangGraph's JsonPlusSerializer, as msgpack
+without pickle, and compressed with zstd when the encoded value is at least
+CHECKPOINT_COMPRESSION_MIN_BYTES long. Compressed values are stored with a "+zstd" suffix on
+their type, so values written before compression was enabled are read back unchanged.
+"""
+
+import threading
+from typing import Any, Optional
+
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from app.core import logging
+from app.core.settings import env_settings
+
+logger = logging.get_logger(__name__)
+
+# --- Constants ---
+COMPRESSION_SUFFIX = "+zstd"
+COMPRESSION_MIN_BYTES = env_settings.CHECKPOINT_COMPRESSION_MIN_BYTES
+COMPRESSION_LEVEL = env_settings.CHECKPOINT_COMPRESSION_LEVEL
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class CompressedSerializer(SerializerProtocol):
+    """
+    Wraps a serializer and compresses the typed values it encodes.
+    """
+
+    def __init__(
+        self,
+        serde: Optional[SerializerProtocol] = None,
+        compress: bool = True,
+        min_bytes: int = COMPRESSION_MIN_BYTES,
+        level: int = COMPRESSION_LEVEL,
+    ):
+        """
+        Args:
+            serde: The serializer encoding the values, JsonPlusSerializer by default.
+            compress: Whether to compress new values. Compressed values are always readable.
+            min_bytes: Encoded values shorter than this are not compressed.
+            level: The zstd compression level.
+        """
+        self.serde = serde or JsonPlusSerializer()
+        self.compress = compress
+        self.min_bytes = min_bytes
+        self.level = level
+        # zstd contexts must not be shared between threads
+        self._local = threading.local()
+
+        if compress and zstandard is None:
+            logger.warning("The zstandard package is not installed. Checkpoints will be stored uncompressed.")
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.serde.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.serde.loads(data)
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(obj)
+        if not self.compress or zstandard is None or len(data) < self.min_bytes:
+            return type_, data
+
+        compressed = self._compressor().compress(data)
+        # Values that do not shrink, e.g. already compressed bytes, are stored as they are
+        if len(compressed) >= len(data):
+            return type_, data
+        return type_ + COMPRESSION_SUFFIX, compressed
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.endswith(COMPRESSION_SUFFIX):
+            if zstandard is None:
+                raise RuntimeError("The zstandard package is required to read compressed checkpoints")
+            type_ = type_[: -len(COMPRESSION_SUFFIX)]
+            payload = self._decompressor().decompress(payload)
+        return self.serde.loads_typed((type_, payload))
+
+    def _compressor(self) -> Any:
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+        return compressor
+
+    def _decompressor(self) -> Any:
+        decompressor = getattr(self._local, "decompressor", None)
+        if decompressor is None:
+            decompressor = self._local.decompressor = zstandard.ZstdDecompressor()
+        return decompressor
+
+
+def get_checkpoint_serializer() -> SerializerProtocol:
+    """
+    Returns the serializer configured for checkpoints.
+    """
+    return CompressedSerializer(compress=env_settings.CHECKPOINT_COMPRESSION_ENABLED)
@@ -0,0 +1,16 @@
+from pydantic import Field
+
+from app.schemas.base import BaseResponse
+
+
+##################################################
+########### RESPONSE SCHEMAS #####################
+##################################################
+class CheckpointRetentionResponse(BaseResponse):
+    threads: int = Field(..., description="Threads whose checkpoints were purged")
+    checkpoints: int = Field(..., description="Deleted checkpoints")
+    writes: int = Field(..., description="Deleted pending writes")
+    blobs: int = Field(..., description="Deleted channel blobs")
+    messages: int = Field(..., description="Deleted projected messages of deleted threads")
+    reclaimed_bytes: int = Field(..., description="Stored size of the deleted rows, freed by the next vacuum")
+    duration_seconds: float = Field(..., description="Duration of the purge in seconds")
@@ -0,0 +1,40 @@
+from pydantic import Field
+
+from app.schemas.base import BaseResponse
+
+##################################################
+########### RESPONSE SCHEMAS #####################
+##################################################
+
+
+class EmbeddingCacheMetricsResponse(BaseResponse):
+    hits: int = Field(..., description="Embeddings served from the cache by this process")
+    misses: int = Field(..., description="Embeddings computed by the provider by this process")
+    evicted: int = Field(..., description="Cache entries evicted by this process")
+    hit_rate: float = Field(..., description="Fraction of embedding lookups served from the cache")
+
+
+class StreamMetricsResponse(BaseResponse):
+    active_streams: int = Field(..., description="Streams currently served by this worker")
+    local_stops: int = Field(..., description="Streams of this worker stopped by a request to this worker")
+    remote_stops: int = Field(..., description="Streams of this worker stopped by a request to another worker")
+    active_runs: int = Field(..., description="Graph runs currently executed by this worker")
+
+
+class AdmissionMetricsResponse(BaseResponse):
+    max_concurrent_runs: int = Field(..., description="Runs this worker executes at the same time, 0 if unlimited")
+    running: int = Field(..., description="Admitted runs currently executing")
+    queued: int = Field(..., description="Runs waiting for a free slot")
+    admitted: int = Field(..., description="Runs admitted by this worker")
+    rejected_rate_limited: int = Field(..., description="Runs rejected by a user's token bucket")
+    rejected_user_limit: int = Field(..., description="Runs rejected by the per-user concurrency limit")
+    rejected_queue_timeout: int = Field(..., description="Runs rejected after waiting too long for a slot")
+    wait_ms_p50: float = Field(..., description="Median queue wait of recent runs in milliseconds")
+    wait_ms_p95: float = Field(..., description="95th percentile queue wait of recent runs in milliseconds")
+    wait_ms_max: float = Field(..., description="Longest queue wait in milliseconds")
+
+
+class MetricsResponse(BaseResponse):
+    embedding_cache: EmbeddingCacheMetricsResponse = Field(..., description="Embedding cache metrics")
+    streams: StreamMetricsResponse = Field(..., description="Streaming metrics")
+    admission: AdmissionMetricsResponse = Field(..., description="Admission control metrics")
@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import Field
+
+from app.core.enums import RunStatus
+from app.schemas.base import BaseResponse
+
+
+##################################################
+########### RESPONSE SCHEMAS #####################
+##################################################
+class RunResponse(BaseResponse):
+    run_id: str = Field(..., description="ID of the run.")
+    user_id: str = Field(..., description="ID of the user who started the run.")
+    thread_id: str = Field(..., description="ID of the thread the run writes to.")
+    status: RunStatus = Field(..., description="Status of the run.")
+    last_event_id: int = Field(..., description="ID of the latest event produced by the run, 0 if none.")
+    created_at: datetime = Field(..., description="When the run was started.")
+    finished_at: Optional[datetime] = Field(None, description="When the run ended.")
@@ -32,6 +32,7 @@ class UpdateTeamRequest(TeamBase, BaseRequest):
 class ChatTeamRequest(BaseModel):
     messages: list[ChatMessage] = Field(..., description="List of chat messages in the team chat.")
     interrupt: Interrupt | None = Field(None, description="Interrupt associated with the team.")
+    coalesce: bool = Field(False, description="Merge consecutive token chunks of a message into fewer stream events.")
 
 
 class ChatTeamPublicRequest(BaseModel):
@@ -4,7 +4,7 @@ from typing import Optional
 from pydantic import Field
 
 from app.core.graph.messages import ChatResponse
-from app.schemas.base import BaseRequest, BaseResponse, CursorPagingResponse
+from app.schemas.base import BaseRequest, BaseResponse, CursorPagingRequest, CursorPagingResponse
 
 
 ##################################################
@@ -20,6 +20,10 @@ class UpdateThreadRequest(BaseRequest):
     assistant_id: Optional[str] = Field(None, min_length=3, max_length=50)
 
 
+class GetHistoryRequest(CursorPagingRequest):
+    max_per_page: int = Field(50, ge=1, le=200, description="Max messages per page must be between 1 and 200")
+
+
 ##################################################
 ########### RESPONSE SCHEMAS #####################
 ##################################################
@@ -43,7 +47,7 @@ class UpdateThreadResponse(CreateThreadResponse):
     pass
 
 
-class GetHistoryResponse(BaseResponse):
+class GetHistoryResponse(CursorPagingResponse):
     user_id: str
     thread_id: str
     assistant_id: Optional[str] = None
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the message channels of the graph state.
+
+Compares the cost of one node step at growing thread lengths:
+- full: the node returns the whole history plus its message, merged by add_messages.
+- delta: the node returns only its message, appended by append_messages.
+- worker: the update returned by a real WorkerNode, answering from a fake chat model, is applied to
+  the channels of GraphTeamState. A node that returns more than its own messages shows up here.
+
+Usage, from the ai-service directory: python -m scripts.benchmark_state_updates [--steps 200]
+"""
+
+import argparse
+import asyncio
+import time
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import add_messages
+
+from app.core.graph.members import WorkerNode
+from app.core.state import GraphMember, GraphTeam, add_or_replace_messages, append_messages
+
+HISTORY_LENGTHS = (100, 1_000, 5_000, 20_000)
+
+
+def build_history(length: int) -> list:
+    return [
+        HumanMessage(content=f"question {i}", name="user") if i % 2 == 0 else AIMessage(content=f"answer {i}")
+        for i in range(length)
+    ]
+
+
+def measure(reducer, history: list, steps: int, full: bool) -> float:
+    """Returns the mean seconds of one step, applying `steps` node results to the channel."""
+    value = reducer([], history)
+    started = time.perf_counter()
+    for i in range(steps):
+        result = AIMessage(content=f"step {i}")
+        value = reducer(value, value + [result] if full else [result])
+    return (time.perf_counter() - started) / steps
+
+
+def create_worker_node() -> WorkerNode:
+    """Returns a WorkerNode answering from a fake chat model instead of a model provider."""
+    node = WorkerNode.__new__(WorkerNode)
+    node.model = FakeListChatModel(responses=["done"])
+    return node
+
+
+async def ameasure_worker(history: list, steps: int) -> float:
+    """Returns the mean seconds of applying one WorkerNode update to the channels, the model call is not timed."""
+    member = GraphMember(name="worker", role=None, provider=None, model=None, temperature=None, backstory=None, tools=[])
+    team = GraphTeam(
+        name="team", role=None, backstory=None, members={"worker": member}, provider=None, model=None, temperature=None
+    )
+    state = {
+        "all_messages": append_messages([], history),
+        "messages": [],
+        "history": [],
+        "team": team,
+        "next": "worker",
+        "main_task": [],
+        "task": [HumanMessage(content="task", name="user")],
+    }
+    node = create_worker_node()
+    elapsed = 0.0
+    for _ in range(steps):
+        update = await node.work(state, {})  # type: ignore[arg-type]
+        started = time.perf_counter()
+        state["all_messages"] = append_messages(state["all_messages"], update.get("all_messages", []))
+        state["history"] = append_messages(state["history"], update.get("history", []))
+        if "messages" in update:
+            state["messages"] = add_or_replace_messages(state["messages"], update["messages"])
+        elapsed += time.perf_counter() - started
+    return elapsed / steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=200, help="Node steps measured per thread length")
+    args = parser.parse_args()
+
+    print(f"{'messages':>10} {'full (us/step)':>16} {'delta (us/step)':>16} {'worker (us/step)':>17}")
+    for length in HISTORY_LENGTHS:
+        history = build_history(length)
+        full = measure(add_messages, history, args.steps, full=True)
+        delta = measure(append_messages, history, args.steps, full=False)
+        worker = asyncio.run(ameasure_worker(history, args.steps))
+        print(f"{length:>10} {full * 1e6:>16.1f} {delta * 1e6:>16.1f} {worker * 1e6:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
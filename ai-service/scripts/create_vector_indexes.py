@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Creates the full-text column and the indexes of the vector store.
+
+langchain_postgres creates langchain_pg_embedding on first use, so the migrations cannot index it
+on a fresh database. Run this once per deployment after the migrations, before starting the
+application. It creates the vector store tables when missing, types the embedding column after
+the dimension of the configured embedding model and builds the missing or invalid indexes.
+
+Usage, from the ai-service directory: python -m scripts.create_vector_indexes
+"""
+
+from langchain_postgres import PGVector
+
+from app.core import logging
+from app.core.db_session import sync_engine
+from app.core.rag.embeddings import get_embedding_model
+from app.core.rag.vector_indexes import create_vector_indexes
+from app.core.settings import env_settings
+
+
+def main():
+    logging.configure_logging()
+    embedding_model = get_embedding_model(env_settings.EMBEDDING_PROVIDER)
+    dimension = getattr(embedding_model, "dimension", None)
+
+    # Creates the tables of the vector store and its collection when missing
+    PGVector(
+        embeddings=embedding_model,
+        collection_name=env_settings.PGVECTOR_COLLECTION,
+        connection=sync_engine,
+        embedding_length=dimension,
+        use_jsonb=True,
+    )
+    create_vector_indexes(sync_engine, dimension)
+
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,11 @@ echo "Running database migrations..."
 alembic upgrade head
 echo "Migrations completed ✓"
 
+# Index the vector store, which langchain_postgres creates outside of the migrations
+echo "Creating vector store indexes..."
+python -m scripts.create_vector_indexes
+echo "Vector store indexes ready ✓"
+
 # Start the application
 echo "Starting FastAPI application..."
 echo "Access the API at: http://localhost:15001"